@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'elections.middleware.PerformanceMiddleware',
+    'elections.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -55,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'elections.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'dilgvotingsystembackend.urls'
@@ -92,7 +95,8 @@ DATABASES = {
 }
 
 
-# Optional local access to the legacy sqlite dump (for one-time data transfer).
+# Optional local access to the legacy sqlite dump (for one-time data transfer):
+#   python manage.py transfer_data --source sqlite_source --target default
 SQLITE_SOURCE_PATH = BASE_DIR / "db.sqlite3"
 if SQLITE_SOURCE_PATH.exists():
     DATABASES["sqlite_source"] = {
@@ -127,7 +131,9 @@ CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_HEADERS = list(default_headers) + [
     "x-session-token",
     "x-admin-token",
+    "x-profile",
 ]
+CORS_EXPOSE_HEADERS = ["server-timing", "x-profile-id"]
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -155,6 +161,131 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Request instrumentation (elections.middleware.PerformanceMiddleware).
+# Requests issuing more SQL queries than the budget are logged as warnings.
+PERF_QUERY_BUDGET = int(os.getenv("PERF_QUERY_BUDGET", "50"))
+PERF_QUERY_BUDGETS = {}  # per URL name overrides, e.g. {"admin_tally": 20}
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "1") == "1"
+
+# Request profiling (elections.middleware.ProfilingMiddleware). Staff can request
+# a profile per call; PROFILE_SAMPLE_RATE = N also profiles 1 in N requests.
+PROFILE_SAMPLE_RATE = int(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "30"))
+PROFILE_STORE_DIR = Path(os.getenv("PROFILE_STORE_DIR", BASE_DIR / "profiles"))
+PROFILE_STORE_MAX_FILES = int(os.getenv("PROFILE_STORE_MAX_FILES", "200"))
+
+# Prometheus metrics (/api/metrics/). Set METRICS_TOKEN for scrapers; without it
+# the endpoint needs an admin token. Under gunicorn point METRICS_MULTIPROC_DIR
+# at a directory shared by the workers (clear it when the master starts).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = int(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# API rendering: elections.renderers.FastJSONRenderer uses orjson when it is
+# installed (JSON_BACKEND "auto"/"orjson"; "json" forces DRF's encoder).
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "elections.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+}
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
+
+# Response compression (elections.middleware.CompressionMiddleware): brotli when
+# the `brotli` package is installed, gzip otherwise. Measure changes with
+# `manage.py benchmark_rendering`.
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "860"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+COMPRESS_STREAM_FLUSH_BYTES = int(os.getenv("COMPRESS_STREAM_FLUSH_BYTES", str(16 * 1024)))
+
+# Cache. Local memory by default (per process); point CACHE_BACKEND/CACHE_LOCATION
+# at a shared cache (e.g. django.core.cache.backends.redis.RedisCache) when running
+# several workers so invalidation reaches all of them immediately.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "hcad-default"),
+    }
+}
+# Upper bound on turnout staleness when the cache is not shared between workers.
+TURNOUT_CACHE_TTL = int(os.getenv("TURNOUT_CACHE_TTL", "60"))
+# election-status/ is cached (server and clients) until the next phase boundary,
+# but never longer than this, so edits reach every worker and client in time.
+ELECTION_STATUS_MAX_AGE = int(os.getenv("ELECTION_STATUS_MAX_AGE", "60"))
+# Nominee clustering (admin/nominations/clusters/): spellings at least this
+# similar (0-1) are one person; blocks larger than CLUSTER_BLOCK_LIMIT are skipped.
+NOMINEE_MATCH_THRESHOLD = float(os.getenv("NOMINEE_MATCH_THRESHOLD", "0.85"))
+CLUSTER_BLOCK_LIMIT = int(os.getenv("CLUSTER_BLOCK_LIMIT", "200"))
+# Ballots-per-minute series are downsampled to at most this many points.
+TIMESERIES_MAX_POINTS = int(os.getenv("TIMESERIES_MAX_POINTS", "240"))
+
+# Background jobs (python manage.py run_worker). Failed jobs retry with
+# JOB_RETRY_DELAY * 2^(attempt-1) seconds of backoff; running jobs whose worker
+# stops reporting for JOB_LOCK_TIMEOUT seconds are requeued. A running job's lock
+# is refreshed every JOB_HEARTBEAT_INTERVAL seconds (default a third of the timeout).
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "30"))
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "1800"))
+JOB_HEARTBEAT_INTERVAL = int(os.getenv("JOB_HEARTBEAT_INTERVAL", "600"))
+
+# `manage.py archive_election` writes closed elections' ballots here. Keep it out
+# of MEDIA_ROOT: the files hold voter ids.
+ARCHIVE_DIR = Path(os.getenv("ARCHIVE_DIR", BASE_DIR / "archives"))
+
+# Candidate/nominee photo variants (longest side in px), built by the
+# "photo_variants" job in WebP and JPEG.
+THUMBNAIL_SIZES = {"sm": 160, "md": 480, "lg": 960}
+
+# Photos are stored by content hash under MEDIA_ROOT/blobs/ (elections.storage);
+# those URLs never change content, so /media/blobs/ and /media/thumbs/ are sent
+# with "Cache-Control: public, max-age=MEDIA_IMMUTABLE_MAX_AGE, immutable".
+# `manage.py gc_media` deletes blobs unreferenced for MEDIA_GC_GRACE seconds.
+MEDIA_IMMUTABLE_MAX_AGE = int(os.getenv("MEDIA_IMMUTABLE_MAX_AGE", str(365 * 24 * 3600)))
+MEDIA_GC_GRACE = int(os.getenv("MEDIA_GC_GRACE", "86400"))
+
+# /media/ is served by elections.views.media_file (ETag, Range, the cache policy
+# above). Only MEDIA_PUBLIC_PREFIXES are served; exports/ stays private. Other
+# public files get MEDIA_MAX_AGE (0: always revalidate). With MEDIA_OFFLOAD
+# "x-accel" (nginx, internal location at MEDIA_ACCEL_PREFIX aliased to
+# MEDIA_ROOT) or "x-sendfile" (Apache/lighttpd) the proxy sends the bytes.
+MEDIA_PUBLIC_PREFIXES = ("blobs/", "thumbs/", "candidates/", "nominations/")
+MEDIA_MAX_AGE = int(os.getenv("MEDIA_MAX_AGE", "0"))
+MEDIA_OFFLOAD = os.getenv("MEDIA_OFFLOAD", "")
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+
+# Nomination photo uploads (elections.uploads): streamed to disk and refused
+# with 413 past PHOTO_UPLOAD_MAX_BYTES or PHOTO_UPLOAD_MAX_PIXELS (read from the
+# image header). The background job re-encodes them to at most
+# PHOTO_UPLOAD_MAX_EDGE px on the longest side.
+PHOTO_UPLOAD_MAX_BYTES = int(os.getenv("PHOTO_UPLOAD_MAX_BYTES", str(5 * 1024 * 1024)))
+PHOTO_UPLOAD_MAX_PIXELS = int(os.getenv("PHOTO_UPLOAD_MAX_PIXELS", "24000000"))
+PHOTO_UPLOAD_MAX_EDGE = int(os.getenv("PHOTO_UPLOAD_MAX_EDGE", "2048"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "plain": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "plain"},
+    },
+    "loggers": {
+        "elections.perf": {
+            "handlers": ["console"],
+            "level": os.getenv("PERF_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "elections.jobs": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+    },
+}
+
 # Email: console backend for local testing of PIN recovery.
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "no-reply@hcad.local"
@@ -2,12 +2,12 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from elections.views import media_file
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("elections.urls")),  # ✅ this is enough
+    # photos and thumbnails; see elections.media for caching and MEDIA_OFFLOAD
+    path(settings.MEDIA_URL.lstrip("/") + "<path:path>", media_file, name="media_file"),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
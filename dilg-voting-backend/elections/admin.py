@@ -4,14 +4,20 @@ from django.contrib import admin, messages
 
 from .models import (
     AccessGate,
+    Broadcast,
     Candidate,
     Election,
+    ElectionArchive,
     ElectionReminder,
+    ElectionSummary,
+    MediaBlob,
     Nomination,
     Position,
     Voter,
     Vote,
     Notification,
+    Job,
+    Participation,
     generate_pin,
 )
 
@@ -61,7 +67,7 @@ class ElectionAdmin(admin.ModelAdmin):
 
 @admin.register(Position)
 class PositionAdmin(admin.ModelAdmin):
-    list_display = ("name", "election", "display_order", "is_active")
+    list_display = ("name", "election", "seats", "tally_method", "display_order", "is_active")
     list_filter = ("election", "is_active")
     search_fields = ("name",)
     ordering = ("display_order", "name")
@@ -82,9 +88,8 @@ class VoterAdmin(admin.ModelAdmin):
         "batch_year",
         "campus_chapter",
         "is_active",
-        "has_voted",
     )
-    list_filter = ("is_active", "has_voted", "batch_year")
+    list_filter = ("is_active", "batch_year")
     search_fields = ("name", "voter_id", "email", "campus_chapter")
     readonly_fields = ("voter_id",)
 
@@ -110,6 +115,14 @@ class VoteAdmin(admin.ModelAdmin):
     search_fields = ("voter__name", "candidate__full_name")
 
 
+@admin.register(Participation)
+class ParticipationAdmin(admin.ModelAdmin):
+    list_display = ("voter", "election", "created_at")
+    list_filter = ("election",)
+    search_fields = ("voter__name", "voter__voter_id")
+    raw_id_fields = ("voter",)
+
+
 @admin.register(Nomination)
 class NominationAdmin(admin.ModelAdmin):
     list_display = (
@@ -142,3 +155,39 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ("type", "is_read", "is_hidden")
     search_fields = ("message",)
     ordering = ("-created_at",)
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ("type", "message", "created_by", "created_at")
+    list_filter = ("type",)
+    search_fields = ("message",)
+    ordering = ("-created_at",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "progress", "total", "attempts", "created_by", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    readonly_fields = ("result", "error", "locked_by", "locked_at", "started_at", "finished_at", "created_at")
+    ordering = ("-created_at",)
+
+
+@admin.register(ElectionSummary)
+class ElectionSummaryAdmin(admin.ModelAdmin):
+    list_display = ("election", "total_voters", "ballots_cast", "turnout_percent", "built_at")
+    readonly_fields = ("data", "built_at")
+
+
+@admin.register(ElectionArchive)
+class ElectionArchiveAdmin(admin.ModelAdmin):
+    list_display = ("election", "status", "path", "offset", "started_at", "finished_at")
+    readonly_fields = ("state", "offset", "checksum", "started_at", "finished_at")
+
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(admin.ModelAdmin):
+    list_display = ("name", "size", "refs", "created_at", "released_at")
+    list_filter = ("refs",)
+    search_fields = ("sha256", "name")
+    readonly_fields = ("sha256", "name", "size", "refs", "created_at", "released_at")
@@ -0,0 +1,160 @@
+# elections/analytics.py
+"""
+Dashboard aggregates. Turnout in an election comes from one GROUP BY over
+(batch_year, campus_chapter) joined to its participation rows, cached until a
+ballot or voter change bumps the version.
+The ballots-per-minute series reads the BallotBucket table kept by submit_ballot.
+"""
+import math
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FilteredRelation, IntegerField, Q, Value
+from django.utils import timezone
+
+from . import caching
+from .models import BallotBucket, Participation, Voter
+
+TURNOUT_NAMESPACE = "turnout"
+
+
+def _percent(voted, total):
+    return round(voted / total * 100, 2) if total else 0.0
+
+
+def _rollup(groups, field):
+    totals = {}
+    for row in groups:
+        bucket = totals.setdefault(row[field], {field: row[field], "total": 0, "voted": 0})
+        bucket["total"] += row["total"]
+        bucket["voted"] += row["voted"]
+    out = sorted(totals.values(), key=lambda b: (b[field] is None, b[field]))
+    for bucket in out:
+        bucket["turnout_percent"] = _percent(bucket["voted"], bucket["total"])
+    return out
+
+
+def build_turnout(election):
+    voters = Voter.objects.all()
+    if election:
+        # LEFT JOIN restricted to this election: at most one row per voter
+        voters = voters.annotate(
+            ballot=FilteredRelation("participations", condition=Q(participations__election=election))
+        )
+        voted_expr = Count("ballot")
+    else:
+        voted_expr = Value(0, output_field=IntegerField())
+    groups = list(
+        voters.values("batch_year", "campus_chapter")
+        .annotate(total=Count("id"), voted=voted_expr)
+        .order_by("batch_year", "campus_chapter")
+    )
+    total = sum(row["total"] for row in groups)
+    voted = sum(row["voted"] for row in groups)
+    for row in groups:
+        row["turnout_percent"] = _percent(row["voted"], row["total"])
+    return {
+        "election": election.id if election else None,
+        "total_voters": total,
+        "voted_count": voted,
+        "turnout_percent": _percent(voted, total),
+        "by_batch_year": _rollup(groups, "batch_year"),
+        "by_chapter": _rollup(groups, "campus_chapter"),
+        "groups": groups,
+        "generated_at": timezone.now().isoformat(),
+    }
+
+
+def turnout(election):
+    """Turnout of registered voters in `election` (None: nobody has voted)."""
+    return caching.cached(
+        TURNOUT_NAMESPACE,
+        f"breakdown:{election.id if election else 0}",
+        lambda: build_turnout(election),
+        getattr(settings, "TURNOUT_CACHE_TTL", 60),
+    )
+
+
+def invalidate_turnout():
+    """
+    Call after voters are added or ballots change. Deferred to commit so a
+    concurrent reader cannot re-cache pre-commit numbers under the new version.
+    """
+    transaction.on_commit(lambda: caching.bump(TURNOUT_NAMESPACE))
+
+
+# =======================
+#  BALLOTS PER MINUTE
+# =======================
+
+def minute_floor(value):
+    return value.replace(second=0, microsecond=0)
+
+
+def record_ballot(election_id, at=None):
+    """
+    Count one ballot in its minute bucket. Call inside the ballot transaction.
+    """
+    minute = minute_floor(at or timezone.now())
+    bucket = BallotBucket.objects.filter(election_id=election_id, minute=minute)
+    if bucket.update(count=F("count") + 1):
+        return
+    try:
+        with transaction.atomic():
+            BallotBucket.objects.create(election_id=election_id, minute=minute, count=1)
+    except IntegrityError:
+        # another ballot created the bucket first
+        bucket.update(count=F("count") + 1)
+
+
+def rebuild_ballot_buckets(election, chunk_size=5000):
+    """
+    Recompute an election's buckets from its participation rows (one per
+    ballot). Returns the number of ballots.
+    """
+    stamps = Participation.objects.filter(election=election).order_by().values_list("created_at", flat=True)
+    counts = Counter(minute_floor(at) for at in stamps.iterator(chunk_size=chunk_size))
+    with transaction.atomic():
+        BallotBucket.objects.filter(election=election).delete()
+        BallotBucket.objects.bulk_create(
+            [BallotBucket(election=election, minute=minute, count=n) for minute, n in sorted(counts.items())],
+            batch_size=1000,
+        )
+    return sum(counts.values())
+
+
+def ballot_timeseries(election, start=None, end=None, step=None):
+    """
+    Zero-filled ballots-per-bucket series for [start, end). Defaults to the
+    voting window up to now; `step` (minutes) defaults to whatever keeps the
+    series within TIMESERIES_MAX_POINTS.
+    """
+    max_points = getattr(settings, "TIMESERIES_MAX_POINTS", 240)
+    now = timezone.now()
+    end = end or min(election.voting_end or now, now)
+    start = minute_floor(start or election.voting_start or end - timezone.timedelta(days=1))
+    if end <= start:
+        end = start + timezone.timedelta(minutes=1)
+
+    span = math.ceil((end - start).total_seconds() / 60)
+    step = max(step or 1, math.ceil(span / max_points))
+    counts = [0] * math.ceil(span / step)
+
+    rows = BallotBucket.objects.filter(election=election, minute__gte=start, minute__lt=end).values_list(
+        "minute", "count"
+    )
+    for minute, count in rows:
+        counts[int((minute - start).total_seconds() // 60) // step] += count
+
+    return {
+        "election": election.id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "step_minutes": step,
+        "total": sum(counts),
+        "points": [
+            {"t": (start + timezone.timedelta(minutes=i * step)).isoformat(), "count": c}
+            for i, c in enumerate(counts)
+        ],
+    }
@@ -0,0 +1,150 @@
+# elections/archive.py
+"""
+Move a closed election's votes, nominations and nomination notifications out
+of the live tables into a gzip JSON-lines file (Django's "jsonl" serializer, so
+`manage.py loaddata <file>.jsonl.gz` restores it).
+
+Each batch is appended as its own gzip member and fsynced before the rows are
+deleted; the ElectionArchive row records the file size after every committed
+batch, so a rerun truncates anything written after it and carries on.
+
+Archived nominations keep their photos: the blob names are listed in the
+archive's state and storage.photo_references counts them, so gc_media does
+not delete files the archive still names.
+"""
+import gzip
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.utils import timezone
+
+from . import summaries
+from .models import ElectionArchive, ElectionSummary, Nomination, Notification, Vote
+
+NOMINATION_NOTIFICATION_TYPES = ("nomination_submitted", "nomination_promoted", "nomination_rejected")
+# source name -> photo field whose files the archive keeps referenced
+ARCHIVED_PHOTOS = {"nomination": "nominee_photo"}
+
+
+def archive_dir():
+    return Path(getattr(settings, "ARCHIVE_DIR", Path(settings.BASE_DIR) / "archives"))
+
+
+def related_notifications(election):
+    """
+    Nomination notifications of this election's nominators. Notifications carry
+    no election, so they are matched by type, recipient and the election window.
+    """
+    qs = Notification.objects.filter(
+        type__in=NOMINATION_NOTIFICATION_TYPES,
+        voter__in=Nomination.objects.filter(election=election).values("nominator_id"),
+    )
+    start = election.nomination_start or election.created_at
+    end = election.voting_end or election.nomination_end
+    if start:
+        qs = qs.filter(created_at__gte=start)
+    if end:
+        qs = qs.filter(created_at__lte=end)
+    return qs
+
+
+def sources(election):
+    """(name, queryset) in archive order; notifications go before the nominations they are matched by."""
+    return [
+        ("vote", Vote.objects.filter(position__election=election)),
+        ("notification", related_notifications(election)),
+        ("nomination", Nomination.objects.filter(election=election)),
+    ]
+
+
+def check_archivable(election):
+    """Return why `election` cannot be archived, or None."""
+    if not summaries.voting_ended(election):
+        return "voting has not ended"
+    if not election.archived_at and not election.results_published:
+        return "results are not published"
+    return None
+
+
+def _write_batch(path, rows):
+    """Append one gzip member and return the file size once it is on disk."""
+    with open(path, "ab") as fh:
+        with gzip.GzipFile(fileobj=fh, mode="wb") as gz:
+            gz.write(serializers.serialize("jsonl", rows).encode("utf-8"))
+        fh.flush()
+        os.fsync(fh.fileno())
+        return fh.tell()
+
+
+def _commit_batch(archive, name, model, pks, offset, photos=()):
+    with transaction.atomic():
+        model.objects.filter(pk__in=pks).delete()
+        state = archive.state.setdefault(name, {"last_pk": 0, "rows": 0})
+        state["last_pk"] = pks[-1]
+        state["rows"] += len(pks)
+        if photos:
+            state.setdefault("photos", []).extend(photos)
+        archive.offset = offset
+        archive.save(update_fields=["state", "offset"])
+
+
+def _checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def archive_election(election, batch_size=2000, log=None):
+    """
+    Archive `election` (see module docstring). Builds the results summary first
+    if there is none; safe to call again after an interruption.
+    """
+    log = log or (lambda msg: None)
+    archive = ElectionArchive.objects.filter(election=election).first()
+    if archive and archive.status == "completed":
+        return archive
+
+    if not ElectionSummary.objects.filter(election=election).exists():
+        summaries.snapshot(election)
+    if not archive:
+        directory = archive_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        archive = ElectionArchive.objects.create(
+            election=election, path=str(directory / f"election-{election.id}-{stamp}.jsonl.gz")
+        )
+    if not election.archived_at:
+        election.archived_at = timezone.now()
+        election.save(update_fields=["archived_at"])
+
+    path = Path(archive.path)
+    if path.exists():
+        with open(path, "r+b") as fh:
+            fh.truncate(archive.offset)
+    elif archive.offset:
+        raise ValueError(f"Archive file {path} is missing; {archive.offset} bytes were already committed")
+
+    for name, qs in sources(election):
+        last_pk = archive.state.get(name, {}).get("last_pk", 0)
+        photo_field = ARCHIVED_PHOTOS.get(name)
+        while True:
+            rows = list(qs.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not rows:
+                break
+            pks = [row.pk for row in rows]
+            photos = [getattr(row, photo_field).name for row in rows if photo_field and getattr(row, photo_field)]
+            _commit_batch(archive, name, qs.model, pks, _write_batch(path, rows), photos)
+            last_pk = pks[-1]
+            log(f"{name}: {archive.state[name]['rows']} archived")
+
+    archive.status = "completed"
+    archive.checksum = _checksum(path) if path.exists() else ""
+    archive.finished_at = timezone.now()
+    archive.save(update_fields=["status", "checksum", "finished_at"])
+    return archive
@@ -0,0 +1,140 @@
+# elections/broadcasts.py
+"""
+Announcements to every voter (admin/broadcasts/), merged into each voter's
+notification feed (notifications/).
+
+A broadcast is one row however many voters there are. Read state costs nothing
+until a voter acts: "mark all read" and "delete all" move two watermarks on the
+Voter row (broadcasts_read_through / broadcasts_hidden_through), and only a
+broadcast read or dismissed on its own above them gets a BroadcastReceipt.
+Moving a watermark drops the receipts it makes redundant.
+
+In the feed, broadcast ids carry a "b" prefix ("b12") so the existing
+notification actions can take both kinds of id.
+"""
+from django.db import transaction
+from django.db.models import Count, Exists, F, FilteredRelation, Max, OuterRef, Q
+
+from .models import Broadcast, BroadcastReceipt, Voter
+
+ID_PREFIX = "b"
+
+
+def feed_id(broadcast_id):
+    return f"{ID_PREFIX}{broadcast_id}"
+
+
+def split_ids(ids):
+    """(notification ids, broadcast ids) from a mixed list like [3, "b12"]."""
+    notifications, broadcasts = [], []
+    for value in ids if isinstance(ids, list) else []:
+        text = str(value)
+        target = broadcasts if text.startswith(ID_PREFIX) else notifications
+        text = text.removeprefix(ID_PREFIX)
+        if text.isdigit():
+            target.append(int(text))
+    return notifications, broadcasts
+
+
+def feed(voter, history=False, limit=100):
+    """
+    The voter's newest broadcasts, with feed_id / is_read / is_hidden set for
+    BroadcastFeedSerializer.
+    """
+    qs = (
+        Broadcast.objects.annotate(receipt=FilteredRelation("receipts", condition=Q(receipts__voter=voter)))
+        .annotate(receipt_id=F("receipt__id"), receipt_hidden=F("receipt__is_hidden"))
+        .order_by("-created_at", "-id")
+    )
+    if not history:
+        qs = qs.filter(id__gt=voter.broadcasts_hidden_through).filter(
+            Q(receipt__isnull=True) | Q(receipt__is_hidden=False)
+        )
+    items = list(qs[:limit])
+    for broadcast in items:
+        broadcast.feed_id = feed_id(broadcast.id)
+        broadcast.is_read = broadcast.id <= voter.broadcasts_read_through or broadcast.receipt_id is not None
+        broadcast.is_hidden = broadcast.id <= voter.broadcasts_hidden_through or bool(broadcast.receipt_hidden)
+    return items
+
+
+def unread_count(voter):
+    """Broadcasts above the watermarks without a receipt: one COUNT."""
+    above = max(voter.broadcasts_read_through, voter.broadcasts_hidden_through)
+    handled = BroadcastReceipt.objects.filter(broadcast=OuterRef("pk"), voter=voter)
+    return Broadcast.objects.filter(id__gt=above).exclude(Exists(handled)).count()
+
+
+def read_counts(broadcast_ids):
+    """
+    How many voters have read each broadcast: those whose watermark covers it
+    (one GROUP BY over the watermarks) plus receipts above the watermark.
+    """
+    covered = sorted(
+        Voter.objects.filter(broadcasts_read_through__gt=0)
+        .values_list("broadcasts_read_through")
+        .annotate(voters=Count("id"))
+        .order_by()
+    )
+    receipts = dict(
+        BroadcastReceipt.objects.filter(
+            broadcast_id__in=broadcast_ids, voter__broadcasts_read_through__lt=F("broadcast_id")
+        )
+        .values_list("broadcast_id")
+        .annotate(voters=Count("id"))
+        .order_by()
+    )
+    counts = []
+    for broadcast_id in broadcast_ids:
+        watermarked = sum(voters for through, voters in covered if through >= broadcast_id)
+        counts.append(watermarked + receipts.get(broadcast_id, 0))
+    return counts
+
+
+def _latest_id():
+    return Broadcast.objects.aggregate(latest=Max("id"))["latest"] or 0
+
+
+def mark_all_read(voter):
+    latest = _latest_id()
+    if latest <= voter.broadcasts_read_through:
+        return
+    with transaction.atomic():
+        Voter.objects.filter(pk=voter.pk).update(broadcasts_read_through=latest)
+        # below the watermark a plain read receipt says nothing more
+        BroadcastReceipt.objects.filter(voter=voter, is_hidden=False, broadcast_id__lte=latest).delete()
+    voter.broadcasts_read_through = latest
+
+
+def hide_all(voter):
+    latest = max(_latest_id(), voter.broadcasts_hidden_through)
+    with transaction.atomic():
+        Voter.objects.filter(pk=voter.pk).update(broadcasts_read_through=latest, broadcasts_hidden_through=latest)
+        BroadcastReceipt.objects.filter(voter=voter, broadcast_id__lte=latest).delete()
+    voter.broadcasts_read_through = voter.broadcasts_hidden_through = latest
+
+
+def mark_read(voter, broadcast_ids):
+    """Receipts for broadcasts not yet covered by the read watermark."""
+    ids = Broadcast.objects.filter(id__in=broadcast_ids, id__gt=voter.broadcasts_read_through).values_list(
+        "id", flat=True
+    )
+    BroadcastReceipt.objects.bulk_create(
+        [BroadcastReceipt(broadcast_id=i, voter=voter) for i in ids], ignore_conflicts=True
+    )
+
+
+def hide(voter, broadcast_ids):
+    """Dismiss or delete: a broadcast is shared, so it is hidden for this voter only."""
+    ids = list(
+        Broadcast.objects.filter(id__in=broadcast_ids, id__gt=voter.broadcasts_hidden_through).values_list(
+            "id", flat=True
+        )
+    )
+    if not ids:
+        return
+    with transaction.atomic():
+        BroadcastReceipt.objects.filter(voter=voter, broadcast_id__in=ids).delete()
+        BroadcastReceipt.objects.bulk_create(
+            [BroadcastReceipt(broadcast_id=i, voter=voter, is_hidden=True) for i in ids]
+        )
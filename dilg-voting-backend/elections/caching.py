@@ -0,0 +1,108 @@
+# elections/caching.py
+"""
+Versioned read-through caching for aggregate endpoints. Each namespace has a
+version counter in the cache; writers call bump() and every cached value under
+the old version is ignored from then on. Hits and misses feed
+hcad_cache_requests_total.
+
+`conditional` adds ETag / If-None-Match handling to polled read endpoints.
+"""
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from . import metrics
+
+KEY_PREFIX = "hcad"
+
+
+def _version_key(namespace):
+    return f"{KEY_PREFIX}:v:{namespace}"
+
+
+def version(namespace):
+    current = cache.get(_version_key(namespace))
+    if current is None:
+        cache.add(_version_key(namespace), 1, timeout=None)
+        current = cache.get(_version_key(namespace), 1)
+    return current
+
+
+def bump(namespace):
+    """Invalidate everything cached under `namespace`."""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.add(_version_key(namespace), 2, timeout=None)
+
+
+def cached(namespace, key, builder, timeout):
+    """
+    Return the cached value for (namespace, key) or build, store and return it.
+    `timeout` bounds staleness when the cache is per-process (LocMemCache) and a
+    bump() happened in another worker.
+    """
+    full_key = f"{KEY_PREFIX}:{namespace}:{version(namespace)}:{key}"
+    value = cache.get(full_key)
+    metrics.record_cache(namespace, value is not None)
+    if value is None:
+        value = builder()
+        cache.set(full_key, value, timeout)
+    return value
+
+
+# =======================
+#  CONDITIONAL GET
+# =======================
+
+def make_etag(key):
+    return '"%s"' % hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+
+
+def etag_matches(header, etag):
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+def conditional(version, vary=()):
+    """
+    ETag support for a read endpoint (apply below @api_view).
+
+    `version(request, *args, **kwargs)` returns a cheap key that changes
+    whenever the response would (row counts, max updated_at, ids); None skips
+    the check. A matching If-None-Match gets a 304 before the view runs.
+    Responses are "no-cache": clients keep them but revalidate on every poll.
+    Endpoints that depend on a request header list it in `vary`; they are
+    marked private.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = version(request, *args, **kwargs) if request.method in ("GET", "HEAD") else None
+            etag = make_etag((view.__name__, request.get_full_path(), key)) if key is not None else None
+            not_modified = etag is not None and etag_matches(request.headers.get("If-None-Match"), etag)
+            if etag is not None:
+                metrics.record_cache(f"etag_{view.__name__}", not_modified)
+
+            if not_modified:
+                response = HttpResponseNotModified()
+            else:
+                response = view(request, *args, **kwargs)
+            if etag is not None and response.status_code in (200, 304):
+                response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache" if vary else "public, no-cache"
+            if vary:
+                patch_vary_headers(response, vary)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,134 @@
+# elections/clustering.py
+"""
+Grouping nominations of the same person spelled differently
+("Ma. Clara Santos", "Maria Clara Santos", "maria clara santoz").
+
+Names are normalized by the caller (views.normalize_name), then folded further
+here: accents and punctuation dropped. Instead of comparing every pair of
+nominations in a position, a blocking index maps (batch year, first letters of
+a token) to the nominations having such a token; only nominations sharing a
+block are compared. Blocks bigger than CLUSTER_BLOCK_LIMIT (a very common first
+name) say little and are skipped, which keeps the work near-linear. Matches
+above NOMINEE_MATCH_THRESHOLD are merged with union-find, so A~B and B~C give
+one group.
+"""
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+from django.conf import settings
+
+PREFIX = 3  # "santos" and "santoz" share the block "san"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def threshold():
+    return getattr(settings, "NOMINEE_MATCH_THRESHOLD", 0.85)
+
+
+def block_limit():
+    return getattr(settings, "CLUSTER_BLOCK_LIMIT", 200)
+
+
+def fold(normalized):
+    """Tokens of an already normalized name without accents and punctuation."""
+    stripped = unicodedata.normalize("NFKD", normalized)
+    stripped = "".join(ch for ch in stripped if not unicodedata.combining(ch))
+    return _WORD_RE.findall(stripped.lower())
+
+
+def prepare(words):
+    """(text, text with sorted tokens, character counts) compared by similarity()."""
+    text = " ".join(words)
+    return text, " ".join(sorted(words)), Counter(text)
+
+
+def similarity(a, b, cutoff=0.0):
+    """
+    Best of the in-order and sorted-token ratios ("Santos, Maria" vs "Maria
+    Santos") of two prepare()d names. Pairs that cannot reach `cutoff` are
+    settled by length and shared-character bounds and return 0.
+    """
+    if a[0] == b[0]:
+        return 1.0
+    total = len(a[0]) + len(b[0])
+    if 2 * min(len(a[0]), len(b[0])) < cutoff * total:
+        return 0.0
+    if 2 * sum((a[2] & b[2]).values()) < cutoff * total:  # SequenceMatcher.quick_ratio, without the setup
+        return 0.0
+    best = SequenceMatcher(None, a[0], b[0], autojunk=False).ratio()
+    if best < cutoff and (a[1] != a[0] or b[1] != b[0]):
+        best = max(best, SequenceMatcher(None, a[1], b[1], autojunk=False).ratio())
+    return best
+
+
+class DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def cluster(records, normalize):
+    """
+    Group `records` (objects with .nominee_full_name and .nominee_batch_year,
+    one position's nominations) into lists of records naming the same person.
+    """
+    tokens = [fold(normalize(r.nominee_full_name)) for r in records]
+    names = [prepare(words) for words in tokens]
+    groups = DisjointSet(len(records))
+
+    exact = {}
+    for i, record in enumerate(records):
+        groups.union(i, exact.setdefault((record.nominee_batch_year, names[i][0]), i))
+
+    blocks = {}
+    for i, (record, words) in enumerate(zip(records, tokens)):
+        if exact[(record.nominee_batch_year, names[i][0])] != i:
+            continue  # exact duplicates are compared through their first spelling
+        for word in set(words):
+            if len(word) > 1:  # initials block everything with that letter
+                blocks.setdefault((record.nominee_batch_year, word[:PREFIX]), []).append(i)
+
+    limit, cutoff = block_limit(), threshold()
+    compared = set()
+    for members in blocks.values():
+        if len(members) > limit:
+            continue
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                if (i, j) in compared or groups.find(i) == groups.find(j):
+                    continue
+                compared.add((i, j))
+                if similarity(names[i], names[j], cutoff) >= cutoff:
+                    groups.union(i, j)
+
+    clusters = {}
+    for i, record in enumerate(records):
+        clusters.setdefault(groups.find(i), []).append(record)
+    return list(clusters.values())
+
+
+def describe(members, normalize):
+    """Summary of one cluster: the most frequent spelling labels it."""
+    spellings = Counter(" ".join(m.nominee_full_name.split()) for m in members)
+    label = min(spellings, key=lambda name: (-spellings[name], name))
+    return {
+        "key": " ".join(fold(normalize(label))),
+        "label": label,
+        "batch_year": members[0].nominee_batch_year,
+        "count": len(members),
+        "spellings": [{"name": name, "count": count} for name, count in spellings.most_common()],
+        "nomination_ids": sorted(m.id for m in members),
+        "promoted": sum(m.status == "promoted" for m in members),
+    }
@@ -0,0 +1,274 @@
+# elections/exports.py
+"""
+Streaming CSV/XLSX exports. Rows come from values_list(...).iterator(chunk_size)
+and are written as they are read, so memory stays flat whatever the table size.
+"""
+import csv
+import os
+import secrets
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import POSITION_CHOICES, Candidate, Nomination, Participation, Vote, Voter
+
+CHUNK_SIZE = 2000
+POSITION_LABELS = dict(POSITION_CHOICES)
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+# =======================
+#  DATASETS
+# =======================
+
+def results_rows(election):
+    yield ["position", "candidate_id", "full_name", "batch_year", "campus_chapter", "votes"]
+    qs = (
+        Candidate.objects.filter(position__election=election, is_official=True)
+        .annotate(vote_total=Count("votes"))
+        .order_by("position__display_order", "position__name", "full_name")
+        .values_list("position__name", "id", "full_name", "batch_year", "campus_chapter", "vote_total")
+    )
+    for position, *rest in qs.iterator(chunk_size=CHUNK_SIZE):
+        yield [POSITION_LABELS.get(position, position), *rest]
+
+
+def ballots_rows(election):
+    """
+    Anonymized vote ledger: no voter columns, timestamps truncated to the minute.
+    """
+    yield ["position", "candidate_id", "candidate", "rank", "cast_at_minute"]
+    qs = (
+        Vote.objects.filter(position__election=election)
+        .order_by("pk")
+        .values_list("position__name", "candidate_id", "candidate__full_name", "rank", "created_at")
+    )
+    for position, candidate_id, candidate, rank, created_at in qs.iterator(chunk_size=CHUNK_SIZE):
+        minute = timezone.localtime(created_at).replace(second=0, microsecond=0) if created_at else None
+        yield [POSITION_LABELS.get(position, position), candidate_id, candidate, rank, minute]
+
+
+def roster_rows(election):
+    yield ["voter_id", "name", "batch_year", "campus_chapter", "email", "phone", "has_voted", "is_active", "created_at"]
+    qs = (
+        Voter.objects.annotate(
+            voted=Exists(Participation.objects.filter(election=election, voter=OuterRef("pk")))
+        )
+        .order_by("pk")
+        .values_list("voter_id", "name", "batch_year", "campus_chapter", "email", "phone", "voted", "is_active", "created_at")
+    )
+    yield from qs.iterator(chunk_size=CHUNK_SIZE)
+
+
+def nominations_rows(election):
+    yield [
+        "id",
+        "position",
+        "nominee_full_name",
+        "nominee_batch_year",
+        "nominee_campus_chapter",
+        "nominator",
+        "nominator_voter_id",
+        "status",
+        "rejection_reason",
+        "created_at",
+    ]
+    qs = (
+        Nomination.objects.filter(election=election)
+        .order_by("pk")
+        .values_list(
+            "id",
+            "position__name",
+            "nominee_full_name",
+            "nominee_batch_year",
+            "nominee_campus_chapter",
+            "nominator__name",
+            "nominator__voter_id",
+            "status",
+            "rejection_reason",
+            "created_at",
+        )
+    )
+    for nomination_id, position, *rest in qs.iterator(chunk_size=CHUNK_SIZE):
+        yield [nomination_id, POSITION_LABELS.get(position, position), *rest]
+
+
+EXPORTS = {
+    "results": results_rows,
+    "ballots": ballots_rows,
+    "roster": roster_rows,
+    "nominations": nominations_rows,
+}
+
+
+# =======================
+#  WRITERS
+# =======================
+
+# Leading characters a spreadsheet reads as the start of a formula.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat() if timezone.is_aware(value) else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        # names, emails and reasons are user input: never let them run as a formula
+        return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+    return str(value)
+
+
+class _Echo:
+    """File-like object that hands back what is written (csv.writer target)."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow([_cell_text(v) for v in row])
+
+
+class _ChunkSink:
+    """Unseekable sink for zipfile; collects compressed bytes until drained."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_workbook(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    )
+
+
+def _xlsx_cell(value):
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_cell_text(value))}</t></is></c>'
+
+
+def stream_xlsx(rows, sheet_name="Export", rows_per_chunk=500):
+    """
+    Minimal single-sheet XLSX (inline strings, no styles) written through an
+    unseekable zip stream, yielding compressed bytes every rows_per_chunk rows.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in XLSX_STATIC_PARTS.items():
+            zf.writestr(name, content)
+        zf.writestr("xl/workbook.xml", _xlsx_workbook(sheet_name))
+        yield sink.drain()
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            for idx, row in enumerate(rows, start=1):
+                cells = "".join(_xlsx_cell(v) for v in row)
+                sheet.write(f'<row r="{idx}">{cells}</row>'.encode("utf-8"))
+                if idx % rows_per_chunk == 0:
+                    data = sink.drain()
+                    if data:
+                        yield data
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def stream_export(kind, fmt, election):
+    rows = EXPORTS[kind](election)
+    if fmt == "xlsx":
+        return (chunk for chunk in stream_xlsx(rows, sheet_name=kind.title()) if chunk)
+    return (line.encode("utf-8") for line in stream_csv(rows))
+
+
+def export_filename(kind, fmt, election):
+    stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+    return f"{kind}-election{election.id if election else 0}-{stamp}.{fmt}"
+
+
+def write_file(name, chunks, private=False):
+    """
+    Write `chunks` to MEDIA_ROOT/exports/<name> (for background runs); returns
+    the path relative to MEDIA_ROOT. private=True adds a random suffix so the
+    file cannot be guessed from the media URL.
+    """
+    if private:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}-{secrets.token_hex(8)}{ext}"
+    relative = os.path.join("exports", name)
+    target = os.path.join(settings.MEDIA_ROOT, relative)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = target + ".part"
+    with open(tmp, "wb") as fh:
+        for chunk in chunks:
+            fh.write(chunk)
+    os.replace(tmp, target)
+    return relative
+
+
+def write_export_file(kind, fmt, election, private=False):
+    return write_file(export_filename(kind, fmt, election), stream_export(kind, fmt, election), private=private)
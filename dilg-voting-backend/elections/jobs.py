@@ -0,0 +1,332 @@
+# elections/jobs.py
+"""
+Database-backed background jobs (no external broker). Views enqueue a Job row
+and answer 202; `manage.py run_worker` claims rows and runs the registered
+handler for each kind. Handlers must be safe to re-run: a failed attempt is
+retried with exponential backoff until max_attempts.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from PIL import Image
+
+from . import analytics, exports, storage, thumbnails
+from .models import (
+    BallotBucket,
+    Candidate,
+    Election,
+    ElectionSummary,
+    Job,
+    Nomination,
+    Participation,
+    Position,
+    Vote,
+    Voter,
+    generate_pin,
+)
+
+logger = logging.getLogger("elections.jobs")
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+def enqueue(kind, payload=None, *, user=None, max_attempts=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler registered for '{kind}'")
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts or getattr(settings, "JOB_MAX_ATTEMPTS", 3),
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+
+# =======================
+#  CLAIMING
+# =======================
+
+def claim_next(worker):
+    """
+    Atomically move the oldest due job from queued to running. Uses
+    SELECT ... FOR UPDATE SKIP LOCKED where the backend supports it; otherwise
+    (SQLite) a conditional UPDATE decides which worker wins.
+    """
+    now = timezone.now()
+    due = Job.objects.filter(status="queued", run_after__lte=now).order_by("run_after", "id")
+    claim = {
+        "status": "running",
+        "locked_by": worker,
+        "locked_at": now,
+        "started_at": now,
+        "attempts": F("attempts") + 1,
+    }
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_id = due.select_for_update(skip_locked=True).values_list("id", flat=True).first()
+            if job_id is None:
+                return None
+            Job.objects.filter(pk=job_id).update(**claim)
+        return Job.objects.get(pk=job_id)
+
+    for job_id in due.values_list("id", flat=True)[:10]:
+        if Job.objects.filter(pk=job_id, status="queued").update(**claim):
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def requeue_stale(timeout=None):
+    """
+    Put back jobs whose worker died mid-run (locked longer than JOB_LOCK_TIMEOUT).
+    A job that already used its last attempt is failed instead, so one that
+    crashes its worker is not picked up forever. Returns (requeued, failed).
+    """
+    timeout = timeout or getattr(settings, "JOB_LOCK_TIMEOUT", 30 * 60)
+    now = timezone.now()
+    stale = Job.objects.filter(status="running", locked_at__lt=now - timezone.timedelta(seconds=timeout))
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status="failed", error="Worker lost on the last attempt.", finished_at=now, locked_by="", locked_at=None
+    )
+    if failed:
+        logger.error("Failed %s stale job(s) that had no attempts left", failed)
+    requeued = stale.update(status="queued", locked_by="", locked_at=None, error="Worker lost; requeued.")
+    return requeued, failed
+
+
+# =======================
+#  RUNNING
+# =======================
+
+class JobContext:
+    """Passed to handlers for progress reporting (writes at most every `every` items)."""
+
+    def __init__(self, job, every=500):
+        self.job = job
+        self.every = every
+        self._last = 0
+
+    def progress(self, done, total=None):
+        if total is not None and total != self.job.total:
+            self.job.total = total
+        elif done - self._last < self.every and done != self.job.total:
+            return
+        self._last = done
+        self.job.progress = done
+        now = timezone.now()
+        Job.objects.filter(pk=self.job.pk).update(progress=done, total=self.job.total, locked_at=now)
+
+
+def _heartbeat(job, stop, interval):
+    """
+    Refresh the job's lock every `interval` seconds until `stop` is set, so a
+    handler that runs long without reporting progress is not taken for a dead
+    worker by requeue_stale. Runs on its own thread and DB connection.
+    """
+    try:
+        while not stop.wait(interval):
+            try:
+                Job.objects.filter(pk=job.pk, status="running", locked_by=job.locked_by).update(
+                    locked_at=timezone.now()
+                )
+            except DatabaseError:
+                # e.g. SQLite busy under the handler's write; the next beat retries
+                logger.warning("Heartbeat for job %s failed", job.id, exc_info=True)
+    finally:
+        connection.close()
+
+
+def run_job(job):
+    func = HANDLERS.get(job.kind)
+    if func is None:
+        Job.objects.filter(pk=job.pk).update(
+            status="failed", error=f"No handler for '{job.kind}'", finished_at=timezone.now(), locked_by=""
+        )
+        return "failed"
+
+    interval = getattr(settings, "JOB_HEARTBEAT_INTERVAL", None)
+    interval = interval or getattr(settings, "JOB_LOCK_TIMEOUT", 30 * 60) / 3
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job, stop, interval), name=f"job-{job.id}-heartbeat", daemon=True)
+    beat.start()
+    try:
+        result = func(job.payload, JobContext(job))
+    except Exception:  # noqa: BLE001 - any handler failure is recorded on the job
+        error = traceback.format_exc()
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        if job.attempts < job.max_attempts:
+            delay = getattr(settings, "JOB_RETRY_DELAY", 30) * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status="queued",
+                error=error,
+                run_after=timezone.now() + timezone.timedelta(seconds=delay),
+                locked_by="",
+                locked_at=None,
+            )
+            return "retry"
+        Job.objects.filter(pk=job.pk).update(
+            status="failed", error=error, finished_at=timezone.now(), locked_by="", locked_at=None
+        )
+        return "failed"
+    finally:
+        stop.set()
+        beat.join()
+
+    Job.objects.filter(pk=job.pk).update(
+        status="succeeded",
+        result=result,
+        error="",
+        progress=job.total if job.total is not None else job.progress,
+        finished_at=timezone.now(),
+        locked_by="",
+        locked_at=None,
+    )
+    return "succeeded"
+
+
+def run_pending(worker=None, limit=None):
+    """Run due jobs until the queue is empty (or `limit` jobs ran). Returns the count."""
+    worker = worker or worker_name()
+    ran = 0
+    while limit is None or ran < limit:
+        job = claim_next(worker)
+        if job is None:
+            break
+        run_job(job)
+        ran += 1
+    return ran
+
+
+# =======================
+#  HANDLERS
+# =======================
+
+@handler("reset_voters")
+def reset_voters_job(payload, ctx):
+    """
+    Reactivate every voter and end their sessions; with reset_pins, issue new PINs.
+    The new PINs never go into the job row (it is kept and shown in the admin):
+    they are written to a private CSV that admin/jobs/<id>/download/ hands out
+    once and then deletes.
+    """
+    reset_pins = bool(payload.get("reset_pins"))
+    pins, voters = [("voter_id", "pin")], []
+    if reset_pins:
+        # hashing dominates; do it before taking any write locks
+        voters = list(Voter.objects.only("id", "voter_id", "pin"))
+        ctx.progress(0, total=len(voters))
+        for idx, v in enumerate(voters, start=1):
+            new_pin = generate_pin()
+            v.set_pin(new_pin)
+            pins.append((v.voter_id, new_pin))
+            ctx.progress(idx)
+    with transaction.atomic():
+        count = Voter.objects.update(is_active=True, session_token=None, updated_at=timezone.now())
+        Voter.objects.bulk_update(voters, ["pin"], batch_size=500)
+    result = {"message": f"Reset {count} voters.", "reset_pins": reset_pins, "count": count, "pins_issued": len(voters)}
+    if reset_pins:
+        stamp = timezone.localtime().strftime("%Y%m%d-%H%M%S")
+        lines = (line.encode("utf-8") for line in exports.stream_csv(pins))
+        result.update(file=exports.write_file(f"pins-{stamp}.csv", lines, private=True), one_time=True)
+    return result
+
+
+@handler("reset_election")
+def reset_election_job(payload, ctx):
+    election = Election.objects.filter(pk=payload.get("election_id")).first()
+    if not election:
+        return {"message": "Election no longer exists."}
+
+    with transaction.atomic():
+        positions = Position.objects.filter(election=election)
+        votes_deleted, _ = Vote.objects.filter(position__in=positions).delete()
+        nominations_deleted, _ = Nomination.objects.filter(election=election).delete()
+        participations_deleted, _ = Participation.objects.filter(election=election).delete()
+        BallotBucket.objects.filter(election=election).delete()
+        ElectionSummary.objects.filter(election=election).delete()
+        analytics.invalidate_turnout()
+    return {
+        "message": "Election data reset.",
+        "election": election.id,
+        "votes_deleted": votes_deleted,
+        "nominations_deleted": nominations_deleted,
+        "participations_deleted": participations_deleted,
+    }
+
+
+@handler("export")
+def export_job(payload, ctx):
+    election = Election.objects.filter(pk=payload.get("election_id")).first()
+    if not election:
+        raise ValueError("Election not found")
+    relative = exports.write_export_file(payload["kind"], payload.get("fmt", "csv"), election, private=True)
+    return {"file": relative, "size": os.path.getsize(os.path.join(settings.MEDIA_ROOT, relative))}
+
+
+# model label -> (model, image field) for the "photo_variants" job
+PHOTO_FIELDS = {
+    "candidate": (Candidate, "photo"),
+    "nomination": (Nomination, "nominee_photo"),
+}
+
+
+def photo_update(model, **values):
+    """update() values for a photo row, stamping updated_at where the model has one (ETag versions)."""
+    if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+        values["updated_at"] = timezone.now()
+    return values
+
+
+def _reencode_photo(model, field, obj, photo):
+    """Swap an unchecked upload for its re-encoded copy; None when it is dropped or replaced."""
+    original = photo.name
+    try:
+        content, ext = thumbnails.reencode(photo)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("Dropping undecodable %s photo %s: %s", model.__name__, original, exc)
+        dropped = photo_update(model, **{field: None, "photo_variants": {}})
+        if model.objects.filter(pk=obj.pk, **{field: original}).update(**dropped):
+            storage.release(original)
+        return None
+    name = photo.storage.save(f"{model.__name__.lower()}{ext}", content)
+    if not model.objects.filter(pk=obj.pk, **{field: original}).update(**photo_update(model, **{field: name})):
+        storage.release(name)  # a newer upload landed meanwhile; it queued its own job
+        return None
+    storage.release(original)
+    obj.refresh_from_db(fields=[field])
+    return getattr(obj, field)
+
+
+@handler("photo_variants")
+def photo_variants_job(payload, ctx):
+    model, field = PHOTO_FIELDS[payload["model"]]
+    obj = model.objects.filter(pk=payload.get("id")).first()
+    photo = getattr(obj, field) if obj else None
+    if not photo or photo.name != payload.get("name"):
+        return {"message": "Photo was replaced or removed; nothing to do."}
+    if payload.get("reencode"):
+        photo = _reencode_photo(model, field, obj, photo)
+        if photo is None:
+            return {"message": "Photo could not be decoded or was replaced; not kept."}
+    variants = thumbnails.build_variants(photo)
+    # a newer upload may have landed meanwhile; it queued its own job
+    model.objects.filter(pk=obj.pk, **{field: photo.name}).update(**photo_update(model, photo_variants=variants))
+    return {"hash": variants["hash"], "formats": [fmt for fmt in variants if fmt != "hash"]}
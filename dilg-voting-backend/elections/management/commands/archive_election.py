@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from elections import archive
+from elections.models import Election
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a closed election's votes, nominations and nomination notifications into a "
+        "gzip JSON-lines file under ARCHIVE_DIR, keeping its results summary. Resumable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("election", type=int, help="Election id")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+
+    def handle(self, *args, **opts):
+        try:
+            election = Election.objects.get(pk=opts["election"])
+        except Election.DoesNotExist:
+            raise CommandError(f"Election {opts['election']} not found")
+
+        reason = archive.check_archivable(election)
+        if reason:
+            raise CommandError(f"{election.name} cannot be archived: {reason}")
+
+        if opts["dry_run"]:
+            for name, qs in archive.sources(election):
+                self.stdout.write(f"{name}: {qs.count()} rows")
+            return
+
+        try:
+            result = archive.archive_election(election, batch_size=opts["batch_size"], log=self.stdout.write)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        counts = ", ".join(f"{name} {state['rows']}" for name, state in result.state.items()) or "nothing"
+        self.stdout.write(self.style.SUCCESS(f"Archived {election.name} to {result.path} ({counts})"))
@@ -0,0 +1,56 @@
+import time
+import zlib
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from elections import renderers
+from elections.middleware import brotli
+from elections.models import Voter
+from elections.serializers import VoterSerializer
+from elections.views import get_active_election, with_has_voted
+
+
+def best_of(repeat, func):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Time JSON rendering (DRF encoder vs orjson) and gzip/brotli compression "
+        "of the admin_voters payload built from the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+
+    def handle(self, *args, **opts):
+        repeat = opts["repeat"]
+        voters = with_has_voted(Voter.objects.all(), get_active_election()).order_by("name")
+        ms, data = best_of(1, lambda: VoterSerializer(voters, many=True).data)
+        self.stdout.write(f"admin_voters: {len(data)} rows, query + serialize {ms:.1f} ms")
+
+        ms, body = best_of(repeat, lambda: JSONRenderer().render(data))
+        self.stdout.write(f"render json:   {ms:8.2f} ms  {len(body):>10,} bytes")
+        if renderers.backend() == "orjson":
+            fast_ms, fast = best_of(repeat, lambda: renderers.dumps(data))
+            same = "identical" if fast == body else "DIFFERENT"
+            self.stdout.write(f"render orjson: {fast_ms:8.2f} ms  {len(fast):>10,} bytes ({same}, {ms / fast_ms:.1f}x)")
+        else:
+            self.stdout.write("render orjson: not installed (or JSON_BACKEND = json)")
+
+        for level in (1, 6, 9):
+            ms, out = best_of(repeat, lambda: zlib.compress(body, level))
+            self.stdout.write(f"gzip -{level}:      {ms:8.2f} ms  {len(out):>10,} bytes ({len(out) / len(body):.1%})")
+        if brotli is None:
+            self.stdout.write("brotli: not installed")
+            return
+        for quality in (1, 5, 11):
+            ms, out = best_of(repeat, lambda: brotli.compress(body, quality=quality, mode=brotli.MODE_TEXT))
+            self.stdout.write(f"brotli q{quality:<2}:    {ms:8.2f} ms  {len(out):>10,} bytes ({len(out) / len(body):.1%})")
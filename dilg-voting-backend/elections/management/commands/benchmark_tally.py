@@ -0,0 +1,102 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from elections import tally
+from elections.models import Election, Position
+from elections.views import candidates_with_votes
+
+
+class Command(BaseCommand):
+    help = (
+        "Time instant-runoff and plurality counts over synthetic ranked ballots "
+        "(NumPy and pure Python), or the full tally of a stored election with --election."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ballots", type=int, default=100_000)
+        parser.add_argument("--candidates", type=int, default=8)
+        parser.add_argument("--seats", type=int, default=1)
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+        parser.add_argument("--election", type=int, help="Tally this election's positions instead")
+
+    def handle(self, *args, **opts):
+        if opts["election"]:
+            return self.bench_election(opts)
+
+        rng = random.Random(opts["seed"])
+        k = opts["candidates"]
+        popularity = [rng.uniform(0.5, 3.0) for _ in range(k)]
+        rankings = []
+        for _ in range(opts["ballots"]):
+            order = []
+            pool = list(range(k))
+            weights = list(popularity)
+            for _ in range(rng.randint(1, k)):
+                pick = rng.choices(range(len(pool)), weights=weights)[0]
+                order.append(pool.pop(pick))
+                weights.pop(pick)
+            rankings.append(tuple(order))
+        self.stdout.write(f"{len(rankings)} ballots, {k} candidates, {opts['seats']} seat(s)")
+
+        started = time.perf_counter()
+        ballots = tally.Ballots(rankings, k)
+        self.stdout.write(
+            f"encode: {(time.perf_counter() - started) * 1000:.1f} ms ({len(ballots.rankings)} distinct rankings)"
+        )
+
+        numpy = tally.np
+        backends = [("numpy", numpy)] if numpy is not None else []
+        backends.append(("python", None))
+        for name, module in backends:
+            tally.np = module
+            try:
+                elapsed, (winners, rounds) = self.best(
+                    opts["repeat"], lambda: tally.sequential_irv(tally.Ballots(rankings, k), opts["seats"])
+                )
+            finally:
+                tally.np = numpy
+            self.stdout.write(
+                f"irv [{name}]: {elapsed * 1000:.1f} ms, {sum(len(r) for r in rounds)} rounds, winners {winners}"
+            )
+
+        marks = [r[:opts["seats"]] for r in rankings]
+        elapsed, totals = self.best(opts["repeat"], lambda: self.count_marks(marks, k))
+        winners = tally.top_n(totals, opts["seats"])
+        self.stdout.write(f"plurality: {elapsed * 1000:.1f} ms, winners {winners}")
+        if numpy is None:
+            self.stdout.write("NumPy is not installed; only the pure-Python rounds were measured.")
+
+    @staticmethod
+    def best(repeat, fn):
+        timings, result = [], None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    @staticmethod
+    def count_marks(marks, k):
+        totals = [0] * k
+        for ballot in marks:
+            for idx in ballot:
+                totals[idx] += 1
+        return totals
+
+    def bench_election(self, opts):
+        election = Election.objects.filter(pk=opts["election"]).first()
+        if not election:
+            raise CommandError(f"Election {opts['election']} not found")
+        positions = list(Position.objects.filter(election=election, is_active=True))
+
+        def run():
+            return tally.tally_positions(positions, candidates_with_votes(positions))
+
+        elapsed, outcomes = self.best(opts["repeat"], run)
+        for pos in positions:
+            outcome = outcomes[pos.id]
+            self.stdout.write(f"{pos.get_name_display()} [{outcome['method']}]: winners {outcome['winners']}")
+        self.stdout.write(f"{election.name}: tallied {len(positions)} positions in {elapsed * 1000:.1f} ms")
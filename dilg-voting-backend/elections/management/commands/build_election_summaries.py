@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from elections import summaries
+from elections.models import Election
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the results summaries served by the elections history API for closed, "
+        "published elections that have none (--rebuild: refresh existing ones too)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--election", type=int, help="Only this election id")
+        parser.add_argument("--rebuild", action="store_true", help="Rebuild summaries that already exist")
+
+    def handle(self, *args, **opts):
+        elections = Election.objects.filter(results_published=True, archived_at__isnull=True).order_by("id")
+        if opts["election"]:
+            elections = elections.filter(pk=opts["election"])
+            if not elections.exists():
+                raise CommandError(f"Election {opts['election']} not found, unpublished or archived")
+        if not opts["rebuild"]:
+            elections = elections.filter(summary__isnull=True)
+
+        built = 0
+        for election in elections:
+            summary = summaries.snapshot_if_closed(election)
+            if summary is None:
+                self.stdout.write(f"{election.name}: voting has not ended, skipped")
+                continue
+            built += 1
+            self.stdout.write(f"{election.name}: {summary.ballots_cast} ballots, {summary.turnout_percent}% turnout")
+        self.stdout.write(self.style.SUCCESS(f"{built} summaries built"))
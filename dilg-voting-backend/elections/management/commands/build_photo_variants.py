@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from elections import jobs, thumbnails
+
+
+class Command(BaseCommand):
+    help = "Generate the responsive variants of candidate and nominee photos that have none yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="store_true", help="Enqueue photo_variants jobs instead of running inline")
+
+    def handle(self, *args, **opts):
+        done = 0
+        for label, (model, field) in jobs.PHOTO_FIELDS.items():
+            rows = model.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""}).filter(photo_variants={})
+            for obj in rows.iterator():
+                photo = getattr(obj, field)
+                if opts["queue"]:
+                    jobs.enqueue("photo_variants", {"model": label, "id": obj.pk, "name": photo.name})
+                else:
+                    try:
+                        variants = thumbnails.build_variants(photo)
+                    except (OSError, ValueError) as exc:
+                        self.stderr.write(f"{label} {obj.pk}: {exc}")
+                        continue
+                    model.objects.filter(pk=obj.pk).update(**jobs.photo_update(model, photo_variants=variants))
+                done += 1
+        verb = "queued" if opts["queue"] else "built"
+        self.stdout.write(self.style.SUCCESS(f"{done} photo variant sets {verb}"))
@@ -0,0 +1,34 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from elections import exports
+from elections.models import Election
+from elections.views import get_active_election
+
+
+class Command(BaseCommand):
+    help = (
+        "Write a streaming export (results, ballots, roster, nominations) as CSV or XLSX "
+        "under MEDIA_ROOT/exports/, for exports too large to download inside a request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(exports.EXPORTS), help="What to export")
+        parser.add_argument("--fmt", choices=sorted(exports.FORMATS), default="csv", help="File format (default csv)")
+        parser.add_argument("--election", type=int, help="Election id (default: active or latest)")
+
+    def handle(self, *args, **opts):
+        if opts["election"]:
+            election = Election.objects.filter(pk=opts["election"]).first()
+        else:
+            election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+        if not election:
+            raise CommandError("No election found")
+
+        started = time.perf_counter()
+        relative = exports.write_export_file(opts["kind"], opts["fmt"], election)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Wrote {os.path.join(settings.MEDIA_ROOT, relative)} in {elapsed:.1f}s"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from elections import storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount photo blob references and delete blobs (with their thumbnails) that have "
+        "been unreferenced for MEDIA_GC_GRACE seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grace", type=int, help="Seconds a blob must be unreferenced (default MEDIA_GC_GRACE)")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted")
+        parser.add_argument(
+            "--adopt", action="store_true", help="First move photos stored by upload name into the blob store"
+        )
+
+    def handle(self, *args, **opts):
+        if opts["adopt"]:
+            rewritten = storage.adopt_legacy(dry_run=opts["dry_run"])
+            self.stdout.write(f"{rewritten} photo references moved to content-addressed blobs")
+        stats = storage.collect_garbage(dry_run=opts["dry_run"], grace=opts["grace"])
+        verb = "would be deleted" if opts["dry_run"] else "deleted"
+        self.stdout.write(f"{stats['recounted']} reference counts corrected")
+        self.stdout.write(
+            self.style.SUCCESS(f"{stats['deleted']} blobs {verb} ({filesizeformat(stats['freed'])} freed)")
+        )
@@ -0,0 +1,348 @@
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+
+from elections.models import Election
+from elections.views import ADMIN_SALT, get_active_election
+
+
+# -------------------------
+#  TRANSPORTS
+# -------------------------
+
+class InProcessTransport:
+    """Calls the WSGI app directly through django.test.Client (one per thread)."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def _client(self):
+        if not hasattr(self.local, "client"):
+            self.local.client = Client(SERVER_NAME="localhost")
+        return self.local.client
+
+    def request(self, method, path, payload=None, headers=None):
+        client = self._client()
+        url = "/api/" + path
+        if method == "GET":
+            response = client.get(url, headers=headers or {})
+        else:
+            response = client.generic(
+                method,
+                url,
+                json.dumps(payload or {}),
+                content_type="application/json",
+                headers=headers or {},
+            )
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+    def close_thread(self):
+        connections.close_all()
+
+
+class HttpTransport:
+    """Talks to a running server (runserver, gunicorn) over HTTP."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/") + "/api/"
+
+    def request(self, method, path, payload=None, headers=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        for key, value in (headers or {}).items():
+            req.add_header(key, value)
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                status, raw = resp.status, resp.read()
+        except urllib.error.HTTPError as exc:
+            status, raw = exc.code, exc.read()
+        try:
+            body = json.loads(raw or b"null")
+        except ValueError:
+            body = None
+        return status, body
+
+    def close_thread(self):
+        pass
+
+
+# -------------------------
+#  STATS
+# -------------------------
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, endpoint, seconds, ok):
+        with self.lock:
+            latencies, errors = self.samples.setdefault(endpoint, ([], [0]))
+            latencies.append(seconds)
+            if not ok:
+                errors[0] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for endpoint, (latencies, errors) in sorted(self.samples.items()):
+            ordered = sorted(latencies)
+            rows.append(
+                {
+                    "endpoint": endpoint,
+                    "requests": len(ordered),
+                    "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+                    "errors": errors[0],
+                    "error_rate": round(errors[0] / len(ordered), 4) if ordered else 0.0,
+                    "p50_ms": percentile(ordered, 50),
+                    "p95_ms": percentile(ordered, 95),
+                    "p99_ms": percentile(ordered, 99),
+                }
+            )
+        return rows
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an ascending list of seconds, in ms."""
+    if not ordered:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(ordered) + 0.5)) - 1, 0)
+    return round(ordered[min(rank, len(ordered) - 1)] * 1000, 2)
+
+
+# -------------------------
+#  COMMAND
+# -------------------------
+
+class Command(BaseCommand):
+    help = (
+        "Replay synthetic election-day traffic (voters and admin dashboards) and report "
+        "throughput, p50/p95/p99 latency and error rates per endpoint. Run it against a "
+        "seeded scratch database: it creates voters and submits ballots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (default 30)")
+        parser.add_argument(
+            "--max-requests", type=int, default=0, help="Stop after this many requests, even before --duration"
+        )
+        parser.add_argument("--concurrency", type=int, default=8, help="Concurrent virtual users (default 8)")
+        parser.add_argument(
+            "--admin-ratio", type=float, default=0.1, help="Share of sessions that are admin dashboards (default 0.1)"
+        )
+        parser.add_argument(
+            "--polls-per-voter", type=int, default=3, help="Notification polls per voter session (default 3)"
+        )
+        parser.add_argument(
+            "--ballot-rate", type=float, default=1.0, help="Probability a voter submits a ballot (default 1.0)"
+        )
+        parser.add_argument("--admin-polls", type=int, default=5, help="Dashboard refreshes per admin session (default 5)")
+        parser.add_argument("--think-time", type=float, default=0.0, help="Pause between requests in seconds")
+        parser.add_argument("--base-url", help="Target a running server instead of the in-process WSGI client")
+        parser.add_argument("--admin-username", help="Staff account used for admin sessions")
+        parser.add_argument("--admin-password", help="Password for --admin-username (HTTP mode)")
+        parser.add_argument(
+            "--open-voting",
+            action="store_true",
+            help="Move the active election into its voting window before the run",
+        )
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for the traffic mix")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **opts):
+        if opts["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        if not opts["base_url"] and opts["verbosity"] < 2:
+            # one structured log line per request would drown the report
+            logging.getLogger("elections.perf").setLevel(logging.WARNING)
+
+        if opts["open_voting"]:
+            self._open_voting()
+        if not opts["base_url"] and not get_active_election():
+            raise CommandError("No active election. Seed data first (seed_demo_data).")
+
+        self.opts = opts
+        self.transport = HttpTransport(opts["base_url"]) if opts["base_url"] else InProcessTransport()
+        self.admin_token = self._admin_token()
+        self.stats = Stats()
+        self.run_id = uuid.uuid4().hex[:6]
+        self.counter = 0
+        self.sent = 0
+        self.counter_lock = threading.Lock()
+        self.deadline = time.monotonic() + opts["duration"]
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=self._worker, args=(i,), daemon=True) for i in range(opts["concurrency"])
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.monotonic() - started
+
+        rows = self.stats.report(elapsed)
+        if opts["json"]:
+            self.stdout.write(json.dumps({"elapsed_s": round(elapsed, 2), "endpoints": rows}, indent=2))
+        else:
+            self._print_table(rows, elapsed)
+
+    # ---- setup ----
+
+    def _open_voting(self):
+        election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+        if not election:
+            raise CommandError("No election to open")
+        now = timezone.now()
+        election.nomination_start = election.nomination_start or now - timezone.timedelta(days=2)
+        election.nomination_end = min(election.nomination_end or now, now) - timezone.timedelta(hours=1)
+        if election.nomination_start >= election.nomination_end:
+            election.nomination_start = election.nomination_end - timezone.timedelta(days=1)
+        election.voting_start = now - timezone.timedelta(minutes=1)
+        election.voting_end = now + timezone.timedelta(days=1)
+        election.is_active = True
+        election.save()
+        self.stdout.write(f"Voting opened for '{election.name}' until {election.voting_end:%Y-%m-%d %H:%M}")
+
+    def _admin_token(self):
+        if self.opts["admin_ratio"] <= 0:
+            return None
+        username = self.opts["admin_username"]
+        if self.opts["base_url"]:
+            if not (username and self.opts["admin_password"]):
+                raise CommandError("--admin-username and --admin-password are required with --base-url")
+            status, body = self.transport.request(
+                "POST", "admin/login/", {"username": username, "password": self.opts["admin_password"]}
+            )
+            if status != 200:
+                raise CommandError(f"Admin login failed ({status})")
+            return body["token"]
+        users = get_user_model().objects.filter(is_staff=True)
+        user = users.filter(username=username).first() if username else users.order_by("id").first()
+        if not user:
+            raise CommandError("No staff user found for admin sessions (create one or pass --admin-ratio 0)")
+        return signing.dumps({"user_id": user.id}, salt=ADMIN_SALT)
+
+    # ---- traffic ----
+
+    def _expired(self):
+        limit = self.opts["max_requests"]
+        return time.monotonic() >= self.deadline or bool(limit and self.sent >= limit)
+
+    def _call(self, endpoint, method, path, payload=None, headers=None):
+        limit = self.opts["max_requests"]
+        with self.counter_lock:
+            if limit and self.sent >= limit:
+                return 0, None  # not sent; the session winds down at its next check
+            self.sent += 1
+        start = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, payload, headers)
+        except Exception:  # noqa: BLE001 - every failure counts as an error sample
+            status, body = 599, None
+        self.stats.record(endpoint, time.perf_counter() - start, status < 400)
+        if self.opts["think_time"]:
+            time.sleep(self.opts["think_time"])
+        return status, body
+
+    def _worker(self, index):
+        rng = random.Random(None if self.opts["seed"] is None else self.opts["seed"] + index)
+        try:
+            while not self._expired():
+                if self.admin_token and rng.random() < self.opts["admin_ratio"]:
+                    self._admin_session()
+                else:
+                    self._voter_session(rng)
+        finally:
+            self.transport.close_thread()
+
+    def _next_voter_number(self):
+        with self.counter_lock:
+            self.counter += 1
+            return self.counter
+
+    def _voter_session(self, rng):
+        number = self._next_voter_number()
+        status, body = self._call(
+            "voter_quick_login",
+            "POST",
+            "voter/quick-login/",
+            {
+                "name": f"Load Voter {self.run_id}-{number}",
+                "batch_year": rng.randint(1980, 2020),
+                "campus_chapter": "Digos City",
+                "privacy_consent": True,
+            },
+        )
+        if status != 200 or not body:
+            return
+        headers = {"X-Session-Token": body["token"]}
+
+        # bundle fetch, as the ballot page does on load
+        self._call("current_election", "GET", "elections/current/", headers=headers)
+        _, positions = self._call("positions_list", "GET", "positions/", headers=headers)
+        _, candidates = self._call("candidates_list", "GET", "candidates/", headers=headers)
+        self._call("my_votes", "GET", "my-votes/", headers=headers)
+        self._call("my_nomination", "GET", "my-nomination/", headers=headers)
+
+        for _ in range(self.opts["polls_per_voter"]):
+            if self._expired():
+                return
+            self._call("voter_notifications", "GET", "notifications/", headers=headers)
+
+        if rng.random() < self.opts["ballot_rate"] and positions and candidates:
+            by_position = {}
+            for cand in candidates:
+                by_position.setdefault(cand["position"], []).append(cand["id"])
+            votes = {}
+            for pos in positions:
+                if not by_position.get(pos["id"]):
+                    return
+                votes[str(pos["id"])] = rng.choice(by_position[pos["id"]])
+            self._call("submit_ballot", "POST", "ballot/submit/", {"votes": votes}, headers=headers)
+
+    def _admin_session(self):
+        headers = {"X-Admin-Token": self.admin_token}
+        for _ in range(self.opts["admin_polls"]):
+            if self._expired():
+                return
+            self._call("admin_stats", "GET", "admin/stats/", headers=headers)
+            self._call("admin_tally", "GET", "admin/tally/", headers=headers)
+            self._call("admin_notifications", "GET", "admin/notifications/", headers=headers)
+            self._call("admin_nominations", "GET", "admin/nominations/", headers=headers)
+
+    # ---- output ----
+
+    def _print_table(self, rows, elapsed):
+        header = f"{'endpoint':<22}{'requests':>9}{'rps':>9}{'errors':>8}{'err%':>7}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}"
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        total = errors = 0
+        for row in rows:
+            total += row["requests"]
+            errors += row["errors"]
+            self.stdout.write(
+                f"{row['endpoint']:<22}{row['requests']:>9}{row['rps']:>9}{row['errors']:>8}"
+                f"{row['error_rate'] * 100:>6.1f}%{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}"
+            )
+        self.stdout.write("-" * len(header))
+        rps = total / elapsed if elapsed else 0.0
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} requests in {elapsed:.1f}s ({rps:.1f} req/s), {errors} errors")
+        )
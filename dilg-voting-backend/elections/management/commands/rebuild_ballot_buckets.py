@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from elections.analytics import rebuild_ballot_buckets
+from elections.models import Election
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-minute ballot buckets from Vote.created_at (all elections by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--election", type=int, help="Only rebuild this election id")
+
+    def handle(self, *args, **opts):
+        elections = Election.objects.order_by("id")
+        if opts["election"]:
+            elections = elections.filter(pk=opts["election"])
+            if not elections.exists():
+                raise CommandError(f"Election {opts['election']} not found")
+
+        for election in elections:
+            started = time.perf_counter()
+            ballots = rebuild_ballot_buckets(election)
+            self.stdout.write(f"{election.name}: {ballots} ballots bucketed in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,65 @@
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from elections import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (voter/election resets, PIN regeneration, exports). "
+        "Several workers can run side by side; each job is claimed by exactly one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=None,
+            help="Seconds to sleep when the queue is empty (default JOB_POLL_INTERVAL)",
+        )
+        parser.add_argument("--max-jobs", type=int, default=None, help="Exit after running this many jobs")
+
+    def handle(self, *args, **opts):
+        interval = opts["poll_interval"] or getattr(settings, "JOB_POLL_INTERVAL", 2.0)
+        worker = jobs.worker_name()
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        self.stdout.write(f"Worker {worker} started")
+        ran = 0
+        while not self.stopping:
+            close_old_connections()
+            requeued, failed = jobs.requeue_stale()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale job(s)"))
+            if failed:
+                self.stdout.write(self.style.ERROR(f"Failed {failed} stale job(s) with no attempts left"))
+
+            job = jobs.claim_next(worker)
+            if job is None:
+                if opts["once"]:
+                    break
+                time.sleep(interval)
+                continue
+
+            started = time.perf_counter()
+            outcome = jobs.run_job(job)
+            ran += 1
+            style = self.style.SUCCESS if outcome == "succeeded" else self.style.WARNING
+            self.stdout.write(
+                style(f"Job {job.id} {job.kind}: {outcome} in {time.perf_counter() - started:.1f}s (attempt {job.attempts})")
+            )
+            if opts["max_jobs"] and ran >= opts["max_jobs"]:
+                break
+
+        self.stdout.write(f"Worker {worker} stopped after {ran} job(s)")
+
+    def _stop(self, signum, frame):
+        # finish the current job, then exit
+        self.stopping = True
@@ -1,22 +1,63 @@
+import itertools
+import random
+import time
 from datetime import datetime
 
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, DateTimeField, Value, When
 from django.utils import timezone
 
+from elections import analytics
 from elections.models import (
     Candidate,
     Election,
     Nomination,
+    Notification,
+    Participation,
     Position,
+    Vote,
     Voter,
 )
 
+FIRST_NAMES = [
+    "Maria", "Jose", "Juan", "Ana", "Mark", "Kristine", "John Paul", "Angelica", "Carlo", "Bea",
+    "Miguel", "Patricia", "Rafael", "Joy", "Gabriel", "Camille", "Paolo", "Grace", "Vincent", "Rose",
+]
+LAST_NAMES = [
+    "Santos", "Reyes", "Cruz", "Bautista", "Ocampo", "Garcia", "Mendoza", "Torres", "Tan", "Lim",
+    "Gonzales", "Flores", "Villanueva", "Ramos", "Aquino", "Castillo", "Rivera", "Dela Cruz", "Uy", "Basilgo",
+]
+CHAPTERS = ["Digos City", "Main Campus", "Davao Chapter", "Manila Chapter", "USA Chapter"]
+SYNTHETIC_PREFIX = "HCAD-S"
+
 
 class Command(BaseCommand):
-    help = "Seed HCAD Alumni demo election data"
+    help = (
+        "Seed HCAD Alumni demo election data. The size options add deterministic "
+        "synthetic rows with chunked bulk inserts for benchmarks and load tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--voters", type=int, default=0, help="Synthetic voters to add")
+        parser.add_argument(
+            "--candidates-per-position", type=int, default=0, help="Synthetic candidates to add per position"
+        )
+        parser.add_argument(
+            "--ballots", type=int, default=0, help="Complete ballots cast by the new synthetic voters"
+        )
+        parser.add_argument("--nominations", type=int, default=0, help="Nominations made by the new synthetic voters")
+        parser.add_argument("--notifications", type=int, default=0, help="Voter and admin notifications to add")
+        parser.add_argument("--seed", type=int, default=2025, help="Random seed (default 2025)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk insert (default 2000)")
 
     def handle(self, *args, **options):
+        if (options.get("ballots") or options.get("nominations")) and not options.get("voters"):
+            # ballots and nominations are only ever made by the voters this run adds
+            raise CommandError("--ballots and --nominations need --voters to create the voters who cast them")
+
         self.stdout.write(self.style.NOTICE("Seeding HCAD Alumni data..."))
 
         election = self._create_election()
@@ -26,6 +67,10 @@ class Command(BaseCommand):
         self._create_nominations(election, positions, voters)
         self._create_superuser()
 
+        if any(options.get(key) for key in ("voters", "candidates_per_position", "notifications")):
+            self._seed_synthetic(election, positions, options)
+
+        analytics.invalidate_turnout()
         self.stdout.write(self.style.SUCCESS("Seeding complete."))
 
     def _aware(self, date_str: str):
@@ -155,3 +200,193 @@ class Command(BaseCommand):
             self.stdout.write("Superuser 'admin' created (admin123)")
         else:
             self.stdout.write("Superuser 'admin' already exists")
+
+    # -------------------------
+    #  SYNTHETIC DATA (bulk)
+    # -------------------------
+
+    def _seed_synthetic(self, election, positions, options):
+        rng = random.Random(options.get("seed", 2025))
+        batch_size = max(options.get("batch_size") or 2000, 1)
+        positions = [p for p in positions.values() if p.is_active]
+
+        n_cands = options.get("candidates_per_position") or 0
+        if n_cands:
+            self._bulk_candidates(rng, positions, n_cands, batch_size)
+
+        new_voters = []
+        n_voters = options.get("voters") or 0
+        if n_voters:
+            new_voters = self._bulk_voters(rng, n_voters, batch_size)
+
+        n_ballots = min(options.get("ballots") or 0, len(new_voters))
+        if n_ballots:
+            self._bulk_ballots(rng, election, positions, new_voters[:n_ballots], batch_size)
+
+        n_noms = min(options.get("nominations") or 0, len(new_voters))
+        if n_noms:
+            self._bulk_nominations(rng, election, positions, new_voters[-n_noms:], batch_size)
+
+        n_notes = options.get("notifications") or 0
+        if n_notes:
+            self._bulk_notifications(rng, new_voters, n_notes, batch_size)
+
+    def _random_name(self, rng):
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    def _report(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f"{label}: {count} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+    def _chunks(self, items, size):
+        for start in range(0, len(items), size):
+            yield items[start : start + size]
+
+    def _bulk_candidates(self, rng, positions, per_position, batch_size):
+        started = time.perf_counter()
+        rows = [
+            Candidate(
+                position=pos,
+                full_name=f"{self._random_name(rng)} {pos.id}-{i + 1}",
+                batch_year=rng.randint(1975, 2015),
+                campus_chapter=rng.choice(CHAPTERS),
+                is_official=True,
+            )
+            for pos in positions
+            for i in range(per_position)
+        ]
+        Candidate.objects.bulk_create(rows, batch_size=batch_size)
+        self._report("Synthetic candidates", len(rows), started)
+
+    def _bulk_voters(self, rng, count, batch_size):
+        """
+        Insert voters with sequential HCAD-S ids and one precomputed PIN hash
+        (PIN=123456) instead of hashing per row. Returns [(voter_pk, batch_year)].
+        """
+        started = time.perf_counter()
+        pin_hash = make_password("123456")
+        offset = Voter.objects.filter(voter_id__startswith=SYNTHETIC_PREFIX).count()
+        created = []
+        for chunk in self._chunks(range(offset, offset + count), batch_size):
+            rows = [
+                Voter(
+                    voter_id=f"{SYNTHETIC_PREFIX}{n:07d}",
+                    name=self._random_name(rng),
+                    batch_year=rng.randint(1970, 2024),
+                    campus_chapter=rng.choice(CHAPTERS),
+                    email=f"alumni{n}@example.com",
+                    privacy_consent=True,
+                    pin=pin_hash,
+                    is_active=True,
+                )
+                for n in chunk
+            ]
+            with transaction.atomic():
+                Voter.objects.bulk_create(rows)
+            # MySQL does not return primary keys from bulk inserts; read them back.
+            ids = dict(
+                Voter.objects.filter(voter_id__in=[r.voter_id for r in rows]).values_list("voter_id", "id")
+            )
+            created.extend((ids[r.voter_id], r.batch_year) for r in rows)
+        self._report("Synthetic voters", len(created), started)
+        return created
+
+    def _bulk_ballots(self, rng, election, positions, voters, batch_size):
+        started = time.perf_counter()
+        # spread ballots over the voting window (front-loaded) so the turnout curve has a shape
+        window_end = min(election.voting_end or timezone.now(), timezone.now())
+        window_start = election.voting_start or window_end - timezone.timedelta(days=1)
+        if window_start >= window_end:
+            window_start = window_end - timezone.timedelta(days=1)
+        span = window_end - window_start
+        choices = {}
+        for pos in positions:
+            ids = list(Candidate.objects.filter(position=pos, is_official=True).values_list("id", flat=True))
+            if not ids:
+                self.stdout.write(self.style.WARNING(f"No candidates for {pos}; skipping ballots"))
+                return
+            # skewed popularity so tallies have clear leaders
+            cum_weights = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(ids))))
+            rng.shuffle(ids)
+            choices[pos.id] = (ids, cum_weights)
+
+        per_chunk = max(batch_size // max(len(positions), 1), 1)
+        total = 0
+        for chunk in self._chunks(voters, per_chunk):
+            rows = [
+                Vote(
+                    voter_id=voter_id,
+                    position_id=pos_id,
+                    candidate_id=rng.choices(ids, cum_weights=cum_weights)[0],
+                )
+                for voter_id, _batch in chunk
+                for pos_id, (ids, cum_weights) in choices.items()
+            ]
+            stamps = {voter_id: window_start + span * rng.triangular(0, 1, 0.2) for voter_id, _batch in chunk}
+            cast_at = Case(
+                *[When(voter_id=voter_id, then=Value(at)) for voter_id, at in stamps.items()],
+                output_field=DateTimeField(),
+            )
+            with transaction.atomic():
+                Participation.objects.bulk_create(
+                    [Participation(election=election, voter_id=voter_id, created_at=at) for voter_id, at in stamps.items()]
+                )
+                Vote.objects.bulk_create(rows)
+                # Vote.created_at is auto_now_add, so backdate after the insert
+                Vote.objects.filter(voter_id__in=list(stamps), position_id__in=choices).update(created_at=cast_at)
+            total += len(chunk)
+        analytics.rebuild_ballot_buckets(election)
+        self._report("Synthetic ballots", total, started)
+
+    def _bulk_nominations(self, rng, election, positions, voters, batch_size):
+        started = time.perf_counter()
+        taken = set(Nomination.objects.filter(election=election).values_list("nominator_id", flat=True))
+        # a small pool of nominees with spelling variations, like real nomination rushes
+        pool = [(self._random_name(rng), rng.randint(1975, 2010)) for _ in range(max(len(positions) * 4, 8))]
+        total = 0
+        for chunk in self._chunks([v for v in voters if v[0] not in taken], batch_size):
+            rows = []
+            for voter_id, _batch in chunk:
+                name, batch_year = rng.choice(pool)
+                if rng.random() < 0.2:
+                    name = name.upper() if rng.random() < 0.5 else name.replace("a", "", 1)
+                rows.append(
+                    Nomination(
+                        election=election,
+                        position=rng.choice(positions),
+                        nominator_id=voter_id,
+                        nominee_full_name=name,
+                        nominee_batch_year=batch_year,
+                        nominee_campus_chapter=rng.choice(CHAPTERS),
+                        reason="Active alumni volunteer",
+                        is_good_standing=True,
+                    )
+                )
+            Nomination.objects.bulk_create(rows)
+            total += len(rows)
+        self._report("Synthetic nominations", total, started)
+
+    def _bulk_notifications(self, rng, voters, count, batch_size):
+        started = time.perf_counter()
+        voter_ids = [voter_id for voter_id, _batch in voters] or list(
+            Voter.objects.values_list("id", flat=True)[:10000]
+        )
+        total = 0
+        for chunk in self._chunks(range(count), batch_size):
+            rows = []
+            for n in chunk:
+                if voter_ids and rng.random() < 0.8:
+                    rows.append(
+                        Notification(
+                            type="info",
+                            message=f"Reminder #{n}: voting guidelines were updated.",
+                            voter_id=rng.choice(voter_ids),
+                            is_read=rng.random() < 0.5,
+                        )
+                    )
+                else:
+                    rows.append(Notification(type="login", message=f"Synthetic admin event #{n}."))
+            Notification.objects.bulk_create(rows)
+            total += len(rows)
+        self._report("Synthetic notifications", total, started)
@@ -0,0 +1,334 @@
+import json
+import os
+import time
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+
+# Rows that migrate/createsuperuser already manage on the target, or that are disposable.
+EXCLUDED_MODELS = {"contenttypes.contenttype", "auth.permission", "sessions.session", "admin.logentry"}
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def fill_auto_dates(instance, present):
+    """
+    Stamp auto_now/auto_now_add fields the fixture row does not carry (it
+    predates them), the way save() would; values in the row are kept as-is.
+    """
+    for field in instance._meta.concrete_fields:
+        if not (getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)):
+            continue
+        if field.name not in present and getattr(instance, field.attname) is None:
+            field.pre_save(instance, add=True)
+
+
+def iter_fixture(path, chunk_size=1 << 16):
+    """
+    Stream objects out of a dumpdata JSON array without loading the whole file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as fh:
+        buf = ""
+        while True:
+            chunk = fh.read(chunk_size)
+            buf += chunk
+            pos = 0
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,[":
+                    pos += 1
+                if pos < len(buf) and buf[pos] == "]":
+                    return
+                try:
+                    obj, pos_end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    break  # incomplete object: read more
+                yield obj
+                pos = pos_end
+            buf = buf[pos:]
+            if not chunk:
+                if buf.strip():
+                    raise CommandError(f"{path} is truncated or not a JSON array")
+                return
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream tables from a source database alias (or a dumpdata JSON fixture) into a "
+        "target alias in primary-key order with batched inserts, or export them to a "
+        "dumpdata-compatible JSON file. Resumable with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", default="sqlite_source", help="Source database alias (default sqlite_source)")
+        parser.add_argument("--fixture", help="Read a dumpdata JSON file (e.g. sqlite_seed.json) instead of --source")
+        parser.add_argument("--target", default="default", help="Target database alias (default default)")
+        parser.add_argument("--output", help="Write a dumpdata-compatible JSON file instead of a database")
+        parser.add_argument(
+            "--models",
+            nargs="*",
+            default=None,
+            help="Limit to app labels or app_label.Model (default: everything except contenttypes/permissions/sessions/admin log)",
+        )
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per batch (default 2000)")
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted run: skip rows up to the target's current max primary key",
+        )
+
+    def handle(self, *args, **opts):
+        self.batch_size = max(opts["batch_size"], 1)
+        self.resume = opts["resume"]
+        self.models = self._select_models(opts["models"])
+
+        if opts["output"]:
+            self._check_alias(opts["source"])
+            self._export(opts["source"], opts["output"])
+            return
+
+        self._check_alias(opts["target"])
+        self.target = connections[opts["target"]]
+        self.target_alias = opts["target"]
+        if opts["fixture"]:
+            if not os.path.exists(opts["fixture"]):
+                raise CommandError(f"Fixture not found: {opts['fixture']}")
+        else:
+            self._check_alias(opts["source"])
+            if opts["source"] == opts["target"]:
+                raise CommandError("--source and --target must differ")
+        if not self.resume:
+            self._ensure_empty_target()
+
+        started = time.perf_counter()
+        total = 0
+        # FK checks are off while streaming (rows may reference rows from later
+        # batches or cycles); integrity is verified once everything is in.
+        with self.target.constraint_checks_disabled():
+            if opts["fixture"]:
+                total = self._import_fixture(opts["fixture"])
+            else:
+                for model in self.models:
+                    total += self._copy_model(model, opts["source"])
+        self._finish()
+
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Transferred {total} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)"))
+
+    # ---- model selection ----
+
+    def _check_alias(self, alias):
+        if alias not in connections.databases:
+            hint = " (it only exists when db.sqlite3 is present next to manage.py)" if alias == "sqlite_source" else ""
+            raise CommandError(f"Unknown database alias '{alias}'{hint}")
+
+    def _select_models(self, selectors):
+        chosen = []
+        for model in apps.get_models(include_auto_created=False):
+            label = model_label(model)
+            if selectors:
+                if not any(label == s.lower() or model._meta.app_label == s for s in selectors):
+                    continue
+            elif label in EXCLUDED_MODELS:
+                continue
+            if model._meta.proxy or not model._meta.managed:
+                continue
+            chosen.append(model)
+
+        selected = set(chosen)
+        for model in list(chosen):
+            for field in model._meta.local_many_to_many:
+                through = field.remote_field.through
+                if through._meta.auto_created and field.related_model in selected:
+                    chosen.append(through)
+        return self._dependency_order(chosen)
+
+    def _dependency_order(self, models):
+        """Parents before children (by concrete FKs); cycles keep their original order."""
+        remaining = list(models)
+        ordered = []
+        while remaining:
+            for model in remaining:
+                parents = {
+                    f.related_model
+                    for f in model._meta.concrete_fields
+                    if f.is_relation and f.related_model is not model
+                }
+                if not parents & set(remaining):
+                    break
+            else:
+                model = remaining[0]
+            ordered.append(model)
+            remaining.remove(model)
+        return ordered
+
+    def _ensure_empty_target(self):
+        for model in self.models:
+            if model._base_manager.using(self.target_alias).exists():
+                raise CommandError(
+                    f"Target table for {model_label(model)} is not empty. "
+                    "Use --resume to continue a previous transfer."
+                )
+
+    # ---- inserts ----
+
+    def _start_pk(self, model):
+        if not self.resume:
+            return None
+        last = model._base_manager.using(self.target_alias).order_by("-pk").values_list("pk", flat=True).first()
+        return last
+
+    def _insert(self, model, rows):
+        """
+        Raw executemany so auto_now/auto_now_add values are preserved as-is
+        (fixture rows missing them are filled by fill_auto_dates first).
+        rows are lists of attribute values in concrete_fields order.
+        """
+        if not rows:
+            return
+        fields = model._meta.concrete_fields
+        qn = self.target.ops.quote_name
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            qn(model._meta.db_table),
+            ", ".join(qn(f.column) for f in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        params = [
+            [f.get_db_prep_save(value, connection=self.target) for f, value in zip(fields, row)] for row in rows
+        ]
+        with transaction.atomic(using=self.target_alias), self.target.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+    def _report(self, model, count, started):
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(f"{model_label(model)}: {count} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+
+    # ---- database -> database ----
+
+    def _copy_model(self, model, source):
+        started = time.perf_counter()
+        attnames = [f.attname for f in model._meta.concrete_fields]
+        base = model._base_manager.using(source).order_by("pk")
+        last_pk = self._start_pk(model)
+        count = 0
+        while True:
+            qs = base if last_pk is None else base.filter(pk__gt=last_pk)
+            rows = [list(row) for row in qs.values_list(*attnames)[: self.batch_size]]
+            if not rows:
+                break
+            self._insert(model, rows)
+            last_pk = rows[-1][attnames.index(model._meta.pk.attname)]
+            count += len(rows)
+        self._report(model, count, started)
+        return count
+
+    # ---- fixture -> database ----
+
+    def _import_fixture(self, path):
+        selected = {model_label(m): m for m in self.models}
+        resume_from = {}
+        pending, pending_model, m2m_rows = [], None, []
+        counts = {}
+        started = time.perf_counter()
+
+        def flush():
+            if pending_model is None:
+                return
+            self._insert(pending_model, pending)
+            for through, rows in m2m_rows:
+                self._insert(through, rows)
+            counts[pending_model] = counts.get(pending_model, 0) + len(pending)
+            pending.clear()
+            m2m_rows.clear()
+
+        for raw in iter_fixture(path):
+            model = selected.get(raw.get("model", "").lower())
+            if model is None:
+                continue
+            if model is not pending_model or len(pending) >= self.batch_size:
+                flush()
+                pending_model = model
+            if model not in resume_from:
+                resume_from[model] = self._start_pk(model)
+
+            obj = next(serializers.deserialize("python", [raw], using=self.target_alias, ignorenonexistent=True))
+            instance = obj.object
+            fill_auto_dates(instance, raw.get("fields", {}))
+            if instance.pk is None or raw.get("pk") is None:
+                # natural-key rows: let Django resolve/save them one by one
+                obj.save(using=self.target_alias)
+                counts[model] = counts.get(model, 0) + 1
+                continue
+            if resume_from[model] is not None and instance.pk <= resume_from[model]:
+                continue
+            pending.append([getattr(instance, f.attname) for f in model._meta.concrete_fields])
+            for name, related_ids in (obj.m2m_data or {}).items():
+                field = model._meta.get_field(name)
+                through = field.remote_field.through
+                if not through._meta.auto_created or through not in self.models:
+                    continue
+                src, dst = field.m2m_column_name(), field.m2m_reverse_name()
+                columns = [f.column for f in through._meta.concrete_fields]
+                rows = []
+                for related_id in related_ids:
+                    values = {"id": None, src: instance.pk, dst: related_id}
+                    rows.append([values.get(col) for col in columns])
+                m2m_rows.append((through, rows))
+        flush()
+
+        for model, count in counts.items():
+            self._report(model, count, started)
+        return sum(counts.values())
+
+    # ---- database -> file ----
+
+    def _export(self, source, path):
+        started = time.perf_counter()
+        tmp = path + ".tmp"
+        total = 0
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write("[")
+            first = True
+            for model in self.models:
+                if model._meta.auto_created:
+                    continue  # exported inline as m2m lists, like dumpdata
+                m2m = [f.name for f in model._meta.local_many_to_many]
+                base = model._base_manager.using(source).order_by("pk").prefetch_related(*m2m)
+                last_pk, count, model_started = None, 0, time.perf_counter()
+                while True:
+                    qs = base if last_pk is None else base.filter(pk__gt=last_pk)
+                    batch = list(qs[: self.batch_size])
+                    if not batch:
+                        break
+                    for item in serializers.serialize("python", batch):
+                        fh.write(("\n" if first else ",\n") + json.dumps(item, cls=DjangoJSONEncoder))
+                        first = False
+                    last_pk = batch[-1].pk
+                    count += len(batch)
+                self._report(model, count, model_started)
+                total += count
+            fh.write("\n]\n")
+        os.replace(tmp, path)
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Exported {total} rows to {path} in {elapsed:.1f}s ({rate:,.0f} rows/s)"))
+
+    # ---- wrap-up ----
+
+    def _finish(self):
+        tables = [m._meta.db_table for m in self.models]
+        self.target.check_constraints(table_names=tables)
+        sequence_sql = self.target.ops.sequence_reset_sql(no_style(), self.models)
+        if sequence_sql:
+            with transaction.atomic(using=self.target_alias), self.target.cursor() as cursor:
+                for statement in sequence_sql:
+                    cursor.execute(statement)
+        self.stdout.write(f"Constraints verified; {len(sequence_sql)} sequence(s) reset.")
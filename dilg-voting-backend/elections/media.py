@@ -0,0 +1,141 @@
+# elections/media.py
+"""
+Serving MEDIA_ROOT files (photos, thumbnails) from Django.
+
+Responses carry a validator (ETag + Last-Modified) so clients revalidate with a
+304, honour single byte ranges, and content-addressed paths (blobs/, thumbs/,
+see elections.storage) are sent with a year-long `immutable` Cache-Control.
+
+With MEDIA_OFFLOAD the worker only checks the request and sets headers; the
+bytes are sent by the front proxy:
+
+  "x-accel"    nginx: X-Accel-Redirect: MEDIA_ACCEL_PREFIX + path, with
+               location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+  "x-sendfile" Apache mod_xsendfile / lighttpd: X-Sendfile: <absolute path>
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+
+IMMUTABLE_PREFIXES = ("blobs/", "thumbs/")
+# exports/ and anything else under MEDIA_ROOT stay private
+DEFAULT_PUBLIC_PREFIXES = IMMUTABLE_PREFIXES + ("candidates/", "nominations/")
+CHUNK_SIZE = 64 * 1024
+# only photos are served: anything else (say an uploaded .html) could run script on this origin
+SERVED_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def resolve(path):
+    """Absolute path of a servable media file, or None (unknown, private, unsafe or not a photo)."""
+    prefixes = tuple(getattr(settings, "MEDIA_PUBLIC_PREFIXES", DEFAULT_PUBLIC_PREFIXES))
+    if not path.startswith(prefixes) or any(part.startswith(".") for part in path.split("/")):
+        return None
+    if content_type(path) not in SERVED_CONTENT_TYPES:
+        return None
+    if path.endswith((".part", ".gc")):
+        return None  # storage temp files (elections.storage)
+    try:
+        full = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        return None
+    return full if os.path.isfile(full) else None
+
+
+def validators(path, stat):
+    """(etag, last_modified timestamp) for a file."""
+    if path.startswith(IMMUTABLE_PREFIXES):
+        # blobs/ab/<sha>.png, thumbs/ab/<sha>/sm.webp: the path already identifies the bytes
+        etag = '"%s"' % path.split("/", 2)[-1].replace("/", "-")
+    else:
+        etag = '"%x-%x"' % (stat.st_size, stat.st_mtime_ns)
+    return etag, int(stat.st_mtime)
+
+
+def cache_control(path):
+    if path.startswith(IMMUTABLE_PREFIXES):
+        max_age = getattr(settings, "MEDIA_IMMUTABLE_MAX_AGE", 365 * 24 * 3600)
+        return f"public, max-age={max_age}, immutable"
+    max_age = getattr(settings, "MEDIA_MAX_AGE", 0)
+    return f"public, max-age={max_age}" if max_age else "public, no-cache"
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single "bytes=" range, None to send the whole
+    file (no header, several ranges, other units), or "unsatisfiable".
+    """
+    match = _RANGE_RE.match((header or "").strip())
+    if not match or not size:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix: the last N bytes
+        length = int(last)
+        if not length:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return start, end
+
+
+def if_range_matches(header, etag, last_modified):
+    """If-Range: serve the range only while the client's copy is current."""
+    if not header:
+        return True
+    if header.startswith('"') or header.startswith("W/"):
+        return header == etag  # strong comparison
+    since = parse_http_date_safe(header)
+    return since is not None and since >= last_modified
+
+
+def iter_range(fh, start, length):
+    fh.seek(start)
+    try:
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def offload_headers(path, full):
+    """Header that hands the transfer to the proxy, or {} to send from Python."""
+    mode = getattr(settings, "MEDIA_OFFLOAD", "")
+    if mode == "x-accel":
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/protected-media/")
+        return {"X-Accel-Redirect": prefix.rstrip("/") + "/" + quote(path)}
+    if mode == "x-sendfile":
+        return {"X-Sendfile": full}
+    return {}
+
+
+def content_type(path):
+    kind, encoding = mimetypes.guess_type(path)
+    if encoding:  # e.g. .gz: don't let clients transparently decompress
+        return "application/octet-stream"
+    return kind or "application/octet-stream"
+
+
+def base_headers(path, etag, last_modified):
+    return {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": cache_control(path),
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
@@ -0,0 +1,271 @@
+# elections/metrics.py
+"""
+Small in-process metrics registry rendered in the Prometheus text format.
+
+Each metric keeps its samples in a dict guarded by its own lock, so recording
+is a dict update under an uncontended lock. For gunicorn (several worker
+processes) set METRICS_MULTIPROC_DIR: every worker periodically writes a
+snapshot file there and /api/metrics/ sums the snapshots of all workers.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# =======================
+#  METRIC TYPES
+# =======================
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    @staticmethod
+    def merge(into, rows):
+        for key, value in rows:
+            key = tuple(key)
+            into[key] = into.get(key, 0) + value
+
+    def render(self, values):
+        if not self.labelnames and not values:
+            yield f"{self.name} 0"
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_num(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket (non-cumulative) counts, with a trailing +Inf slot; then sum
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][idx] += 1
+            entry[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(counts), total] for key, (counts, total) in self._values.items()]
+
+    @staticmethod
+    def merge(into, rows):
+        for key, counts, total in rows:
+            key = tuple(key)
+            entry = into.get(key)
+            if entry is None:
+                into[key] = [list(counts), total]
+                continue
+            entry[0] = [a + b for a, b in zip(entry[0], counts)]
+            entry[1] += total
+
+    def render(self, values):
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                labels = _labels(self.labelnames + ("le",), key + (le,))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _num(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# =======================
+#  REGISTRY
+# =======================
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+REQUEST_LATENCY = register(
+    Histogram(
+        "hcad_http_request_duration_seconds",
+        "Request wall time per view.",
+        ("view", "method"),
+    )
+)
+RESPONSES = register(
+    Counter("hcad_http_responses_total", "Responses per view and status code.", ("view", "status"))
+)
+BALLOTS_SUBMITTED = register(
+    Counter("hcad_ballots_submitted_total", "Ballots accepted by submit_ballot.")
+)
+LOGINS = register(
+    Counter("hcad_logins_total", "Login attempts by kind and result.", ("kind", "result"))
+)
+CACHE_REQUESTS = register(
+    Counter("hcad_cache_requests_total", "Application cache lookups.", ("cache", "result"))
+)
+
+
+def observe_request(record):
+    REQUEST_LATENCY.observe(record["duration_ms"] / 1000.0, view=record["view"], method=record["method"])
+    RESPONSES.inc(view=record["view"], status=record["status"])
+    maybe_flush()
+
+
+def record_login(kind, success):
+    LOGINS.inc(kind=kind, result="success" if success else "failure")
+
+
+def record_cache(cache_name, hit):
+    CACHE_REQUESTS.inc(cache=cache_name, result="hit" if hit else "miss")
+
+
+# =======================
+#  MULTIPROCESS SNAPSHOTS
+# =======================
+
+_PROCESS_TOKEN = uuid.uuid4().hex[:8]
+_last_flush = 0.0
+
+
+def multiproc_dir():
+    return getattr(settings, "METRICS_MULTIPROC_DIR", None) or None
+
+
+def snapshot():
+    return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+
+def flush(path=None):
+    """
+    Write this process's samples to METRICS_MULTIPROC_DIR (atomic rename).
+    """
+    global _last_flush
+    directory = path or multiproc_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"metrics_{os.getpid()}_{_PROCESS_TOKEN}.json")
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(snapshot(), fh)
+    os.replace(tmp, target)
+    _last_flush = time.monotonic()
+
+
+def maybe_flush():
+    if not multiproc_dir():
+        return
+    interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+    if time.monotonic() - _last_flush >= interval:
+        flush()
+
+
+def collect():
+    """
+    Return {metric name: merged values}, summing all worker snapshots in
+    multiprocess mode or reading the local registry otherwise.
+    """
+    directory = multiproc_dir()
+    if directory:
+        flush(directory)
+        snapshots = []
+        for filename in os.listdir(directory):
+            if not (filename.startswith("metrics_") and filename.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(directory, filename), encoding="utf-8") as fh:
+                    snapshots.append(json.load(fh))
+            except (OSError, ValueError):
+                continue
+    else:
+        snapshots = [snapshot()]
+
+    merged = {}
+    for metric in REGISTRY:
+        values = merged[metric.name] = {}
+        for snap in snapshots:
+            metric.merge(values, snap.get(metric.name, []))
+    return merged
+
+
+def render_metrics(gauges=()):
+    """
+    Render the registry plus scrape-time gauges given as
+    (name, documentation, [(labels dict, value), ...]) tuples.
+    """
+    merged = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render(merged[metric.name]))
+
+    cache_values = merged[CACHE_REQUESTS.name]
+    ratios = []
+    for cache_name in sorted({key[0] for key in cache_values}):
+        hits = cache_values.get((cache_name, "hit"), 0)
+        misses = cache_values.get((cache_name, "miss"), 0)
+        ratios.append(({"cache": cache_name}, hits / (hits + misses) if hits + misses else 0.0))
+    gauges = list(gauges) + [("hcad_cache_hit_ratio", "Hit ratio per application cache.", ratios)]
+
+    for name, documentation, samples in gauges:
+        lines.append(f"# HELP {name} {documentation}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            names = tuple(labels.keys())
+            lines.append(f"{name}{_labels(names, tuple(labels.values()))} {_num(value)}")
+    return "\n".join(lines) + "\n"
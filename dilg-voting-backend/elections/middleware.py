@@ -0,0 +1,339 @@
+# elections/middleware.py
+import cProfile
+import json
+import logging
+import random
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+
+from . import metrics, profiling
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+perf_logger = logging.getLogger("elections.perf")
+
+
+# =======================
+#  HELPERS
+# =======================
+
+class QueryTimer:
+    """
+    connection.execute_wrapper hook that counts queries and sums their duration.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def resolve_view_name(request):
+    """
+    Return the URL name from elections/urls.py (falls back to the dotted view path).
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.url_name or match.view_name or "unresolved"
+
+
+def response_size(response):
+    if getattr(response, "streaming", False):
+        return None
+    return len(response.content)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+# =======================
+#  PERFORMANCE MIDDLEWARE
+# =======================
+
+class PerformanceMiddleware:
+    """
+    Per-request instrumentation:
+    - wall time, DB query count and DB time (via connection.execute_wrapper)
+    - serialize time (DRF response rendering) and response size
+    - tagged with the resolved URL name
+
+    Emits one structured log line per request on the "elections.perf" logger,
+    a Server-Timing header, and a warning when the query budget is exceeded.
+    Budgets: PERF_QUERY_BUDGET (global) and PERF_QUERY_BUDGETS (per URL name).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_budget = getattr(settings, "PERF_QUERY_BUDGET", 50)
+        self.view_budgets = getattr(settings, "PERF_QUERY_BUDGETS", {})
+        self.server_timing = getattr(settings, "PERF_SERVER_TIMING", True)
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._perf_serialize = 0.0
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(timer))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        view_name = resolve_view_name(request)
+        budget = self.view_budgets.get(view_name, self.query_budget)
+        serialize = request._perf_serialize
+        record = {
+            "view": view_name,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": _ms(total),
+            "db_queries": timer.count,
+            "db_ms": _ms(timer.duration),
+            "serialize_ms": _ms(serialize),
+            "response_bytes": response_size(response),
+            "query_budget": budget,
+            "over_query_budget": bool(budget) and timer.count > budget,
+        }
+        self.record(request, response, record)
+
+        if self.server_timing:
+            app = max(total - timer.duration - serialize, 0.0)
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={_ms(timer.duration)};desc="{timer.count} queries"',
+                    f"serialize;dur={_ms(serialize)}",
+                    f"app;dur={_ms(app)}",
+                    f"total;dur={_ms(total)}",
+                ]
+            )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses render (JSON encode) after the view returns; time that phase.
+        started = time.perf_counter()
+
+        def _rendered(_response):
+            request._perf_serialize = time.perf_counter() - started
+
+        response.add_post_render_callback(_rendered)
+        return response
+
+    def record(self, request, response, record):
+        request.perf = record
+        metrics.observe_request(record)
+        line = json.dumps(record, sort_keys=True)
+        if record["over_query_budget"]:
+            perf_logger.warning(line, extra={"perf": record})
+        else:
+            perf_logger.info(line, extra={"perf": record})
+
+
+# =======================
+#  PROFILING MIDDLEWARE
+# =======================
+
+PROFILE_MODES = ("store", "inline")
+
+
+class ProfilingMiddleware:
+    """
+    Staff-only per-request profiling. Send "X-Profile: store|inline" (or
+    ?_profile=store|inline) together with a valid X-Admin-Token:
+    - store: the report is written to the profile store; its id is returned
+      in the X-Profile-Id header alongside the normal response
+    - inline: the response body is replaced by the profiling report
+
+    PROFILE_SAMPLE_RATE = N additionally profiles 1 in N requests and stores
+    the report. Keep this middleware last so it only wraps the view call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PROFILE_SAMPLE_RATE", 0)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def requested_mode(self, request):
+        mode = (request.headers.get("X-Profile") or request.GET.get("_profile") or "").strip().lower()
+        if not mode:
+            return None, None
+        if mode in ("1", "true", "yes"):
+            mode = "store"
+        if mode not in PROFILE_MODES:
+            return None, None
+        from .views import get_admin_from_request
+
+        admin_user = get_admin_from_request(request)
+        if not admin_user:
+            return None, None
+        return mode, admin_user
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mode, admin_user = self.requested_mode(request)
+        sampled = False
+        if not mode and self.sample_rate and random.randrange(self.sample_rate) == 0:
+            mode, sampled = "store", True
+        if not mode:
+            return None
+
+        profiler = cProfile.Profile()
+        sql = profiling.SqlCapture()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(sql))
+            response = profiler.runcall(view_func, request, *view_args, **view_kwargs)
+            if callable(getattr(response, "render", None)):
+                response = profiler.runcall(response.render)
+        duration = time.perf_counter() - start
+
+        report = profiling.build_report(
+            request=request,
+            view_name=resolve_view_name(request),
+            response=response,
+            profiler=profiler,
+            sql=sql,
+            duration=duration,
+            sampled=sampled,
+            admin_user=admin_user,
+        )
+        if mode == "inline":
+            return JsonResponse(report)
+        response["X-Profile-Id"] = profiling.store_report(report)
+        return response
+
+
+# =======================
+#  COMPRESSION MIDDLEWARE
+# =======================
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when the `brotli` module is installed) or gzip for text responses.
+
+    - bodies under COMPRESS_MIN_SIZE bytes are left alone (headers would eat
+      the gain), as are bodies that would not get smaller;
+    - streaming responses (CSV exports) are compressed incrementally, flushing
+      every COMPRESS_STREAM_FLUSH_BYTES of input so rows keep flowing without
+      a flush per row hurting the ratio;
+    - ranges, 304s and already-encoded responses pass through; strong ETags
+      become weak, the compressed bytes differ from the identity ones.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "COMPRESS_MIN_SIZE", 860)
+        self.gzip_level = getattr(settings, "COMPRESS_GZIP_LEVEL", 6)
+        self.brotli_quality = getattr(settings, "COMPRESS_BROTLI_QUALITY", 5)
+        self.flush_bytes = getattr(settings, "COMPRESS_STREAM_FLUSH_BYTES", 16 * 1024)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = self.choose(request.headers.get("Accept-Encoding"))
+        if coding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(response.streaming_content, coding)
+            if response.has_header("Content-Length"):
+                del response.headers["Content-Length"]
+        else:
+            body = self.compress(response.content, coding)
+            if len(body) >= len(response.content):
+                return response
+            response.content = body
+            response.headers["Content-Length"] = str(len(body))
+        response.headers["Content-Encoding"] = coding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
+
+    def compressible(self, response):
+        if response.has_header("Content-Encoding") or response.has_header("Content-Range"):
+            return False
+        if response.status_code in (204, 206, 304) or getattr(response, "is_async", False):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return False
+        return response.streaming or len(response.content) >= self.min_size
+
+    def choose(self, header):
+        accepted = accepted_encodings(header)
+        for coding in ("br", "gzip") if brotli is not None else ("gzip",):
+            if accepted.get(coding, accepted.get("*", 0)) > 0:
+                return coding
+        return None
+
+    def compressor(self, coding):
+        if coding == "br":
+            return brotli.Compressor(quality=self.brotli_quality, mode=brotli.MODE_TEXT)
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+
+    def compress(self, data, coding):
+        if coding == "br":
+            return brotli.compress(data, quality=self.brotli_quality, mode=brotli.MODE_TEXT)
+        compressor = self.compressor(coding)
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_stream(self, chunks, coding):
+        compressor = self.compressor(coding)
+        if coding == "br":
+            feed, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            feed, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+        pending = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            out = feed(chunk)
+            pending += len(chunk)
+            if pending >= self.flush_bytes:
+                out += flush()
+                pending = 0
+            if out:
+                yield out
+        yield finish()
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0010_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BallotBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('minute', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ballot_buckets', to='elections.election')),
+            ],
+            options={
+                'ordering': ['minute'],
+                'unique_together': {('election', 'minute')},
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def backfill_participation(apps, schema_editor):
+    """
+    One Participation per (election, voter) that has votes, stamped with the
+    first vote. Voters flagged has_voted without vote rows are attributed to
+    the active (or latest) election.
+    """
+    Election = apps.get_model("elections", "Election")
+    Participation = apps.get_model("elections", "Participation")
+    Vote = apps.get_model("elections", "Vote")
+    Voter = apps.get_model("elections", "Voter")
+
+    seen = set()
+    batch = []
+    pairs = (
+        Vote.objects.values_list("position__election_id", "voter_id")
+        .annotate(first=Min("created_at"))
+        .order_by()
+    )
+    for election_id, voter_id, first in pairs.iterator(chunk_size=2000):
+        seen.add(voter_id)
+        batch.append(Participation(election_id=election_id, voter_id=voter_id, created_at=first))
+        if len(batch) >= 2000:
+            Participation.objects.bulk_create(batch)
+            batch = []
+
+    election = (
+        Election.objects.filter(is_active=True).order_by("-nomination_start").first()
+        or Election.objects.order_by("-nomination_start", "-id").first()
+    )
+    if election:
+        for voter_id in Voter.objects.filter(has_voted=True).values_list("id", flat=True).iterator(chunk_size=2000):
+            if voter_id not in seen:
+                batch.append(Participation(election_id=election.id, voter_id=voter_id))
+    Participation.objects.bulk_create(batch, batch_size=2000)
+
+
+def restore_has_voted(apps, schema_editor):
+    Participation = apps.get_model("elections", "Participation")
+    Voter = apps.get_model("elections", "Voter")
+    Voter.objects.filter(id__in=Participation.objects.values("voter_id")).update(has_voted=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0011_ballotbucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Participation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to='elections.election')),
+                ('voter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participations', to='elections.voter')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['election', 'created_at'], name='participation_election_time')],
+                'constraints': [models.UniqueConstraint(fields=('election', 'voter'), name='unique_participation_per_election')],
+            },
+        ),
+        migrations.RunPython(backfill_participation, restore_has_voted),
+        migrations.RemoveField(
+            model_name='voter',
+            name='has_voted',
+        ),
+    ]
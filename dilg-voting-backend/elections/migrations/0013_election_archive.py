@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0012_participation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='election',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ElectionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed')], default='running', max_length=20)),
+                ('path', models.CharField(max_length=500)),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('state', models.JSONField(blank=True, default=dict)),
+                ('checksum', models.CharField(blank=True, max_length=64)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('election', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='elections.election')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ElectionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_voters', models.PositiveIntegerField(default=0)),
+                ('ballots_cast', models.PositiveIntegerField(default=0)),
+                ('turnout_percent', models.FloatField(default=0)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('built_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('election', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='elections.election')),
+            ],
+            options={
+                'ordering': ['-built_at'],
+            },
+        ),
+    ]
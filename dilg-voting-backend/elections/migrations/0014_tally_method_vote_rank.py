@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0013_election_archive'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='vote',
+            options={'ordering': ['position__display_order', 'rank', '-created_at']},
+        ),
+        migrations.AlterUniqueTogether(
+            name='vote',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='position',
+            name='tally_method',
+            field=models.CharField(choices=[('plurality', 'Plurality (at large)'), ('irv', 'Instant runoff')], default='plurality', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='rank',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('voter', 'position', 'candidate'), name='unique_vote_per_candidate'),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('voter', 'position', 'rank'), name='unique_vote_rank'),
+        ),
+    ]
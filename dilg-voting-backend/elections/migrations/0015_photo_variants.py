@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0014_tally_method_vote_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidate',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='nomination',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:25
+
+import elections.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0015_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=elections.storage.photo_storage, upload_to='candidates/'),
+        ),
+        migrations.AlterField(
+            model_name='nomination',
+            name='nominee_photo',
+            field=models.ImageField(blank=True, null=True, storage=elections.storage.photo_storage, upload_to='nominations/'),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refs', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['refs', 'released_at'], name='mediablob_refs_released')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0018_broadcasts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='candidate',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='position',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
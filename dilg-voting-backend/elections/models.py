@@ -8,6 +8,8 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .storage import photo_storage
+
 
 # -------------------------
 #  HELPERS
@@ -26,11 +28,27 @@ def generate_pin(length: int = 6):
     return "".join(secrets.choice(string.digits) for _ in range(length))
 
 
+class TouchUpdatedAt:
+    """
+    Keeps `updated_at` current on partial saves too (save(update_fields=...)),
+    so it can serve as a version for conditional GETs. Models whose `updated_at`
+    came after their fixtures use default=timezone.now instead of auto_now (a
+    field cannot have both) so loaddata fills it; save() stamps it here.
+    """
+
+    def save(self, *args, **kwargs):
+        self.updated_at = timezone.now()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "updated_at" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "updated_at"]
+        super().save(*args, **kwargs)
+
+
 # -------------------------
 #  CORE MODELS
 # -------------------------
 
-class Election(models.Model):
+class Election(TouchUpdatedAt, models.Model):
     name = models.CharField(max_length=150)
     description = models.TextField(blank=True)
     nomination_start = models.DateTimeField(null=True, blank=True)
@@ -48,6 +66,8 @@ class Election(models.Model):
         choices=(("timeline", "Timeline"), ("demo", "Demo")),
     )
     demo_phase = models.CharField(max_length=30, blank=True, null=True)
+    # set when archive_election starts moving votes out; results then come from the summary
+    archived_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -74,22 +94,42 @@ class Election(models.Model):
 
     @property
     def phase(self):
-        now = timezone.now()
+        return self.timeline()[0]
+
+    def timeline(self, now=None):
+        """
+        (phase, next_transition): the phase at `now` and the moment it ends,
+        None when nothing is scheduled to change it.
+        """
+        now = now or timezone.now()
         if not self.nomination_start or not self.nomination_end:
-            return "unconfigured"
+            return "unconfigured", None
         if now < self.nomination_start:
-            return "upcoming"
-        if self.is_nomination_open():
-            return "nomination"
+            return "upcoming", self.nomination_start
+        if now <= self.nomination_end:
+            return "nomination", self.nomination_end
         if not self.voting_start or not self.voting_end:
-            return "unconfigured"
+            return "unconfigured", None
         if now < self.voting_start:
-            return "between"
-        if self.is_voting_open():
-            return "voting"
+            return "between", self.voting_start
+        if now <= self.voting_end:
+            return "voting", self.voting_end
         if now < (self.results_at or self.voting_end):
-            return "closed_pending_results"
-        return "closed"
+            return "closed_pending_results", self.results_at
+        return "closed", None
+
+    def save(self, *args, **kwargs):
+        from .phases import invalidate_status
+
+        super().save(*args, **kwargs)
+        invalidate_status()
+
+    def delete(self, *args, **kwargs):
+        from .phases import invalidate_status
+
+        result = super().delete(*args, **kwargs)
+        invalidate_status()
+        return result
 
 
 POSITION_CHOICES = (
@@ -103,16 +143,22 @@ POSITION_CHOICES = (
 )
 
 
-class Position(models.Model):
+class Position(TouchUpdatedAt, models.Model):
     election = models.ForeignKey(
         Election,
         on_delete=models.CASCADE,
         related_name="positions",
     )
+    TALLY_CHOICES = (
+        ("plurality", "Plurality (at large)"),
+        ("irv", "Instant runoff"),
+    )
     name = models.CharField(max_length=120, choices=POSITION_CHOICES)
     is_active = models.BooleanField(default=True)
     seats = models.PositiveIntegerField(default=1)
+    tally_method = models.CharField(max_length=20, choices=TALLY_CHOICES, default="plurality")
     display_order = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ("election", "name")
@@ -131,9 +177,11 @@ class Voter(models.Model):
     phone = models.CharField(max_length=50, blank=True)
     privacy_consent = models.BooleanField(default=False)
     pin = models.CharField(max_length=128, blank=True)  # hashed
-    has_voted = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     session_token = models.CharField(max_length=36, blank=True, null=True, unique=True)
+    # Broadcast read state: every broadcast with id <= these is read / hidden for this voter
+    broadcasts_read_through = models.PositiveIntegerField(default=0)
+    broadcasts_hidden_through = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -194,7 +242,8 @@ class Nomination(models.Model):
     contact_email = models.EmailField(blank=True)
     contact_phone = models.CharField(max_length=50, blank=True)
     reason = models.TextField(blank=True)
-    nominee_photo = models.ImageField(upload_to="nominations/", blank=True, null=True)
+    nominee_photo = models.ImageField(upload_to="nominations/", storage=photo_storage, blank=True, null=True)
+    photo_variants = models.JSONField(default=dict, blank=True)  # see elections.thumbnails
     is_good_standing = models.BooleanField(default=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     rejection_reason = models.TextField(blank=True)
@@ -210,7 +259,7 @@ class Nomination(models.Model):
         return f"{self.nominee_full_name} for {self.position.get_name_display()}"
 
 
-class Candidate(models.Model):
+class Candidate(TouchUpdatedAt, models.Model):
     position = models.ForeignKey(
         Position,
         on_delete=models.CASCADE,
@@ -222,7 +271,8 @@ class Candidate(models.Model):
     contact_email = models.EmailField(blank=True)
     contact_phone = models.CharField(max_length=50, blank=True)
     bio = models.TextField(blank=True)
-    photo = models.ImageField(upload_to="candidates/", blank=True, null=True)
+    photo = models.ImageField(upload_to="candidates/", storage=photo_storage, blank=True, null=True)
+    photo_variants = models.JSONField(default=dict, blank=True)  # see elections.thumbnails
     is_official = models.BooleanField(default=True)
     source_nomination = models.OneToOneField(
         Nomination,
@@ -231,6 +281,7 @@ class Candidate(models.Model):
         blank=True,
         related_name="promoted_candidate",
     )
+    updated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["position__display_order", "full_name"]
@@ -255,16 +306,124 @@ class Vote(models.Model):
         on_delete=models.CASCADE,
         related_name="votes",
     )
+    # preference order on an instant-runoff ballot; 1..n marks on a plurality one
+    rank = models.PositiveSmallIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ("voter", "position")
-        ordering = ["position__display_order", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["voter", "position", "candidate"], name="unique_vote_per_candidate"),
+            models.UniqueConstraint(fields=["voter", "position", "rank"], name="unique_vote_rank"),
+        ]
+        ordering = ["position__display_order", "rank", "-created_at"]
 
     def __str__(self):
         return f"Vote by {self.voter} for {self.candidate} ({self.position})"
 
 
+class Participation(models.Model):
+    """
+    One row per voter who submitted a ballot in an election. The unique
+    constraint is what stops a second ballot; a new election starts empty.
+    """
+
+    election = models.ForeignKey(
+        Election,
+        on_delete=models.CASCADE,
+        related_name="participations",
+    )
+    voter = models.ForeignKey(
+        Voter,
+        on_delete=models.CASCADE,
+        related_name="participations",
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["election", "voter"], name="unique_participation_per_election"),
+        ]
+        indexes = [models.Index(fields=["election", "created_at"], name="participation_election_time")]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.voter} voted in {self.election}"
+
+
+class BallotBucket(models.Model):
+    """
+    Ballots submitted per minute, maintained by submit_ballot (rebuildable from
+    Vote.created_at with `manage.py rebuild_ballot_buckets`).
+    """
+
+    election = models.ForeignKey(
+        Election,
+        on_delete=models.CASCADE,
+        related_name="ballot_buckets",
+    )
+    minute = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("election", "minute")
+        ordering = ["minute"]
+
+    def __str__(self):
+        return f"{self.minute:%Y-%m-%d %H:%M} {self.count} ({self.election_id})"
+
+
+class ElectionSummary(models.Model):
+    """
+    Results snapshot of a closed election: totals, per-candidate votes and
+    winners. Built from the Vote table once, then served without touching it.
+    """
+
+    election = models.OneToOneField(
+        Election,
+        on_delete=models.CASCADE,
+        related_name="summary",
+    )
+    total_voters = models.PositiveIntegerField(default=0)
+    ballots_cast = models.PositiveIntegerField(default=0)
+    turnout_percent = models.FloatField(default=0)
+    data = models.JSONField(default=dict, blank=True)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-built_at"]
+
+    def __str__(self):
+        return f"Summary of {self.election}"
+
+
+class ElectionArchive(models.Model):
+    """
+    Progress of `manage.py archive_election`: rows are appended to a gzip
+    JSON-lines file and deleted batch by batch; `offset` is the file size after
+    the last committed batch so an interrupted run can resume cleanly.
+    """
+
+    STATUS_CHOICES = (
+        ("running", "Running"),
+        ("completed", "Completed"),
+    )
+    election = models.OneToOneField(
+        Election,
+        on_delete=models.CASCADE,
+        related_name="archive",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+    path = models.CharField(max_length=500)
+    offset = models.PositiveBigIntegerField(default=0)
+    state = models.JSONField(default=dict, blank=True)  # {model: {"last_pk": .., "rows": .., "photos": [..]}}
+    checksum = models.CharField(max_length=64, blank=True)
+    started_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Archive of {self.election} ({self.status})"
+
+
 class ElectionReminder(models.Model):
     election = models.ForeignKey(
         Election,
@@ -301,6 +460,34 @@ class Notification(models.Model):
         return f"[{self.type}] {self.message[:50]}"
 
 
+class Broadcast(models.Model):
+    """
+    One announcement shown to every voter, stored once. Per-voter state is
+    compact: the watermarks on Voter cover "mark all read" / "delete all", and
+    a BroadcastReceipt row exists only for a broadcast read or hidden on its own.
+    """
+    type = models.CharField(max_length=80, default="announcement")
+    message = models.TextField()
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+
+    def __str__(self):
+        return f"[{self.type}] {self.message[:50]}"
+
+
+class BroadcastReceipt(models.Model):
+    """A voter read (or hid) one broadcast above their watermark."""
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name="receipts")
+    voter = models.ForeignKey(Voter, on_delete=models.CASCADE, related_name="broadcast_receipts")
+    is_hidden = models.BooleanField(default=False)
+
+    class Meta:
+        unique_together = ("voter", "broadcast")
+
+
 # -------------------------
 #  DJANGO-USER ADMIN SESSIONS
 # -------------------------
@@ -346,3 +533,62 @@ class AccessGate(models.Model):
 
     def __str__(self):
         return f"AccessGate {self.name} v{self.version}"
+
+
+# -------------------------
+#  BACKGROUND JOBS
+# -------------------------
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    )
+    kind = models.CharField(max_length=60)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    payload = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="jobs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["status", "run_after"], name="job_status_run_after")]
+
+    def __str__(self):
+        return f"Job {self.id} {self.kind} ({self.status})"
+
+
+# -------------------------
+#  MEDIA
+# -------------------------
+class MediaBlob(models.Model):
+    """
+    One content-addressed photo file (elections.storage). `refs` counts the
+    photo fields naming it; `released_at` is when it last lost a reference.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField(default=0)
+    refs = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["refs", "released_at"], name="mediablob_refs_released")]
+
+    def __str__(self):
+        return f"{self.name} ({self.refs} refs)"
@@ -0,0 +1,103 @@
+# elections/phases.py
+"""
+Election status for the status bar (GET election-status/): phase, the next
+phase boundary and the seconds left until it.
+
+The phase only changes at a boundary or when the election is edited, so the
+status is computed once and cached until the next boundary (capped by
+ELECTION_STATUS_MAX_AGE, which also bounds staleness with a per-process cache).
+Election.save()/delete() bump the version; queryset .update() calls do not.
+"""
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import caching, metrics
+
+STATUS_NAMESPACE = "election_status"
+
+# Election.timeline() phases as the status bar shows them
+STATUS_BY_PHASE = {
+    "unconfigured": "upcoming",
+    "upcoming": "upcoming",
+    "nomination": "active",
+    "between": "active",
+    "voting": "active",
+    "closed_pending_results": "ended",
+    "closed": "ended",
+}
+
+_datetime = serializers.DateTimeField()
+
+
+def iso(value):
+    return _datetime.to_representation(value) if value else None
+
+
+def max_age():
+    return getattr(settings, "ELECTION_STATUS_MAX_AGE", 60)
+
+
+def build_status(election, now):
+    if not election:
+        return {
+            "has_election": False,
+            "id": None,
+            "name": "",
+            "status": "none",
+            "is_active": False,
+            "phase": None,
+            "start_at": None,
+            "end_at": None,
+            "next_transition": None,
+        }
+    phase, next_transition = election.timeline(now)
+    status = STATUS_BY_PHASE[phase]
+    return {
+        "has_election": True,
+        "id": election.id,
+        "name": election.name,
+        "status": status,
+        "is_active": status == "active",
+        "phase": phase,
+        "start_at": iso(election.nomination_start or election.voting_start),
+        "end_at": iso(election.voting_end or election.nomination_end),
+        "next_transition": next_transition,
+    }
+
+
+def seconds_until(moment, now):
+    return max(math.ceil((moment - now).total_seconds()), 0) if moment else None
+
+
+def ttl(remaining):
+    """Cache lifetime: up to the next boundary, at most ELECTION_STATUS_MAX_AGE."""
+    return max_age() if remaining is None else min(remaining, max_age())
+
+
+def current_status(load_election):
+    """
+    The status dict (next_transition still a datetime), from the cache while
+    the phase it recorded holds. `load_election()` is only called on a miss.
+    """
+    now = timezone.now()
+    key = f"{caching.KEY_PREFIX}:{STATUS_NAMESPACE}:{caching.version(STATUS_NAMESPACE)}"
+    status = cache.get(key)
+    # the cache rounds timeouts to seconds; never serve a phase past its boundary
+    hit = status is not None and not (status["next_transition"] and now > status["next_transition"])
+    metrics.record_cache(STATUS_NAMESPACE, hit)
+    if not hit:
+        status = build_status(load_election(), now)
+        timeout = ttl(seconds_until(status["next_transition"], now))
+        if timeout:
+            cache.set(key, status, timeout)
+    return status, now
+
+
+def invalidate_status():
+    """Call after an election changes; deferred to commit like invalidate_turnout."""
+    transaction.on_commit(lambda: caching.bump(STATUS_NAMESPACE))
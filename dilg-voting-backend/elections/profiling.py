@@ -0,0 +1,141 @@
+# elections/profiling.py
+"""
+On-demand request profiling: run a view under cProfile while capturing its SQL,
+then build a report with the top-N hot functions. Reports are returned inline
+or written to a rotating on-disk store (PROFILE_STORE_DIR).
+"""
+import cProfile
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+PROFILE_ID_RE = re.compile(r"^[0-9]{20}-[0-9a-f]{8}$")
+
+
+class SqlCapture:
+    """
+    connection.execute_wrapper hook that records each statement and its duration.
+    Parameters are deliberately not kept (they can contain PIN hashes and tokens).
+    """
+
+    def __init__(self, limit=500):
+        self.limit = limit
+        self.queries = []
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if len(self.queries) < self.limit:
+                self.queries.append(
+                    {"sql": sql[:2000], "many": many, "duration_ms": round(elapsed * 1000, 3)}
+                )
+
+
+def top_functions(profiler: cProfile.Profile, limit: int):
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    out = []
+    for (filename, lineno, func), (prim_calls, ncalls, tottime, cumtime, _callers) in rows:
+        out.append(
+            {
+                "function": f"{filename}:{lineno}({func})",
+                "ncalls": ncalls,
+                "primitive_calls": prim_calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+        )
+    return out
+
+
+def build_report(*, request, view_name, response, profiler, sql, duration, sampled, admin_user):
+    now = timezone.now()
+    top_n = getattr(settings, "PROFILE_TOP_N", 30)
+    return {
+        "id": f"{now:%Y%m%d%H%M%S%f}-{uuid.uuid4().hex[:8]}",
+        "created_at": now.isoformat(),
+        "view": view_name,
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "sampled": sampled,
+        "profiled_by": admin_user.username if admin_user else None,
+        "duration_ms": round(duration * 1000, 2),
+        "sql_count": sql.count,
+        "sql_ms": round(sql.duration * 1000, 2),
+        "functions": top_functions(profiler, top_n),
+        "sql": sql.queries,
+    }
+
+
+# =======================
+#  ON-DISK STORE
+# =======================
+
+def store_dir():
+    return str(getattr(settings, "PROFILE_STORE_DIR", settings.BASE_DIR / "profiles"))
+
+
+def store_report(report):
+    """
+    Write a report and drop the oldest files beyond PROFILE_STORE_MAX_FILES.
+    """
+    directory = store_dir()
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f"{report['id']}.json")
+    tmp = target + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(report, fh)
+    os.replace(tmp, target)
+
+    keep = getattr(settings, "PROFILE_STORE_MAX_FILES", 200)
+    names = sorted(n for n in os.listdir(directory) if n.endswith(".json"))
+    for name in names[: max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+    return report["id"]
+
+
+def list_reports():
+    directory = store_dir()
+    if not os.path.isdir(directory):
+        return []
+    summaries = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        report = load_report(name[: -len(".json")])
+        if report is None:
+            continue
+        summaries.append(
+            {
+                key: report.get(key)
+                for key in ("id", "created_at", "view", "method", "path", "status", "sampled", "duration_ms", "sql_count", "sql_ms")
+            }
+        )
+    return summaries
+
+
+def load_report(profile_id):
+    if not PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    try:
+        with open(os.path.join(store_dir(), f"{profile_id}.json"), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
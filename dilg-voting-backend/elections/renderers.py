@@ -0,0 +1,46 @@
+# elections/renderers.py
+"""
+JSON renderer for the API (REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]).
+
+With orjson installed (JSON_BACKEND "auto" or "orjson") responses are encoded
+by orjson; values it does not know (Decimal, lazy translation strings, ...) go
+through DRF's encoder, so the output matches DRF's JSONRenderer: compact,
+UTF-8, "Z" for UTC datetimes, U+2028/U+2029 escaped. Without orjson, or when a
+client asks for indentation, DRF's own renderer does the work.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # optional: DRF's renderer produces the same JSON
+    orjson = None
+
+_encoder = encoders.JSONEncoder()
+
+
+def backend():
+    """"orjson" or "json" according to JSON_BACKEND and what is installed."""
+    wanted = getattr(settings, "JSON_BACKEND", "auto")
+    if wanted == "json" or orjson is None:
+        return "json"
+    return "orjson"
+
+
+def dumps(data):
+    """Compact UTF-8 JSON bytes for `data`, with the configured backend."""
+    if backend() == "json":
+        return JSONRenderer().render(data)
+    out = orjson.dumps(data, default=_encoder.default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    # same escaping as DRF: these break JavaScript string literals
+    return out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if backend() == "json" or self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
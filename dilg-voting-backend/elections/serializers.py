@@ -1,7 +1,11 @@
 # elections/serializers.py
+import os
+
 from rest_framework import serializers
 
+from . import thumbnails, uploads
 from .models import (
+    Broadcast,
     Election,
     Position,
     Candidate,
@@ -9,7 +13,9 @@ from .models import (
     Vote,
     Nomination,
     ElectionReminder,
+    ElectionSummary,
     Notification,
+    Job,
 )
 
 
@@ -34,6 +40,41 @@ class ElectionSerializer(serializers.ModelSerializer):
             "mode",
             "demo_phase",
             "phase",
+            "archived_at",
+        ]
+        read_only_fields = ["archived_at"]
+
+
+class ElectionSummarySerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="election.id", read_only=True)
+    name = serializers.CharField(source="election.name", read_only=True)
+    voting_start = serializers.DateTimeField(source="election.voting_start", read_only=True)
+    voting_end = serializers.DateTimeField(source="election.voting_end", read_only=True)
+    results_published_at = serializers.DateTimeField(source="election.results_published_at", read_only=True)
+    winners = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ElectionSummary
+        fields = [
+            "id",
+            "name",
+            "voting_start",
+            "voting_end",
+            "results_published_at",
+            "total_voters",
+            "ballots_cast",
+            "turnout_percent",
+            "winners",
+            "built_at",
+        ]
+
+    def get_winners(self, obj):
+        return [
+            {
+                "position": pos["position"],
+                "candidates": [c["full_name"] for c in pos["candidates"] if c["winner"]],
+            }
+            for pos in obj.data.get("positions", [])
         ]
 
 
@@ -49,6 +90,7 @@ class PositionSerializer(serializers.ModelSerializer):
             "name_display",
             "is_active",
             "seats",
+            "tally_method",
             "display_order",
         ]
 
@@ -56,6 +98,7 @@ class PositionSerializer(serializers.ModelSerializer):
 class CandidateSerializer(serializers.ModelSerializer):
     position_name = serializers.CharField(source="position.get_name_display", read_only=True)
     photo_url = serializers.SerializerMethodField()
+    photo_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Candidate
@@ -71,6 +114,7 @@ class CandidateSerializer(serializers.ModelSerializer):
             "bio",
             "photo",
             "photo_url",
+            "photo_variants",
             "is_official",
             "source_nomination",
         ]
@@ -82,8 +126,15 @@ class CandidateSerializer(serializers.ModelSerializer):
         url = obj.photo.url
         return request.build_absolute_uri(url) if request else url
 
+    def get_photo_variants(self, obj):
+        request = self.context.get("request")
+        return thumbnails.variant_urls(obj.photo_variants, request.build_absolute_uri if request else None)
+
 
 class VoterSerializer(serializers.ModelSerializer):
+    # participation in the active election, annotated/set by the view
+    has_voted = serializers.BooleanField(read_only=True, default=False)
+
     class Meta:
         model = Voter
         fields = [
@@ -103,6 +154,8 @@ class VoterSerializer(serializers.ModelSerializer):
 
 
 class VoterMeSerializer(serializers.ModelSerializer):
+    has_voted = serializers.BooleanField(read_only=True, default=False)
+
     class Meta:
         model = Voter
         fields = [
@@ -146,6 +199,7 @@ class VoteSerializer(serializers.ModelSerializer):
 
 class AdminVoterCreateSerializer(serializers.ModelSerializer):
     pin = serializers.CharField(write_only=True, required=False, allow_blank=True, max_length=12)
+    has_voted = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Voter
@@ -169,6 +223,7 @@ class NominationSerializer(serializers.ModelSerializer):
     position_name = serializers.CharField(source="position.get_name_display", read_only=True)
     election_name = serializers.CharField(source="election.name", read_only=True)
     nominator_name = serializers.CharField(source="nominator.name", read_only=True)
+    photo_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Nomination
@@ -187,6 +242,7 @@ class NominationSerializer(serializers.ModelSerializer):
             "contact_phone",
             "reason",
             "nominee_photo",
+            "photo_variants",
             "is_good_standing",
             "status",
             "rejection_reason",
@@ -196,6 +252,10 @@ class NominationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["nominator", "election", "created_at"]
 
+    def get_photo_variants(self, obj):
+        request = self.context.get("request")
+        return thumbnails.variant_urls(obj.photo_variants, request.build_absolute_uri if request else None)
+
 
 class NominationCreateSerializer(serializers.Serializer):
     position_id = serializers.IntegerField()
@@ -205,12 +265,53 @@ class NominationCreateSerializer(serializers.Serializer):
     contact_email = serializers.EmailField(required=False, allow_blank=True)
     contact_phone = serializers.CharField(required=False, allow_blank=True)
     reason = serializers.CharField(required=False, allow_blank=True)
-    nominee_photo = serializers.ImageField(required=False, allow_null=True)
+    # checked from its header only (elections.uploads); decoded in the background job
+    nominee_photo = serializers.FileField(required=False, allow_null=True)
     is_good_standing = serializers.BooleanField(required=False)
 
+    def validate_nominee_photo(self, value):
+        if value is not None and os.path.splitext(value.name)[1].lower() not in uploads.ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError(uploads.UNSUPPORTED)
+        if value is not None and not hasattr(value, "image_format"):
+            # not streamed through BoundedPhotoUploadHandler
+            if value.size > uploads.max_bytes():
+                raise serializers.ValidationError("Photo is too large.")
+            try:
+                uploads.inspect_file(value)
+            except uploads.RejectedUpload as exc:
+                raise serializers.ValidationError(str(exc))
+        return value
+
+
+class BallotChoiceField(serializers.Field):
+    """
+    A candidate id, or a list of ids: the marks of a multi-seat plurality
+    position or a runoff ranking (most preferred first).
+    """
+
+    default_error_messages = {
+        "invalid": "Expected a candidate id or a list of candidate ids.",
+        "duplicate": "A candidate can only be chosen once per position.",
+    }
+
+    def to_internal_value(self, data):
+        items = data if isinstance(data, list) else [data]
+        if not items or any(isinstance(item, (bool, dict, list)) for item in items):
+            self.fail("invalid")
+        try:
+            ids = [int(item) for item in items]
+        except (TypeError, ValueError):
+            self.fail("invalid")
+        if len(set(ids)) != len(ids):
+            self.fail("duplicate")
+        return ids
+
+    def to_representation(self, value):
+        return value
+
 
 class BallotSubmitSerializer(serializers.Serializer):
-    votes = serializers.DictField(child=serializers.IntegerField())
+    votes = serializers.DictField(child=BallotChoiceField())
 
     def validate(self, attrs):
         if not attrs.get("votes"):
@@ -236,3 +337,54 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = ["id", "type", "message", "is_read", "is_hidden", "created_at"]
         read_only_fields = ["id", "created_at"]
+
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    created_by = serializers.CharField(source="created_by.username", default=None, read_only=True)
+    read_count = serializers.IntegerField(read_only=True, default=None)
+
+    class Meta:
+        model = Broadcast
+        fields = ["id", "type", "message", "created_by", "created_at", "read_count"]
+        read_only_fields = ["id", "created_at"]
+
+
+class BroadcastFeedSerializer(serializers.ModelSerializer):
+    """A broadcast in a voter's notification feed (see elections.broadcasts.feed)."""
+
+    id = serializers.CharField(source="feed_id", read_only=True)
+    is_read = serializers.BooleanField(read_only=True)
+    is_hidden = serializers.BooleanField(read_only=True)
+    broadcast = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = ["id", "type", "message", "is_read", "is_hidden", "created_at", "broadcast"]
+
+
+class JobSerializer(serializers.ModelSerializer):
+    created_by = serializers.CharField(source="created_by.username", default=None, read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "kind",
+            "status",
+            "progress",
+            "total",
+            "attempts",
+            "max_attempts",
+            "run_after",
+            "created_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+
+class JobDetailSerializer(JobSerializer):
+    class Meta(JobSerializer.Meta):
+        fields = JobSerializer.Meta.fields + ["payload", "result", "error"]
+        read_only_fields = fields
@@ -0,0 +1,298 @@
+# elections/storage.py
+"""
+Content-addressed storage for candidate and nominee photos.
+
+Uploads are stored under their SHA-256, blobs/<xx>/<sha256><ext>, so the same
+bytes are written once however many rows point at them (re-uploads, promoted
+nominee photos) and a blob's URL never changes content: it can be cached for
+a year (see MEDIA_IMMUTABLE_MAX_AGE).
+
+Every blob has a MediaBlob row whose `refs` counts the photo fields naming it.
+Saving an upload retains it; views call `retain` / `release` when a row starts
+or stops sharing a blob. Rows removed in bulk (cascades, election resets) are
+not tracked, so `manage.py gc_media` recounts the references from the photo
+fields (and from archived nominations, see elections.archive) before deleting
+blobs nobody has pointed at for MEDIA_GC_GRACE seconds.
+"""
+import hashlib
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from . import uploads
+
+BLOB_PREFIX = "blobs/"
+
+
+def blob_name(digest, ext=""):
+    return f"{BLOB_PREFIX}{digest[:2]}/{digest}{ext}"
+
+
+def blob_hash(name):
+    """SHA-256 encoded in a blob name, or None for files stored the old way."""
+    if not name or not name.startswith(BLOB_PREFIX):
+        return None
+    digest = os.path.splitext(os.path.basename(name))[0]
+    return digest if len(digest) == 64 else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files after their content instead of the upload name."""
+
+    def get_available_name(self, name, max_length=None):
+        return name  # identical content gets the identical name on purpose
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, "seek"):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+        # the extension decides the served Content-Type, so it comes from the bytes
+        fmt = getattr(content, "image_format", None) or uploads.sniff_format(content)
+        ext = uploads.FORMAT_EXTENSIONS.get(fmt, ".bin")
+        # count the reference first: a concurrent gc_media then keeps the file
+        name = register(blob_name(digest.hexdigest(), ext), digest.hexdigest(), size)
+        if not self.exists(name):
+            self._write(name, content)
+        return name
+
+    def _write(self, name, content):
+        """Write through a temporary file so a blob is either complete or absent."""
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        if self.directory_permissions_mode is not None:
+            os.chmod(directory, self.directory_permissions_mode)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                content.seek(0)
+                for chunk in content.chunks():
+                    fh.write(chunk)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.chmod(tmp, self.file_permissions_mode or 0o644)
+            os.replace(tmp, path)  # same bytes if another writer won
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+
+photo_storage_instance = ContentAddressedStorage()
+
+
+def photo_storage():
+    """Storage callable for the photo ImageFields (keeps the instance out of migrations)."""
+    return photo_storage_instance
+
+
+# =======================
+#  REFERENCE COUNTS
+# =======================
+
+def register(name, digest, size):
+    """
+    Count one new reference to the blob with `digest`, creating its row, and
+    return the blob's name (the first upload's extension wins).
+    """
+    from .models import MediaBlob
+
+    if MediaBlob.objects.filter(sha256=digest).update(refs=F("refs") + 1, released_at=None):
+        return MediaBlob.objects.filter(sha256=digest).values_list("name", flat=True).first() or name
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(sha256=digest, name=name, size=size, refs=1)
+    except IntegrityError:  # created concurrently
+        return register(name, digest, size)
+    return name
+
+
+def retain(name):
+    """Another row now points at the blob `name` (no-op for non-blob files)."""
+    retain_many([name])
+
+
+def release(name):
+    """A row stopped pointing at the blob `name`; gc_media removes it once unreferenced."""
+    release_many([name])
+
+
+def _by_count(names):
+    """{count: [sha256, ...]} for the blob names in `names` (repeats count)."""
+    counts = Counter(digest for digest in map(blob_hash, names) if digest)
+    groups = {}
+    for digest, count in counts.items():
+        groups.setdefault(count, []).append(digest)
+    return groups
+
+
+def retain_many(names):
+    """retain() for several names in one UPDATE per distinct repeat count."""
+    from .models import MediaBlob
+
+    for count, digests in _by_count(names).items():
+        MediaBlob.objects.filter(sha256__in=digests).update(refs=F("refs") + count, released_at=None)
+
+
+def release_many(names):
+    """release() for several names in one UPDATE per distinct repeat count."""
+    from .models import MediaBlob
+
+    for count, digests in _by_count(names).items():
+        MediaBlob.objects.filter(sha256__in=digests, refs__gt=0).update(
+            refs=Greatest(F("refs") - count, 0), released_at=timezone.now()
+        )
+
+
+def photo_references():
+    """
+    {sha256: count} over every photo field plus the photos of archived rows,
+    the source of truth for `refs`.
+    """
+    from .jobs import PHOTO_FIELDS
+    from .models import ElectionArchive
+
+    counts = {}
+
+    def count(name):
+        digest = blob_hash(name)
+        if digest:
+            counts[digest] = counts.get(digest, 0) + 1
+
+    for model, field in PHOTO_FIELDS.values():
+        names = model.objects.filter(**{f"{field}__startswith": BLOB_PREFIX}).values_list(field, flat=True)
+        for name in names.iterator():
+            count(name)
+    for state in ElectionArchive.objects.values_list("state", flat=True).iterator():
+        for source in state.values():
+            for name in source.get("photos", ()):
+                count(name)
+    return counts
+
+
+def grace_seconds():
+    return getattr(settings, "MEDIA_GC_GRACE", 86400)
+
+
+# =======================
+#  GARBAGE COLLECTION
+# =======================
+
+def _remove_blob(storage, blob):
+    """
+    Delete the file of an unreferenced blob. The file is parked under a trash
+    name first; if an upload of the same bytes registered meanwhile it is put back.
+    """
+    from .models import MediaBlob
+
+    path = storage.path(blob.name)
+    trash = f"{path}.gc"
+    try:
+        os.replace(path, trash)
+    except FileNotFoundError:
+        return
+    if MediaBlob.objects.filter(sha256=blob.sha256).exists():
+        os.replace(trash, path)
+        return
+    os.remove(trash)
+
+
+def _remove_variants(digest):
+    """Drop the thumbnails built from this blob (elections.thumbnails, same hash)."""
+    from django.core.files.storage import default_storage
+
+    base = f"thumbs/{digest[:2]}/{digest}"
+    if not default_storage.exists(base):
+        return
+    _dirs, files = default_storage.listdir(base)
+    for name in sorted(files, key=lambda n: n == "variants.json", reverse=True):  # manifest first
+        default_storage.delete(f"{base}/{name}")
+    os.rmdir(default_storage.path(base))
+
+
+def collect_garbage(dry_run=False, grace=None):
+    """
+    Recount references from the photo fields, then delete blobs (and their
+    thumbnails) that have had none for `grace` seconds. Returns
+    {"recounted": n, "deleted": n, "freed": bytes}.
+    """
+    from .models import MediaBlob
+
+    grace = grace_seconds() if grace is None else grace
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=grace)
+    actual = photo_references()
+    storage = photo_storage()
+    stats = {"recounted": 0, "deleted": 0, "freed": 0}
+
+    for blob in MediaBlob.objects.all().iterator():
+        refs = actual.get(blob.sha256, 0)
+        released_at = (blob.released_at or now) if refs == 0 else None
+        if refs != blob.refs:
+            stats["recounted"] += 1
+            if not dry_run:
+                # conditional: an upload that touched the row since the recount wins
+                MediaBlob.objects.filter(pk=blob.pk, refs=blob.refs).update(refs=refs, released_at=released_at)
+        if refs or released_at > cutoff:
+            continue
+        if not dry_run:
+            removed, _ = MediaBlob.objects.filter(pk=blob.pk, refs=0).delete()
+            if not removed:
+                continue  # referenced again in the meantime
+            _remove_blob(storage, blob)
+            _remove_variants(blob.sha256)
+        stats["deleted"] += 1
+        stats["freed"] += blob.size
+    return stats
+
+
+def adopt_legacy(dry_run=False):
+    """
+    Move photos saved before content addressing (nominations/..., candidates/...)
+    into the blob store, pointing their rows at the blob. Returns the number of
+    rows rewritten; old files are deleted once no row names them.
+    """
+    from .jobs import PHOTO_FIELDS, photo_update
+
+    storage = photo_storage()
+    moved = {}
+    rewritten = 0
+    for model, field in PHOTO_FIELDS.values():
+        rows = (
+            model.objects.exclude(**{f"{field}__isnull": True})
+            .exclude(**{field: ""})
+            .exclude(**{f"{field}__startswith": BLOB_PREFIX})
+            .values_list("pk", field)
+        )
+        for pk, name in rows.iterator():
+            if name not in moved:
+                if not storage.exists(name):
+                    continue
+                if dry_run:
+                    moved[name] = name
+                else:
+                    with storage.open(name, "rb") as fh:
+                        moved[name] = storage.save(name, fh)
+            elif not dry_run:
+                retain(moved[name])
+            if not dry_run:
+                model.objects.filter(pk=pk, **{field: name}).update(**photo_update(model, **{field: moved[name]}))
+            rewritten += 1
+
+    if not dry_run:
+        for name in moved:
+            if not any(model.objects.filter(**{field: name}).exists() for model, field in PHOTO_FIELDS.values()):
+                storage.delete(name)
+    return rewritten
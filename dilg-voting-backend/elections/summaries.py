@@ -0,0 +1,103 @@
+# elections/summaries.py
+"""
+Per-election results snapshots (ElectionSummary). A summary is built from the
+Vote table while it still holds the election's ballots; the history endpoints
+and archived elections are served from it alone.
+"""
+from django.db.models import Count
+from django.utils import timezone
+
+from . import analytics, tally
+from .models import Candidate, ElectionSummary, Participation, Position
+
+
+def voting_ended(election):
+    return bool(election.voting_end) and election.voting_end <= timezone.now()
+
+
+def build_summary(election):
+    positions = list(
+        Position.objects.filter(election=election, is_active=True).order_by("display_order", "name")
+    )
+    grouped = {pos.id: [] for pos in positions}
+    candidates = (
+        Candidate.objects.filter(position__in=list(grouped), is_official=True)
+        .annotate(votes_count=Count("votes"))
+        .order_by("full_name", "id")
+    )
+    for cand in candidates:
+        grouped[cand.position_id].append(cand)
+    outcomes = tally.tally_positions(positions, grouped)
+
+    results = []
+    for pos in positions:
+        outcome = outcomes[pos.id]
+        cand_data = [
+            {
+                "id": cand.id,
+                "full_name": cand.full_name,
+                "batch_year": cand.batch_year,
+                "campus_chapter": cand.campus_chapter,
+                "photo": cand.photo.name if cand.photo else None,
+                "photo_variants": cand.photo_variants,
+                "votes": outcome["votes"][cand.id],
+                "winner": cand.id in outcome["winners"],
+            }
+            for cand in grouped[pos.id]
+        ]
+        results.append(
+            {
+                "position_id": pos.id,
+                "position": pos.get_name_display(),
+                "seats": pos.seats,
+                "tally_method": outcome["method"],
+                "rounds": outcome.get("rounds"),
+                "total_votes": sum(c["votes"] for c in cand_data),
+                "candidates": cand_data,
+            }
+        )
+
+    turnout = analytics.build_turnout(election)
+    return {
+        "total_voters": turnout["total_voters"],
+        "ballots_cast": Participation.objects.filter(election=election).count(),
+        "turnout_percent": turnout["turnout_percent"],
+        "data": {
+            "election": {
+                "id": election.id,
+                "name": election.name,
+                "voting_start": election.voting_start.isoformat() if election.voting_start else None,
+                "voting_end": election.voting_end.isoformat() if election.voting_end else None,
+                "results_published_at": (
+                    election.results_published_at.isoformat() if election.results_published_at else None
+                ),
+            },
+            "positions": results,
+            "by_batch_year": turnout["by_batch_year"],
+            "by_chapter": turnout["by_chapter"],
+        },
+    }
+
+
+def snapshot(election):
+    """
+    (Re)build and store the election's summary. Refused once archiving has
+    started, since the Vote rows no longer tell the whole story.
+    """
+    if election.archived_at:
+        raise ValueError(f"{election.name} is archived; its summary can no longer be rebuilt")
+    fields = build_summary(election)
+    summary, _ = ElectionSummary.objects.update_or_create(
+        election=election, defaults={**fields, "built_at": timezone.now()}
+    )
+    return summary
+
+
+def snapshot_if_closed(election):
+    """
+    Called when results are published: freeze the summary once voting is over.
+    Elections published early get theirs from `manage.py build_election_summaries`.
+    """
+    if election.archived_at or not voting_ended(election):
+        return None
+    return snapshot(election)
@@ -0,0 +1,239 @@
+# elections/tally.py
+"""
+Tally engine (Position.tally_method):
+
+  plurality  plurality-at-large: a voter marks up to `seats` candidates and the
+             `seats` highest totals win; ties at the cut are all flagged.
+  irv        instant runoff. With seats > 1 it runs sequentially: each winner
+             is removed and the ballots are counted again.
+
+Runoff ballots are integer-encoded (candidate index per preference) and
+identical ballots are grouped with a weight. After the first count a round
+only moves the ballots of the eliminated candidate to their next live choice.
+NumPy does the counting when installed; otherwise the same rounds run in pure
+Python.
+"""
+from collections import Counter
+from itertools import groupby
+
+from .models import Vote
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python rounds give the same results
+    np = None
+
+PLURALITY = "plurality"
+IRV = "irv"
+
+
+def top_n(totals, seats):
+    """Indices of the `seats` highest totals, plus anyone tied at the cut (zero never wins)."""
+    ranked = sorted(totals, reverse=True)[:seats]
+    if not ranked:
+        return []
+    cut = max(ranked[-1], 1)
+    return [i for i, votes in enumerate(totals) if votes >= cut]
+
+
+# =======================
+#  RUNOFF ROUNDS
+# =======================
+
+class Ballots:
+    """
+    Distinct rankings of one position with their weights. `rankings` holds
+    tuples of candidate indices (0..k-1), most preferred first.
+    """
+
+    def __init__(self, rankings, k):
+        grouped = Counter(rankings)
+        self.k = k
+        self.rankings = list(grouped)
+        self.weights = list(grouped.values())
+        self.total = sum(self.weights)
+        self._arrays = None
+
+    def rounds(self, alive):
+        """Round counter over these ballots for the candidates flagged in `alive`."""
+        if np is not None and self.rankings:
+            return _NumpyRounds(self, alive)
+        return _PythonRounds(self, alive)
+
+    def arrays(self):
+        """(matrix, weights) for NumPy; rows are padded with k, which is never alive."""
+        if self._arrays is None:
+            width = max(len(r) for r in self.rankings)
+            pad = (self.k,) * width
+            matrix = np.array([r + pad[len(r):] for r in self.rankings], dtype=np.int32)
+            self._arrays = (matrix, np.asarray(self.weights, dtype=np.int64))
+        return self._arrays
+
+
+class _PythonRounds:
+    """Ballots piled under their current choice; eliminating a candidate only moves its pile."""
+
+    def __init__(self, ballots, alive):
+        self.alive = list(alive)
+        self.piles = [[] for _ in range(ballots.k)]
+        self.counts = [0] * ballots.k
+        for ranking, weight in zip(ballots.rankings, ballots.weights):
+            self._place(ranking, 0, weight)
+
+    def _place(self, ranking, start, weight):
+        for at in range(start, len(ranking)):
+            idx = ranking[at]
+            if self.alive[idx]:
+                self.piles[idx].append((ranking, at, weight))
+                self.counts[idx] += weight
+                return
+
+    def eliminate(self, idx):
+        self.alive[idx] = False
+        pile, self.piles[idx] = self.piles[idx], []
+        self.counts[idx] = 0
+        for ranking, at, weight in pile:
+            self._place(ranking, at + 1, weight)
+
+
+class _NumpyRounds:
+    """Same rounds over the integer matrix: each ballot's current choice lives in one array."""
+
+    def __init__(self, ballots, alive):
+        self.k = ballots.k
+        self.matrix, self.weights = ballots.arrays()
+        self.alive = np.append(np.asarray(alive, dtype=bool), False)
+        self.current = self._first_alive(self.matrix)
+        self._counts = np.bincount(self.current, weights=self.weights, minlength=self.k + 1)[: self.k]
+
+    def _first_alive(self, rows):
+        live = self.alive[rows]
+        first = live.argmax(axis=1)
+        return np.where(live.any(axis=1), rows[np.arange(len(rows)), first], self.k)
+
+    @property
+    def counts(self):
+        return self._counts.astype(np.int64).tolist()
+
+    def eliminate(self, idx):
+        self.alive[idx] = False
+        moved = np.flatnonzero(self.current == idx)
+        # candidates never come back within a runoff, so the first live entry of the row is the next choice
+        self.current[moved] = self._first_alive(self.matrix[moved])
+        self._counts[idx] = 0
+        self._counts += np.bincount(self.current[moved], weights=self.weights[moved], minlength=self.k + 1)[: self.k]
+
+
+def instant_runoff(ballots, excluded=()):
+    """
+    Run IRV rounds until a candidate holds a majority of continuing ballots.
+    Returns (winner index or None, rounds); each round is
+    {"counts": [...], "eliminated": index or None}. The last-place tie-break is
+    fewer first-round votes, then the later candidate index.
+    """
+    alive = [i not in excluded for i in range(ballots.k)]
+    counter = ballots.rounds(alive)
+    rounds = []
+    first_round = None
+    while True:
+        counts = list(counter.counts)
+        first_round = first_round or counts
+        live = [i for i in range(ballots.k) if alive[i]]
+        continuing = sum(counts)
+        if not live or not continuing:
+            rounds.append({"counts": counts, "eliminated": None})
+            return None, rounds
+        leader = max(live, key=lambda i: (counts[i], first_round[i], -i))
+        if counts[leader] * 2 > continuing or len(live) == 1:
+            rounds.append({"counts": counts, "eliminated": None})
+            return leader, rounds
+        loser = min(live, key=lambda i: (counts[i], first_round[i], -i))
+        alive[loser] = False
+        counter.eliminate(loser)
+        rounds.append({"counts": counts, "eliminated": loser})
+
+
+def sequential_irv(ballots, seats):
+    """Fill `seats` by repeated instant runoff, excluding earlier winners."""
+    winners, all_rounds = [], []
+    for _ in range(max(seats, 0)):
+        winner, rounds = instant_runoff(ballots, excluded=set(winners))
+        all_rounds.append(rounds)
+        if winner is None:
+            break
+        winners.append(winner)
+    return winners, all_rounds
+
+
+def encode_rankings(rows, index):
+    """
+    rows: (voter_id, candidate_id) ordered by voter then rank, as stored in Vote.
+    Returns one tuple of candidate indices per voter; marks for candidates not
+    in `index` are skipped and ballots left empty are dropped.
+    """
+    rankings = (
+        tuple(index[cand_id] for _voter, cand_id in marks if cand_id in index)
+        for _voter, marks in groupby(rows, key=lambda row: row[0])
+    )
+    return [ranking for ranking in rankings if ranking]
+
+
+# =======================
+#  POSITIONS
+# =======================
+
+def tally_positions(positions, candidates_by_position):
+    """
+    Results for each position as {position_id: {...}}. `candidates_by_position`
+    maps position id to candidates annotated with votes_count (marks received),
+    which is all a plurality count needs; runoff positions load their ballots
+    in one extra query.
+    """
+    results = {}
+    runoff = [pos for pos in positions if pos.tally_method == IRV]
+    rows_by_position = {pos.id: [] for pos in runoff}
+    if runoff:
+        rows = (
+            Vote.objects.filter(position__in=runoff)
+            .order_by("position_id", "voter_id", "rank")
+            .values_list("position_id", "voter_id", "candidate_id")
+        )
+        for position_id, voter_id, candidate_id in rows.iterator(chunk_size=5000):
+            rows_by_position[position_id].append((voter_id, candidate_id))
+
+    for pos in positions:
+        candidates = candidates_by_position.get(pos.id, [])
+        ids = [cand.id for cand in candidates]
+        if pos.tally_method == IRV:
+            ballots = Ballots(encode_rankings(rows_by_position[pos.id], {cid: i for i, cid in enumerate(ids)}), len(ids))
+            winners, rounds = sequential_irv(ballots, pos.seats)
+            totals = rounds[0][0]["counts"] if rounds and rounds[0] else [0] * len(ids)
+            results[pos.id] = {
+                "method": IRV,
+                "seats": pos.seats,
+                "ballots": ballots.total,
+                "votes": dict(zip(ids, totals)),
+                "winners": [ids[i] for i in winners],
+                "rounds": [
+                    [
+                        {
+                            "counts": dict(zip(ids, rnd["counts"])),
+                            "eliminated": ids[rnd["eliminated"]] if rnd["eliminated"] is not None else None,
+                        }
+                        for rnd in seat_rounds
+                    ]
+                    for seat_rounds in rounds
+                ],
+            }
+        else:
+            totals = [cand.votes_count for cand in candidates]
+            winners = top_n(totals, pos.seats)
+            results[pos.id] = {
+                "method": PLURALITY,
+                "seats": pos.seats,
+                "votes": dict(zip(ids, totals)),
+                "winners": [ids[i] for i in winners],
+                "tied": len(winners) > pos.seats,
+            }
+    return results
+
@@ -1,3 +1,2075 @@
-from django.test import TestCase
+# elections/tests.py
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+import zlib
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.core import signing
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+
+from . import analytics, archive, exports, jobs, metrics, phases, profiling, renderers, storage, summaries, tally
+from . import urls as election_urls
+from .models import (
+    Broadcast,
+    BroadcastReceipt,
+    POSITION_CHOICES,
+    AccessGate,
+    Candidate,
+    Election,
+    ElectionArchive,
+    ElectionReminder,
+    Job,
+    MediaBlob,
+    Nomination,
+    Notification,
+    Participation,
+    Position,
+    Vote,
+    Voter,
+)
+from .views import ADMIN_SALT, NOMINATION_BATCH_ACTIONS
+
+User = get_user_model()
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """Same "pbkdf2_" prefix the Voter model expects, without the hashing cost."""
+
+    iterations = 1
+
+
+def setUpModule():
+    logging.getLogger("elections.perf").setLevel(logging.WARNING)
+    logging.getLogger("elections.jobs").setLevel(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.getLogger("elections.perf").setLevel(logging.NOTSET)
+    logging.getLogger("elections.jobs").setLevel(logging.NOTSET)
+
+
+FAST_HASHERS = ["elections.tests.FastPBKDF2PasswordHasher"]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ElectionTestCase(TestCase):
+    """Fixture builders for the test classes below; each class seeds only what it uses."""
+
+    PIN = "123456"
+
+    @classmethod
+    def create_election(cls, **fields):
+        """An election in its voting phase with results published, unless overridden."""
+        now = timezone.now()
+        defaults = {
+            "name": "Test Election",
+            "nomination_start": now - timedelta(days=10),
+            "nomination_end": now - timedelta(days=5),
+            "voting_start": now - timedelta(days=1),
+            "voting_end": now + timedelta(days=1),
+            "auto_publish_results": False,
+            "results_published": True,
+            "results_published_at": now,
+        }
+        return Election.objects.create(**{**defaults, **fields})
+
+    @classmethod
+    def create_positions(cls, election, count):
+        return Position.objects.bulk_create(
+            [
+                Position(election=election, name=code, display_order=idx)
+                for idx, (code, _label) in enumerate(POSITION_CHOICES[: min(count, len(POSITION_CHOICES))])
+            ]
+        )
+
+    @classmethod
+    def create_candidates(cls, positions, per_position):
+        return Candidate.objects.bulk_create(
+            [
+                Candidate(position=pos, full_name=f"Candidate {pos.name} {i}", batch_year=1990 + i)
+                for pos in positions
+                for i in range(per_position)
+            ]
+        )
+
+    @classmethod
+    def create_voters(cls, count):
+        pin_hash = make_password(cls.PIN)
+        return Voter.objects.bulk_create(
+            [
+                Voter(
+                    voter_id=f"HCAD-T{i:05d}",
+                    name=f"Alumnus {i}",
+                    batch_year=2000 + i % 5,
+                    campus_chapter="Digos City",
+                    privacy_consent=True,
+                    pin=pin_hash,
+                )
+                for i in range(count)
+            ]
+        )
+
+    @classmethod
+    def cast_ballots(cls, election, voters, candidates):
+        """One vote per position for each voter, spread over the candidates, plus Participation rows."""
+        by_position = {}
+        for cand in candidates:
+            by_position.setdefault(cand.position_id, []).append(cand)
+        Vote.objects.bulk_create(
+            [
+                Vote(voter=v, position_id=pos_id, candidate=cands[i % len(cands)])
+                for i, v in enumerate(voters)
+                for pos_id, cands in by_position.items()
+            ]
+        )
+        Participation.objects.bulk_create([Participation(election=election, voter=v) for v in voters])
+
+    @classmethod
+    def create_nominations(cls, election, positions, nominators):
+        return Nomination.objects.bulk_create(
+            [
+                Nomination(
+                    election=election,
+                    position=positions[i % len(positions)],
+                    nominator=v,
+                    nominee_full_name=f"Nominee {i}",
+                    nominee_batch_year=1995,
+                )
+                for i, v in enumerate(nominators)
+            ]
+        )
+
+    @classmethod
+    def create_voting_fixture(cls, positions=2, voters=6, voted=3):
+        """An open election; voters[0] is signed in and has not voted, the next `voted` voters have."""
+        cls.election = cls.create_election()
+        cls.positions = cls.create_positions(cls.election, positions)
+        cls.candidates = cls.create_candidates(cls.positions, 2)
+        cls.voters = cls.create_voters(voters)
+        cls.voter = cls.voters[0]
+        cls.voter.start_session()
+        cls.voted = cls.voters[1 : 1 + voted]
+        cls.cast_ballots(cls.election, cls.voted, cls.candidates)
+
+    @classmethod
+    def create_admin(cls):
+        cls.admin_user = User.objects.create_user("test-admin", password="admin-pass", is_staff=True)
+        cls.admin_token = signing.dumps({"user_id": cls.admin_user.id}, salt=ADMIN_SALT)
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()  # cached aggregates must not leak between tests
+
+    def temp_dir(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        return path
+
+    def voter_headers(self):
+        return {"X-Session-Token": self.voter.session_token}
+
+    def admin_headers(self):
+        return {"X-Admin-Token": self.admin_token}
+
+    def ballot_payload(self):
+        first = {}
+        for cand in self.candidates:
+            first.setdefault(cand.position_id, cand.id)
+        return {"votes": {str(pos_id): cand_id for pos_id, cand_id in first.items()}}
+
+
+class PerformanceMiddlewareTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+
+    def perf_record(self, name):
+        with self.assertLogs("elections.perf", "INFO") as logs:
+            response = self.client.get(reverse(name))
+        (entry,) = logs.records
+        return response, entry
+
+    def test_each_request_logs_one_json_line(self):
+        response, entry = self.perf_record("candidates_list")
+        record = json.loads(entry.getMessage())
+        self.assertEqual(entry.perf, record)
+        self.assertEqual(
+            (record["view"], record["method"], record["path"], record["status"]),
+            ("candidates_list", "GET", reverse("candidates_list"), 200),
+        )
+        self.assertEqual(record["response_bytes"], len(response.content))
+        self.assertGreater(record["db_queries"], 0)
+        self.assertEqual((record["query_budget"], record["over_query_budget"]), (50, False))
+
+    def test_server_timing_matches_the_log_line(self):
+        response, entry = self.perf_record("candidates_list")
+        record = entry.perf
+        timing = {}
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            timing[name] = dict(param.split("=", 1) for param in params)
+        self.assertEqual(list(timing), ["db", "serialize", "app", "total"])
+        self.assertEqual(timing["db"]["desc"], f'"{record["db_queries"]} queries"')
+        self.assertEqual(float(timing["db"]["dur"]), record["db_ms"])
+        self.assertEqual(float(timing["serialize"]["dur"]), record["serialize_ms"])
+        self.assertEqual(float(timing["total"]["dur"]), record["duration_ms"])
+
+    def test_rendering_is_timed_apart_from_the_view(self):
+        record = self.perf_record("candidates_list")[1].perf
+        self.assertGreater(record["serialize_ms"], 0)
+        self.assertLessEqual(record["db_ms"] + record["serialize_ms"], record["duration_ms"])
+
+    @override_settings(PERF_QUERY_BUDGET=50, PERF_QUERY_BUDGETS={"candidates_list": 1})
+    def test_views_over_their_query_budget_log_a_warning(self):
+        with self.assertLogs("elections.perf", "WARNING") as logs:
+            self.client.get(reverse("candidates_list"))
+        (entry,) = logs.records
+        record = entry.perf
+        self.assertEqual(entry.levelname, "WARNING")
+        self.assertEqual((record["view"], record["query_budget"], record["over_query_budget"]), ("candidates_list", 1, True))
+        self.assertGreater(record["db_queries"], 1)
+
+    @override_settings(PERF_QUERY_BUDGET=50, PERF_QUERY_BUDGETS={"candidates_list": 1})
+    def test_per_view_budgets_leave_other_views_on_the_global_one(self):
+        with self.assertNoLogs("elections.perf", "WARNING"):
+            self.client.get(reverse("positions_list"))
+
+    @override_settings(PERF_QUERY_BUDGET=1, PERF_QUERY_BUDGETS={})
+    def test_global_budget_applies_without_overrides(self):
+        with self.assertLogs("elections.perf", "WARNING"):
+            self.client.get(reverse("positions_list"))
+
+    @override_settings(PERF_SERVER_TIMING=False)
+    def test_server_timing_can_be_turned_off(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("positions_list")))
+
+
+class MetricsTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.create_admin()
+
+    def setUp(self):
+        super().setUp()
+        for metric in metrics.REGISTRY:  # the registry is process-wide; start each test empty
+            self.addCleanup(setattr, metric, "_values", metric._values)
+            metric._values = {}
+
+    def scrape(self, **headers):
+        response = self.client.get(reverse("metrics"), headers=headers or self.admin_headers())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/plain; version=0.0.4; charset=utf-8")
+        text = response.content.decode()
+        samples = dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+        return text, {name: float(value) for name, value in samples.items()}
+
+    def login(self, pin):
+        return self.client.post(
+            reverse("voter_login"), {"voter_id": self.voter.voter_id, "pin": pin}, content_type="application/json"
+        )
+
+    def test_scrapes_need_an_admin_when_no_token_is_set(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, headers=self.admin_headers()).status_code, 200)
+
+    @override_settings(METRICS_TOKEN="scrape-secret")
+    def test_a_metrics_token_replaces_admin_access(self):
+        url = reverse("metrics")
+        self.assertEqual(self.client.get(url, headers=self.admin_headers()).status_code, 403)
+        self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer wrong"}).status_code, 403)
+        self.assertEqual(self.client.get(url, headers={"Authorization": "Bearer scrape-secret"}).status_code, 200)
+
+    def test_every_metric_is_declared(self):
+        text, _ = self.scrape()
+        for metric in metrics.REGISTRY:
+            self.assertIn(f"# TYPE {metric.name} {metric.kind}\n", text)
+
+    def test_logins_are_counted_by_kind_and_result(self):
+        self.login(self.PIN)
+        self.login("000000")
+        self.client.post(reverse("admin_login"), {"username": "test-admin", "password": "nope"}, content_type="application/json")
+        _, samples = self.scrape()
+        self.assertEqual(samples['hcad_logins_total{kind="voter",result="success"}'], 1)
+        self.assertEqual(samples['hcad_logins_total{kind="voter",result="failure"}'], 1)
+        self.assertEqual(samples['hcad_logins_total{kind="admin",result="failure"}'], 1)
+
+    def test_ballots_and_turnout(self):
+        response = self.client.post(
+            reverse("submit_ballot"), self.ballot_payload(), content_type="application/json", headers=self.voter_headers()
+        )
+        self.assertEqual(response.status_code, 201)
+        _, samples = self.scrape()
+        self.assertEqual(samples["hcad_ballots_submitted_total"], 1)
+        self.assertEqual(samples['hcad_http_responses_total{view="submit_ballot",status="201"}'], 1)
+        self.assertEqual(samples["hcad_voters_total"], len(self.voters))
+        self.assertEqual(samples["hcad_voters_voted"], len(self.voted) + 1)
+        self.assertAlmostEqual(samples["hcad_turnout_ratio"], (len(self.voted) + 1) / len(self.voters))
+
+    def test_request_latency_is_a_histogram_per_view(self):
+        self.login(self.PIN)
+        self.login("000000")
+        _, samples = self.scrape()
+        prefix = 'hcad_http_request_duration_seconds_bucket{view="voter_login",method="POST",le="'
+        buckets = [(name[len(prefix) : -2], value) for name, value in samples.items() if name.startswith(prefix)]
+        self.assertEqual([le for le, _ in buckets], [metrics._num(b) for b in metrics.DEFAULT_BUCKETS] + ["+Inf"])
+        counts = [value for _, value in buckets]
+        self.assertEqual(counts, sorted(counts))  # cumulative
+        self.assertEqual(counts[-1], 2)
+        self.assertEqual(samples['hcad_http_request_duration_seconds_count{view="voter_login",method="POST"}'], 2)
+        self.assertGreater(samples['hcad_http_request_duration_seconds_sum{view="voter_login",method="POST"}'], 0)
+
+    def test_histogram_buckets_are_cumulative_and_upper_inclusive(self):
+        histogram = metrics.Histogram("t_seconds", "Test.", ("view",), buckets=(0.5, 0.1))
+        for value in (0.1, 0.3, 0.5, 7):
+            histogram.observe(value, view="a")
+        values = {}
+        histogram.merge(values, histogram.snapshot())
+        self.assertEqual(
+            list(histogram.render(values)),
+            [
+                't_seconds_bucket{view="a",le="0.1"} 1',
+                't_seconds_bucket{view="a",le="0.5"} 3',
+                't_seconds_bucket{view="a",le="+Inf"} 4',
+                't_seconds_sum{view="a"} 7.9',
+                't_seconds_count{view="a"} 4',
+            ],
+        )
+
+    def test_worker_snapshots_are_summed(self):
+        directory = self.temp_dir()
+        other = {
+            metrics.BALLOTS_SUBMITTED.name: [[[], 4]],
+            metrics.LOGINS.name: [[["voter", "success"], 2]],
+            metrics.REQUEST_LATENCY.name: [[["my_votes", "GET"], [1] + [0] * len(metrics.DEFAULT_BUCKETS), 0.004]],
+        }
+        with open(os.path.join(directory, "metrics_999_feedbeef.json"), "w") as fh:
+            json.dump(other, fh)
+        with open(os.path.join(directory, "metrics_998_cafecafe.json"), "w") as fh:
+            fh.write("{half a snapshot")  # a worker killed mid-write is skipped
+        with open(os.path.join(directory, "notes.json"), "w") as fh:
+            json.dump(other, fh)
+
+        metrics.BALLOTS_SUBMITTED.inc()
+        metrics.record_login("voter", True)
+        with self.settings(METRICS_MULTIPROC_DIR=directory):
+            merged = metrics.collect()
+            self.assertEqual(merged[metrics.BALLOTS_SUBMITTED.name], {(): 5})
+            self.assertEqual(merged[metrics.LOGINS.name][("voter", "success")], 3)
+            self.assertEqual(merged[metrics.REQUEST_LATENCY.name][("my_votes", "GET")][0][0], 1)
+            self.assertTrue(any(name.startswith(f"metrics_{os.getpid()}_") for name in os.listdir(directory)))
+            _, samples = self.scrape()
+        self.assertEqual(samples["hcad_ballots_submitted_total"], 5)
+
+
+class ProfilingTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.create_admin()
+
+    def setUp(self):
+        super().setUp()
+        store = self.settings(PROFILE_STORE_DIR=self.temp_dir())
+        store.enable()
+        self.addCleanup(store.disable)
+
+    def profiled(self, name, mode, headers=None):
+        headers = self.admin_headers() if headers is None else headers
+        return self.client.get(reverse(name), headers={"X-Profile": mode, **headers})
+
+    def profile_detail(self, profile_id, headers=None):
+        url = reverse("admin_profile_detail", kwargs={"profile_id": profile_id})
+        return self.client.get(url, headers=self.admin_headers() if headers is None else headers)
+
+    def test_profiling_is_staff_only(self):
+        for headers in ({}, self.voter_headers(), {"X-Admin-Token": "forged"}):
+            with self.subTest(headers=list(headers)):
+                response = self.profiled("positions_list", "inline", headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertIsInstance(response.json(), list)  # the normal answer
+                self.assertNotIn("X-Profile-Id", self.profiled("positions_list", "store", headers))
+        self.assertEqual(profiling.list_reports(), [])
+
+    def test_inline_mode_returns_the_report(self):
+        report = self.profiled("candidates_list", "inline").json()
+        self.assertEqual(
+            (report["view"], report["status"], report["profiled_by"], report["sampled"]),
+            ("candidates_list", 200, "test-admin", False),
+        )
+        self.assertEqual(report["sql_count"], len(report["sql"]))
+        self.assertGreater(report["sql_count"], 0)
+        self.assertTrue(report["functions"])
+        self.assertTrue(all(f["cumtime_ms"] >= f["tottime_ms"] for f in report["functions"]))
+        self.assertEqual(profiling.list_reports(), [])  # inline reports are not stored
+
+    def test_store_mode_keeps_the_response(self):
+        response = self.profiled("candidates_list", "store")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(self.candidates))
+        self.assertRegex(response["X-Profile-Id"], profiling.PROFILE_ID_RE)
+
+    def test_stored_reports_are_listed_for_admins(self):
+        profile_id = self.profiled("candidates_list", "store")["X-Profile-Id"]
+        detail = self.profile_detail(profile_id).json()
+        self.assertEqual((detail["id"], detail["view"]), (profile_id, "candidates_list"))
+        listed = self.client.get(reverse("admin_profiles"), headers=self.admin_headers()).json()
+        self.assertEqual([p["id"] for p in listed], [profile_id])
+        self.assertNotIn("functions", listed[0])
+        self.assertEqual(self.profile_detail(profile_id, headers={}).status_code, 403)
+
+    def test_profile_ids_cannot_leave_the_store(self):
+        self.assertEqual(self.profile_detail("..settings").status_code, 404)
+
+    @override_settings(PROFILE_STORE_MAX_FILES=2)
+    def test_store_keeps_the_newest_reports(self):
+        ids = [self.profiled("positions_list", "store")["X-Profile-Id"] for _ in range(3)]
+        self.assertEqual([p["id"] for p in profiling.list_reports()], ids[:0:-1])
+        self.assertIsNone(profiling.load_report(ids[0]))
+
+    def test_sql_parameters_are_never_captured(self):
+        self.client.post(
+            reverse("voter_login"),
+            {"voter_id": self.voter.voter_id, "pin": self.PIN},
+            content_type="application/json",
+            headers={"X-Profile": "store", **self.admin_headers()},
+        )
+        (summary,) = profiling.list_reports()
+        report = profiling.load_report(summary["id"])
+        self.assertEqual(report["view"], "voter_login")
+        self.assertTrue(report["sql"])
+        self.assertEqual({key for query in report["sql"] for key in query}, {"sql", "many", "duration_ms"})
+        stored = json.dumps(report)
+        self.voter.refresh_from_db()
+        for secret in (self.voter.voter_id, self.voter.pin, self.voter.session_token):
+            self.assertNotIn(secret, stored)
+
+    @override_settings(PROFILE_SAMPLE_RATE=1)
+    def test_sampled_requests_are_stored_without_a_header(self):
+        response = self.client.get(reverse("positions_list"))
+        report = profiling.load_report(response["X-Profile-Id"])
+        self.assertEqual((report["sampled"], report["profiled_by"]), (True, None))
+
+
+# Hard upper bound on SQL queries per endpoint ("<url name>" or "<url name>:<METHOD>").
+# The same budget must hold for the small and the large fixture.
+QUERY_BUDGETS = {
+    "access_status": 2,
+    "access_check": 2,
+    "voter_login": 3,
+    "voter_quick_login": 5,
+    "voter_logout": 2,
+    "voter_me": 2,
+    "current_election": 1,
+    "election_status": 1,
+    "published_results": 4,
+    "elections_index": 1,
+    "election_results": 1,
+    "positions_list": 3,
+    "candidates_list": 3,
+    "nominate": 6,
+    "my_nomination": 3,
+    "submit_ballot": 13,
+    "my_votes": 3,
+    "admin_login": 1,
+    "admin_logout": 0,
+    "admin_me": 1,
+    "admin_voters": 3,
+    "admin_voters:POST": 3,
+    "admin_tally": 4,
+    "admin_stats": 2,
+    "admin_turnout": 2,
+    "admin_turnout_timeseries": 3,
+    "admin_nominations": 3,
+    "admin_promote_nomination": 11,
+    "admin_reject_nomination": 5,
+    "admin_delete_nomination": 4,
+    "admin_nominations_batch": 13,
+    "admin_nomination_clusters": 4,
+    "admin_reminders": 3,
+    "admin_reminders:POST": 4,
+    "admin_active_election": 2,
+    "admin_active_election:PUT": 3,
+    "admin_active_election:POST": 5,
+    "admin_publish_results": 3,
+    "admin_demo_phase": 3,
+    "admin_notifications": 3,
+    "admin_notifications:POST": 2,
+    "admin_reset_voters": 2,
+    "admin_reset_election": 4,
+    "admin_candidate_photo:DELETE": 4,
+    "admin_export": 3,
+    "admin_jobs": 2,
+    "admin_job_detail": 2,
+    "admin_job_download": 2,
+    "voter_notifications": 5,
+    "voter_notifications:POST": 7,
+    "admin_broadcasts": 4,
+    "admin_broadcasts:POST": 2,
+    "admin_delete_broadcast": 4,
+    "metrics": 3,
+    "admin_profiles": 1,
+    "admin_profile_detail": 1,
+}
+
+# Cases that deliberately exercise an error path.
+EXPECTED_ERRORS = {"access_check", "admin_profile_detail"}
+
+
+class QueryBudgetMixin:
+    SCALE = 1
+
+    @classmethod
+    def setUpTestData(cls):
+        scale = cls.SCALE
+        now = timezone.now()
+        cls.profile_dir = tempfile.mkdtemp()
+        cls.media_dir = tempfile.mkdtemp()
+        cls.election = cls.create_election(name="Budget Election")
+        cls.positions = cls.create_positions(cls.election, 2 + scale)
+        cls.candidates = cls.create_candidates(cls.positions, 2 * scale)
+        cls.voters = cls.create_voters(6 * scale)
+        cls.voter = cls.voters[0]
+        cls.voter.start_session()
+        cls.cast_ballots(cls.election, cls.voters[1 : 1 + 3 * scale], cls.candidates)
+        cls.nominations = cls.create_nominations(cls.election, cls.positions, cls.voters[1:])
+        Notification.objects.bulk_create(
+            [Notification(type="info", message=f"Voter note {i}", voter=cls.voter) for i in range(3 * scale)]
+            + [Notification(type="info", message=f"Admin note {i}") for i in range(3 * scale)]
+        )
+        cls.broadcasts = Broadcast.objects.bulk_create(
+            [Broadcast(message=f"Announcement {i}") for i in range(2 * scale)]
+        )
+        BroadcastReceipt.objects.bulk_create(
+            [BroadcastReceipt(broadcast=b, voter=v) for b in cls.broadcasts[:scale] for v in cls.voters[:2]]
+        )
+        ElectionReminder.objects.bulk_create(
+            [ElectionReminder(election=cls.election, remind_at=now.date(), note=f"R{i}") for i in range(scale)]
+        )
+        for i in range(scale):
+            gate = AccessGate(name=f"gate-{i}")
+            gate.set_passcode("open-sesame")
+            gate.save()
+        cls.create_admin()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.profile_dir, ignore_errors=True)
+        shutil.rmtree(cls.media_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    # ---- request helpers ----
+
+    def get(self, name, headers=None, **kwargs):
+        return lambda: self.client.get(reverse(name, kwargs=kwargs or None), headers=headers or {})
+
+    def send(self, method, name, data=None, headers=None, **kwargs):
+        call = getattr(self.client, method.lower())
+        return lambda: call(
+            reverse(name, kwargs=kwargs or None),
+            data or {},
+            content_type="application/json",
+            headers=headers or {},
+        )
+
+    # ---- one builder per route (setup runs outside the measured block) ----
+
+    def request_access_status(self):
+        return self.get("access_status")
+
+    def request_access_check(self):
+        return self.send("POST", "access_check", {"passcode": "wrong"})
+
+    def request_voter_login(self):
+        return self.send("POST", "voter_login", {"voter_id": self.voter.voter_id, "pin": self.PIN})
+
+    def request_voter_quick_login(self):
+        return self.send(
+            "POST",
+            "voter_quick_login",
+            {"name": self.voter.name, "batch_year": self.voter.batch_year, "privacy_consent": True},
+        )
+
+    def request_voter_logout(self):
+        return self.send("POST", "voter_logout", headers=self.voter_headers())
+
+    def request_voter_me(self):
+        return self.get("voter_me", headers=self.voter_headers())
+
+    def request_current_election(self):
+        return self.get("current_election")
+
+    def request_election_status(self):
+        return self.get("election_status")
+
+    def request_published_results(self):
+        return self.get("published_results")
+
+    def request_elections_index(self):
+        summaries.snapshot(self.election)
+        return self.get("elections_index")
+
+    def request_election_results(self):
+        summaries.snapshot(self.election)
+        return self.get("election_results", election_id=self.election.id)
+
+    def request_positions_list(self):
+        return self.get("positions_list")
+
+    def request_candidates_list(self):
+        return self.get("candidates_list")
+
+    def request_nominate(self):
+        now = timezone.now()
+        Election.objects.filter(id=self.election.id).update(
+            nomination_start=now - timedelta(days=1), nomination_end=now + timedelta(days=1)
+        )
+        payload = {
+            "position_id": self.positions[0].id,
+            "nominee_full_name": "Fresh Nominee",
+            "nominee_batch_year": 1999,
+        }
+        return self.send("POST", "nominate", payload, headers=self.voter_headers())
+
+    def request_my_nomination(self):
+        Nomination.objects.create(
+            election=self.election,
+            position=self.positions[0],
+            nominator=self.voter,
+            nominee_full_name="Own Nominee",
+            nominee_batch_year=1999,
+        )
+        return self.get("my_nomination", headers=self.voter_headers())
+
+    def request_submit_ballot(self):
+        return self.send("POST", "submit_ballot", self.ballot_payload(), headers=self.voter_headers())
+
+    def request_my_votes(self):
+        self.client.post(
+            reverse("submit_ballot"), self.ballot_payload(), content_type="application/json", headers=self.voter_headers()
+        )
+        return self.get("my_votes", headers=self.voter_headers())
+
+    def request_admin_login(self):
+        return self.send("POST", "admin_login", {"username": "test-admin", "password": "admin-pass"})
+
+    def request_admin_logout(self):
+        return self.send("POST", "admin_logout", headers=self.admin_headers())
+
+    def request_admin_me(self):
+        return self.get("admin_me", headers=self.admin_headers())
+
+    def request_admin_voters(self):
+        return self.get("admin_voters", headers=self.admin_headers())
+
+    def request_admin_voters_POST(self):
+        payload = {"name": "New Alumna", "batch_year": 2010, "pin": "654321"}
+        return self.send("POST", "admin_voters", payload, headers=self.admin_headers())
+
+    def request_admin_tally(self):
+        return self.get("admin_tally", headers=self.admin_headers())
+
+    def request_admin_stats(self):
+        analytics.turnout(self.election)
+        return self.get("admin_stats", headers=self.admin_headers())
+
+    def request_admin_turnout(self):
+        analytics.turnout(self.election)  # dashboards poll; measure the warm path
+        return self.get("admin_turnout", headers=self.admin_headers())
+
+    def request_admin_turnout_timeseries(self):
+        analytics.rebuild_ballot_buckets(self.election)
+        return self.get("admin_turnout_timeseries", headers=self.admin_headers())
+
+    def request_admin_nominations(self):
+        return self.get("admin_nominations", headers=self.admin_headers())
+
+    def request_admin_promote_nomination(self):
+        return self.send(
+            "POST", "admin_promote_nomination", headers=self.admin_headers(), nomination_id=self.nominations[0].id
+        )
+
+    def request_admin_reject_nomination(self):
+        return self.send(
+            "POST",
+            "admin_reject_nomination",
+            {"reason": "Not in good standing"},
+            headers=self.admin_headers(),
+            nomination_id=self.nominations[0].id,
+        )
+
+    def request_admin_nomination_clusters(self):
+        return self.get("admin_nomination_clusters", headers=self.admin_headers())
+
+    def request_admin_nominations_batch(self):
+        actions = [
+            {"id": nomination.id, "action": NOMINATION_BATCH_ACTIONS[i % 3]} for i, nomination in enumerate(self.nominations)
+        ]
+        return self.send(
+            "POST", "admin_nominations_batch", {"actions": actions, "reason": "Duplicate"}, headers=self.admin_headers()
+        )
+
+    def request_admin_delete_nomination(self):
+        return self.send(
+            "DELETE", "admin_delete_nomination", headers=self.admin_headers(), nomination_id=self.nominations[0].id
+        )
+
+    def request_admin_reminders(self):
+        return self.get("admin_reminders", headers=self.admin_headers())
+
+    def request_admin_reminders_POST(self):
+        payload = {"election": self.election.id, "remind_at": "2030-01-01", "note": "Vote!"}
+        return self.send("POST", "admin_reminders", payload, headers=self.admin_headers())
+
+    def request_admin_active_election(self):
+        return self.get("admin_active_election", headers=self.admin_headers())
+
+    def request_admin_active_election_PUT(self):
+        return self.send("PUT", "admin_active_election", {"name": "Renamed"}, headers=self.admin_headers())
+
+    def request_admin_active_election_POST(self):
+        payload = {
+            "name": "Next Election",
+            "nomination_start": "2031-01-01T00:00:00",
+            "nomination_end": "2031-01-10T00:00:00",
+            "voting_start": "2031-01-11T00:00:00",
+            "voting_end": "2031-01-12T00:00:00",
+        }
+        return self.send("POST", "admin_active_election", payload, headers=self.admin_headers())
+
+    def request_admin_publish_results(self):
+        return self.send("POST", "admin_publish_results", {"publish": True}, headers=self.admin_headers())
+
+    def request_admin_demo_phase(self):
+        return self.send("POST", "admin_demo_phase", {"action": "open_voting"}, headers=self.admin_headers())
+
+    def request_admin_notifications(self):
+        return self.get("admin_notifications", headers=self.admin_headers())
+
+    def request_admin_notifications_POST(self):
+        return self.send("POST", "admin_notifications", {"action": "mark_all_read"}, headers=self.admin_headers())
+
+    def request_admin_reset_voters(self):
+        return self.send("POST", "admin_reset_voters", {"reset_pins": True}, headers=self.admin_headers())
+
+    def request_admin_reset_election(self):
+        return self.send("POST", "admin_reset_election", headers=self.admin_headers())
+
+    def request_admin_candidate_photo_DELETE(self):
+        return self.send(
+            "DELETE", "admin_candidate_photo", headers=self.admin_headers(), candidate_id=self.candidates[0].id
+        )
+
+    def request_admin_export(self):
+        fetch = self.get("admin_export", headers=self.admin_headers(), kind="ballots")
+
+        def call():
+            response = fetch()
+            response.content_bytes = b"".join(response.streaming_content)  # rows are read lazily
+            return response
+
+        return call
+
+    def request_admin_jobs(self):
+        jobs.enqueue("reset_voters", user=self.admin_user)
+        jobs.enqueue("export", {"kind": "roster", "election_id": self.election.id}, user=self.admin_user)
+        return self.get("admin_jobs", headers=self.admin_headers())
+
+    def request_admin_job_detail(self):
+        job = jobs.enqueue("reset_voters", user=self.admin_user)
+        return self.get("admin_job_detail", headers=self.admin_headers(), job_id=job.id)
+
+    def request_admin_job_download(self):
+        job = jobs.enqueue("export", {"kind": "results", "election_id": self.election.id})
+        jobs.run_pending()
+        fetch = self.get("admin_job_download", headers=self.admin_headers(), job_id=job.id)
+
+        def call():
+            response = fetch()
+            response.content_bytes = b"".join(response.streaming_content)
+            response.close()
+            return response
+
+        return call
+
+    def request_voter_notifications(self):
+        return self.get("voter_notifications", headers=self.voter_headers())
+
+    def request_voter_notifications_POST(self):
+        return self.send("POST", "voter_notifications", {"action": "mark_all_read"}, headers=self.voter_headers())
+
+    def request_admin_broadcasts(self):
+        return self.get("admin_broadcasts", headers=self.admin_headers())
+
+    def request_admin_broadcasts_POST(self):
+        return self.send("POST", "admin_broadcasts", {"message": "Voting is now open"}, headers=self.admin_headers())
+
+    def request_admin_delete_broadcast(self):
+        return self.send(
+            "DELETE", "admin_delete_broadcast", headers=self.admin_headers(), broadcast_id=self.broadcasts[0].id
+        )
+
+    def request_metrics(self):
+        return self.get("metrics", headers=self.admin_headers())
+
+    def request_admin_profiles(self):
+        return self.get("admin_profiles", headers=self.admin_headers())
+
+    def request_admin_profile_detail(self):
+        return self.get(
+            "admin_profile_detail", headers=self.admin_headers(), profile_id="20250101000000000000-deadbeef"
+        )
+
+    # ---- tests ----
+
+    def test_every_route_has_a_budget(self):
+        routes = {pattern.name for pattern in election_urls.urlpatterns}
+        budgeted = {key.split(":")[0] for key in QUERY_BUDGETS}
+        self.assertEqual(routes - budgeted, set(), "add a QUERY_BUDGETS entry for new routes")
+        self.assertEqual(budgeted - routes, set(), "stale QUERY_BUDGETS entries")
+
+    def test_query_budgets(self):
+        for key, budget in QUERY_BUDGETS.items():
+            with self.subTest(endpoint=key), self.settings(
+                PROFILE_STORE_DIR=self.profile_dir, MEDIA_ROOT=self.media_dir
+            ):
+                with transaction.atomic():
+                    builder = getattr(self, "request_" + key.replace(":", "_"))
+                    call = builder()
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = call()
+                    transaction.set_rollback(True)
+                self.assertEqual(
+                    response.status_code >= 300,
+                    key in EXPECTED_ERRORS,
+                    f"{key} returned {response.status_code}",
+                )
+                executed = "\n".join(q["sql"] for q in ctx.captured_queries)
+                self.assertLessEqual(
+                    len(ctx),
+                    budget,
+                    f"{key} ran {len(ctx)} queries (budget {budget}) at scale {self.SCALE}:\n{executed}",
+                )
+
+
+class QueryBudgetSmallTests(QueryBudgetMixin, ElectionTestCase):
+    SCALE = 1
+
+
+class QueryBudgetLargeTests(QueryBudgetMixin, ElectionTestCase):
+    SCALE = 5
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoadTestCommandTests(TransactionTestCase):
+    """The in-process transport runs its sessions on threads, which only see committed rows."""
+
+    def setUp(self):
+        election = ElectionTestCase.create_election()
+        self.positions = ElectionTestCase.create_positions(election, 2)
+        ElectionTestCase.create_candidates(self.positions, 2)
+
+    def loadtest(self, **options):
+        out = io.StringIO()
+        call_command(
+            "loadtest", max_requests=12, concurrency=1, admin_ratio=0, polls_per_voter=1, seed=7, stdout=out, **options
+        )
+        return out.getvalue()
+
+    def test_summary_table(self):
+        lines = self.loadtest().splitlines()
+        self.assertEqual(lines[0].split(), ["endpoint", "requests", "rps", "errors", "err%", "p50ms", "p95ms", "p99ms"])
+        rows = {line.split()[0]: line.split() for line in lines[2:-2]}
+        session = ["voter_quick_login", "current_election", "positions_list", "candidates_list", "my_votes"]
+        session += ["my_nomination", "voter_notifications", "submit_ballot"]
+        self.assertEqual(set(rows), set(session))
+        self.assertEqual(sum(int(row[1]) for row in rows.values()), 12)
+        self.assertEqual({row[3] for row in rows.values()}, {"0"})
+        self.assertRegex(lines[-1], r"^12 requests in [\d.]+s \([\d.]+ req/s\), 0 errors$")
+
+    def test_json_report(self):
+        report = json.loads(self.loadtest(json=True))
+        self.assertEqual(sum(row["requests"] for row in report["endpoints"]), 12)
+        self.assertEqual(sum(row["errors"] for row in report["endpoints"]), 0)
+
+    def test_the_requests_really_ran(self):
+        self.loadtest()
+        self.assertEqual(Voter.objects.count(), 2)  # 8 requests per full session, then a partial one
+        self.assertEqual(Vote.objects.count(), len(self.positions))
+
+    def test_no_active_election_is_an_error(self):
+        Election.objects.all().delete()
+        with self.assertRaisesMessage(CommandError, "No active election"):
+            self.loadtest()
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SeedDemoDataTests(TestCase):
+    def seed(self, **options):
+        call_command("seed_demo_data", stdout=io.StringIO(), **options)
+
+    def test_ballots_and_nominations_come_from_the_new_voters(self):
+        self.seed(voters=3, candidates_per_position=1, ballots=2, nominations=1)
+        election = Election.objects.get()
+        synthetic = Voter.objects.filter(voter_id__startswith="HCAD-S")
+        self.assertEqual(synthetic.count(), 3)
+        self.assertEqual(Participation.objects.filter(election=election, voter__in=synthetic).count(), 2)
+        self.assertEqual(Nomination.objects.filter(election=election, nominator__in=synthetic).count(), 1)
+
+    def test_ballots_without_voters_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "need --voters"):
+            self.seed(ballots=5)
+        self.assertFalse(Election.objects.exists())
+
+    def test_nominations_without_voters_is_an_error(self):
+        with self.assertRaisesMessage(CommandError, "need --voters"):
+            self.seed(nominations=5)
+
+
+class TransferDataTests(ElectionTestCase):
+    SEED = os.path.join(settings.BASE_DIR, "sqlite_seed.json")
+
+    def transfer(self, **options):
+        call_command("transfer_data", target="default", stdout=io.StringIO(), **options)
+
+    def test_round_trip_keeps_timestamps(self):
+        election = self.create_election()
+        positions = self.create_positions(election, 2)
+        self.create_candidates(positions, 2)
+        # dumpdata JSON keeps milliseconds
+        stamps = {
+            p.pk: p.updated_at.replace(microsecond=p.updated_at.microsecond // 1000 * 1000)
+            for p in Position.objects.all()
+        }
+        path = os.path.join(tempfile.mkdtemp(), "dump.json")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        self.transfer(source="default", output=path, models=["elections"])
+
+        Election.objects.all().delete()
+        self.transfer(fixture=path, models=["elections"])
+        self.assertEqual(Candidate.objects.count(), 4)
+        self.assertEqual({p.pk: p.updated_at for p in Position.objects.all()}, stamps)
+
+    def test_shipped_seed_imports(self):
+        self.transfer(fixture=self.SEED)
+        self.assertTrue(Election.objects.exists())
+        self.assertFalse(Position.objects.filter(updated_at=None).exists())
+        self.assertFalse(Candidate.objects.filter(updated_at=None).exists())
+
+    def test_shipped_seed_records_who_voted(self):
+        self.transfer(fixture=self.SEED)
+        voted = set(Vote.objects.values_list("voter_id", flat=True))
+        self.assertEqual(set(Participation.objects.values_list("voter_id", flat=True)), voted)
+        self.assertTrue(voted)
+
+
+class ExportTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.election = cls.create_election()
+        cls.positions = cls.create_positions(cls.election, 2)
+        cls.candidates = cls.create_candidates(cls.positions, 2)
+        cls.voters = cls.create_voters(3)
+        cls.cast_ballots(cls.election, cls.voters, cls.candidates)
+        cls.create_nominations(cls.election, cls.positions, cls.voters)
+        cls.create_admin()
+
+    def export(self, kind, **params):
+        url = reverse("admin_export", kwargs={"kind": kind})
+        response = self.client.get(url, params, headers=self.admin_headers())
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def export_rows(self, kind):
+        return list(csv.reader(io.StringIO(self.export(kind).decode())))
+
+    def test_csv_exports_start_with_the_header_row(self):
+        for kind in exports.EXPORTS:
+            with self.subTest(kind=kind):
+                rows = self.export_rows(kind)
+                self.assertEqual(rows[0], next(exports.EXPORTS[kind](self.election)))
+                self.assertGreater(len(rows), 1)
+
+    def test_xlsx_has_the_same_rows_as_csv(self):
+        for kind in exports.EXPORTS:
+            with self.subTest(kind=kind):
+                with zipfile.ZipFile(io.BytesIO(self.export(kind, fmt="xlsx"))) as book:
+                    sheet = book.read("xl/worksheets/sheet1.xml").decode()
+                self.assertEqual(sheet.count("<row "), len(self.export_rows(kind)))
+
+    def test_ballot_export_leaves_out_voter_ids(self):
+        ballots = self.export("ballots").decode()
+        for voter in self.voters:
+            self.assertNotIn(voter.voter_id, ballots)
+
+    def test_formula_like_text_is_escaped(self):
+        Voter.objects.filter(pk=self.voters[0].pk).update(name='=HYPERLINK("http://evil.test","x")', email="@SUM(1)")
+        row = self.export_rows("roster")[1]
+        self.assertEqual([row[1], row[4]], ["'=HYPERLINK(\"http://evil.test\",\"x\")", "'@SUM(1)"])
+        with zipfile.ZipFile(io.BytesIO(self.export("roster", fmt="xlsx"))) as book:
+            sheet = book.read("xl/worksheets/sheet1.xml").decode()
+        self.assertIn(">'=HYPERLINK(", sheet)
+        self.assertNotIn(">=HYPERLINK(", sheet)
+
+    def test_numbers_are_not_escaped(self):
+        self.assertEqual(list(exports.stream_csv([[-1, "-1", "a-b"]])), ["-1,'-1,a-b\r\n"])
+
+
+class JobQueueTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.voters = cls.create_voters(3)
+        cls.voters[0].start_session()
+        cls.create_admin()
+
+    def setUp(self):
+        super().setUp()
+        media = self.settings(MEDIA_ROOT=self.temp_dir())
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def reset_pins(self):
+        job = jobs.enqueue("reset_voters", {"reset_pins": True}, user=self.admin_user)
+        self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        return job
+
+    def download(self, job):
+        return self.client.get(reverse("admin_job_download", kwargs={"job_id": job.id}), headers=self.admin_headers())
+
+    def test_reset_voters_runs_in_the_background(self):
+        response = self.client.post(
+            reverse("admin_reset_voters"), {"reset_pins": True}, content_type="application/json", headers=self.admin_headers()
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Job.objects.get(pk=response.json()["job"]["id"]).status, "queued")
+        self.assertEqual(jobs.run_pending(), 1)
+        job = Job.objects.get(pk=response.json()["job"]["id"])
+        self.assertEqual((job.status, job.progress, job.total), ("succeeded", len(self.voters), len(self.voters)))
+        self.assertEqual(job.result["pins_issued"], len(self.voters))
+        self.assertFalse(Voter.objects.filter(session_token__isnull=False).exists())
+
+    @override_settings(JOB_RETRY_DELAY=0)
+    def test_failing_jobs_are_retried_then_failed(self):
+        calls = []
+
+        def flaky(payload, ctx):
+            calls.append(1)
+            raise RuntimeError("boom")
+
+        with mock.patch.dict(jobs.HANDLERS, {"flaky": flaky}):
+            job = jobs.enqueue("flaky", max_attempts=2)
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, len(calls)), ("failed", 2, 2))
+        self.assertIn("RuntimeError: boom", job.error)
+
+    def test_new_pins_are_downloaded_as_csv(self):
+        response = self.download(self.reset_pins())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "no-store")
+        rows = list(csv.reader(io.StringIO(response.content.decode())))
+        self.assertEqual(rows[0], ["voter_id", "pin"])
+        pins = dict(rows[1:])
+        self.assertEqual(set(pins), {v.voter_id for v in self.voters})
+        for voter in Voter.objects.all():
+            self.assertTrue(voter.check_pin(pins[voter.voter_id]))
+
+    def test_pin_file_can_be_downloaded_once(self):
+        job = self.reset_pins()
+        self.assertEqual(self.download(job).status_code, 200)
+        again = self.download(job)
+        self.assertEqual((again.status_code, again.json()["error"]), (404, "File was already downloaded"))
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, "exports")), [])
+        job.refresh_from_db()
+        self.assertIsNone(job.result["file"])
+
+    def test_pins_never_reach_the_job_row(self):
+        job = self.reset_pins()
+        pins = dict(list(csv.reader(io.StringIO(self.download(job).content.decode())))[1:])
+        job.refresh_from_db()
+        stored = json.dumps(job.result)
+        detail = self.client.get(reverse("admin_job_detail", kwargs={"job_id": job.id}), headers=self.admin_headers())
+        for pin in pins.values():
+            self.assertNotIn(f'"{pin}"', stored)
+            self.assertNotIn(f'"{pin}"', detail.content.decode())
+
+    def test_stale_jobs_are_requeued(self):
+        crashed = jobs.enqueue("reset_voters", max_attempts=2)
+        self.assertEqual(jobs.claim_next("dead-worker:1").pk, crashed.pk)
+        Job.objects.filter(pk=crashed.pk).update(locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(jobs.requeue_stale(timeout=60), (1, 0))
+        crashed.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.locked_by), ("queued", ""))
+
+    def test_stale_jobs_fail_once_attempts_are_used(self):
+        crashed = jobs.enqueue("reset_voters", max_attempts=1)
+        self.assertEqual(jobs.claim_next("dead-worker:1").pk, crashed.pk)
+        Job.objects.filter(pk=crashed.pk).update(locked_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(jobs.requeue_stale(timeout=60), (0, 1))
+        crashed.refresh_from_db()
+        self.assertEqual((crashed.status, crashed.attempts, crashed.locked_by), ("failed", 1, ""))
+        self.assertIsNotNone(crashed.finished_at)
+        self.assertIsNone(jobs.claim_next("dead-worker:1"))
+
+
+@override_settings(JOB_HEARTBEAT_INTERVAL=0.05)
+class JobHeartbeatTests(TransactionTestCase):
+    """The heartbeat writes from its own thread, which only sees committed rows."""
+
+    def run_slow_job(self, handler):
+        with mock.patch.dict(jobs.HANDLERS, {"slow": handler}):
+            job = jobs.enqueue("slow")
+            jobs.run_pending()
+        job.refresh_from_db()
+        return job
+
+    def test_silent_handler_is_not_requeued(self):
+        def slow(payload, ctx):
+            time.sleep(0.4)  # no ctx.progress calls, like a large export
+            return {"stale": jobs.requeue_stale(timeout=0.2)}
+
+        job = self.run_slow_job(slow)
+        self.assertEqual((job.status, job.attempts, job.result), ("succeeded", 1, {"stale": [0, 0]}))
+
+    def test_heartbeat_stops_with_the_job(self):
+        job = self.run_slow_job(lambda payload, ctx: {})
+        self.assertEqual(job.status, "succeeded")
+        self.assertNotIn(f"job-{job.id}-heartbeat", [thread.name for thread in threading.enumerate()])
+
+
+class TurnoutTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+
+    def turnout(self):
+        return analytics.turnout(self.election)
+
+    def test_breakdowns_add_up_to_the_totals(self):
+        data = self.turnout()
+        self.assertEqual((data["total_voters"], data["voted_count"]), (len(self.voters), len(self.voted)))
+        self.assertEqual(sum(b["voted"] for b in data["by_batch_year"]), data["voted_count"])
+        self.assertEqual(sum(c["total"] for c in data["by_chapter"]), data["total_voters"])
+
+    def test_repeated_reads_come_from_the_cache(self):
+        self.turnout()
+        with self.assertNumQueries(0):
+            self.turnout()
+
+    def test_a_new_ballot_refreshes_the_cache(self):
+        self.turnout()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("submit_ballot"), self.ballot_payload(), content_type="application/json", headers=self.voter_headers()
+            )
+        self.assertEqual(self.turnout()["voted_count"], len(self.voted) + 1)
+
+
+class TurnoutTimeseriesTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.create_admin()
+
+    def timeseries(self, hours, step=1):
+        now = timezone.now()
+        response = self.client.get(
+            reverse("admin_turnout_timeseries"),
+            {
+                "start": (now - timedelta(hours=hours)).isoformat(),
+                "end": (now + timedelta(minutes=1)).isoformat(),
+                "step": step,
+            },
+            headers=self.admin_headers(),
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_rebuild_counts_existing_ballots(self):
+        self.assertEqual(analytics.rebuild_ballot_buckets(self.election), len(self.voted))
+
+    def test_new_ballots_land_in_the_series(self):
+        analytics.rebuild_ballot_buckets(self.election)
+        self.client.post(
+            reverse("submit_ballot"), self.ballot_payload(), content_type="application/json", headers=self.voter_headers()
+        )
+        data = self.timeseries(hours=1)
+        self.assertEqual(data["total"], len(self.voted) + 1)
+        self.assertEqual(sum(point["count"] for point in data["points"]), data["total"])
+        self.assertEqual(analytics.rebuild_ballot_buckets(self.election), data["total"])
+
+    def test_long_ranges_are_capped_at_240_points(self):
+        analytics.rebuild_ballot_buckets(self.election)
+        data = self.timeseries(hours=6)
+        self.assertEqual(data["step_minutes"], 2)  # 6h of minutes
+        self.assertLessEqual(len(data["points"]), 240)
+
+
+class ParticipationTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.create_admin()
+
+    def submit(self):
+        return self.client.post(
+            reverse("submit_ballot"), self.ballot_payload(), content_type="application/json", headers=self.voter_headers()
+        )
+
+    def has_voted(self):
+        return self.client.get(reverse("voter_me"), headers=self.voter_headers()).json()["voter"]["has_voted"]
+
+    def test_a_second_ballot_is_refused(self):
+        self.assertEqual(self.submit().status_code, 201)
+        self.assertEqual(self.submit().json()["error"], "You already submitted your ballot")
+        self.assertEqual(Participation.objects.filter(election=self.election).count(), len(self.voted) + 1)
+
+    def test_voter_me_reports_the_ballot(self):
+        self.assertFalse(self.has_voted())
+        self.submit()
+        self.assertTrue(self.has_voted())
+
+    def test_a_new_election_starts_with_nobody_voted(self):
+        self.submit()
+        response = self.client.post(
+            reverse("admin_active_election"),
+            {
+                "name": "Next",
+                "nomination_start": "2031-01-01T00:00:00",
+                "nomination_end": "2031-01-10T00:00:00",
+                "voting_start": "2031-01-11T00:00:00",
+                "voting_end": "2031-01-12T00:00:00",
+            },
+            content_type="application/json",
+            headers=self.admin_headers(),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(self.has_voted())  # no voter rows were touched
+        self.assertEqual(Participation.objects.filter(election=self.election).count(), len(self.voted) + 1)
+
+
+class ArchiveTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.nominations = cls.create_nominations(cls.election, cls.positions, cls.voters[1:])
+        Election.objects.filter(pk=cls.election.pk).update(voting_end=timezone.now() - timedelta(minutes=5))
+        note = Notification.objects.create(type="nomination_submitted", message="Thanks", voter=cls.voters[1])
+        Notification.objects.filter(pk=note.pk).update(created_at=timezone.now() - timedelta(days=6))
+
+    def setUp(self):
+        super().setUp()
+        archive_dir = self.settings(ARCHIVE_DIR=self.temp_dir())
+        archive_dir.enable()
+        self.addCleanup(archive_dir.disable)
+
+    def archive(self):
+        call_command("archive_election", self.election.pk, "--batch-size", "2", stdout=io.StringIO())
+
+    def archive_after_a_crash(self):
+        """Kill the first run on its second batch, then run again."""
+        real_commit = archive._commit_batch
+        commits = []
+
+        def crash_on_second_batch(*args):
+            commits.append(1)
+            if len(commits) == 2:
+                raise RuntimeError("worker killed")
+            return real_commit(*args)
+
+        with mock.patch.object(archive, "_commit_batch", crash_on_second_batch), self.assertRaises(RuntimeError):
+            self.archive()
+        self.archive()
+
+    def archived_rows(self):
+        record = ElectionArchive.objects.get(election=self.election)
+        self.assertEqual(record.status, "completed")
+        with gzip.open(record.path, "rt") as fh:
+            return [json.loads(line) for line in fh]
+
+    def test_resumed_archive_writes_each_row_once(self):
+        expected = {
+            "elections.vote": Vote.objects.filter(position__election=self.election).count(),
+            "elections.nomination": len(self.nominations),
+            "elections.notification": 1,
+        }
+        self.archive_after_a_crash()
+        rows = self.archived_rows()
+        seen = {}
+        for row in rows:
+            seen.setdefault(row["model"], set()).add(row["pk"])
+        self.assertEqual({model: len(pks) for model, pks in seen.items()}, expected)
+        self.assertEqual(len(rows), sum(expected.values()))
+
+    def test_archived_rows_are_removed(self):
+        self.archive()
+        self.assertFalse(Vote.objects.filter(position__election=self.election).exists())
+        self.assertFalse(Nomination.objects.filter(election=self.election).exists())
+        self.assertFalse(Notification.objects.filter(type="nomination_submitted").exists())
+
+    def test_archived_photos_are_kept_by_the_collector(self):
+        media = self.settings(MEDIA_ROOT=self.temp_dir())
+        media.enable()
+        self.addCleanup(media.disable)
+        name = storage.photo_storage().save("p.png", SimpleUploadedFile("p.png", png_header(1, 1)))
+        Nomination.objects.filter(pk=self.nominations[0].pk).update(nominee_photo=name)
+
+        self.archive_after_a_crash()
+        self.assertEqual(storage.collect_garbage(grace=0)["deleted"], 0)
+        self.assertEqual(MediaBlob.objects.get(name=name).refs, 1)
+        self.assertTrue(storage.photo_storage().exists(name))
+        rows = self.archived_rows()
+        self.assertIn(name, [row["fields"]["nominee_photo"] for row in rows if row["model"] == "elections.nomination"])
+
+    def test_published_results_survive_archiving(self):
+        def standings():
+            positions = self.client.get(reverse("published_results")).json()["positions"]
+            return [[(c["id"], c["votes"], c["winner"]) for c in pos["candidates"]] for pos in positions]
+
+        before = standings()
+        self.archive_after_a_crash()
+        self.assertEqual(standings(), before)
+
+
+class ElectionHistoryTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.create_admin()
+
+    def publish_after_close(self):
+        Election.objects.filter(pk=self.election.pk).update(voting_end=timezone.now() - timedelta(minutes=1))
+        self.client.post(
+            reverse("admin_publish_results"), {"publish": True}, content_type="application/json", headers=self.admin_headers()
+        )
+
+    def results(self):
+        return self.client.get(reverse("election_results", kwargs={"election_id": self.election.id}))
+
+    def test_results_are_missing_until_the_summary_is_frozen(self):
+        self.assertEqual(self.results().status_code, 404)
+        self.publish_after_close()
+        self.assertEqual(self.results().status_code, 200)
+
+    def test_history_never_reads_votes(self):
+        self.publish_after_close()
+        with CaptureQueriesContext(connection) as ctx:
+            index = self.client.get(reverse("elections_index")).json()
+            self.results()
+        self.assertFalse([q for q in ctx.captured_queries if "elections_vote" in q["sql"]])
+        self.assertEqual([e["id"] for e in index["elections"]], [self.election.id])
+
+    def test_summary_matches_the_votes(self):
+        self.publish_after_close()
+        detail = self.results().json()
+        self.assertEqual(detail["ballots_cast"], len(self.voted))
+        self.assertEqual(
+            sum(c["votes"] for pos in detail["positions"] for c in pos["candidates"]),
+            Vote.objects.filter(position__election=self.election).count(),
+        )
+        for pos in detail["positions"]:
+            top = max(c["votes"] for c in pos["candidates"])
+            self.assertEqual(
+                {c["full_name"] for c in pos["candidates"] if c["winner"]},
+                {c["full_name"] for c in pos["candidates"] if c["votes"] == top},
+            )
+
+
+class TallyTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.runoff, cls.at_large = cls.positions
+        Position.objects.filter(pk=cls.runoff.pk).update(tally_method="irv")
+        Position.objects.filter(pk=cls.at_large.pk).update(seats=2)
+        cls.ranked = [c.id for c in cls.candidates if c.position_id == cls.runoff.id][::-1]
+        cls.marks = [c.id for c in cls.candidates if c.position_id == cls.at_large.id][:2]
+
+    def submit(self, runoff, at_large):
+        payload = {"votes": {str(self.runoff.id): runoff, str(self.at_large.id): at_large}}
+        return self.client.post(reverse("submit_ballot"), payload, content_type="application/json", headers=self.voter_headers())
+
+    def test_instant_runoff_moves_eliminated_ballots(self):
+        # 4 x (A), 3 x (B, A), 2 x (C, B): A leads on first choices, B wins once C's ballots move
+        ballots = tally.Ballots([(0,)] * 4 + [(1, 0)] * 3 + [(2, 1)] * 2, 3)
+        with mock.patch.object(tally, "np", None):
+            winner, rounds = tally.instant_runoff(ballots)
+        self.assertEqual((winner, [r["eliminated"] for r in rounds]), (1, [2, None]))
+        self.assertEqual(rounds[-1]["counts"], [4, 5, 0])
+
+    def test_top_n_keeps_ties_at_the_cut(self):
+        self.assertEqual(tally.top_n([5, 3, 3, 0], 2), [0, 1, 2])
+
+    def test_more_marks_than_seats_are_refused(self):
+        response = self.submit(self.ranked, self.marks + [self.marks[0]])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Vote.objects.filter(voter=self.voter).exists())
+
+    def test_rankings_are_stored_in_order(self):
+        self.assertEqual(self.submit(self.ranked, self.marks).status_code, 201)
+        stored = Vote.objects.filter(voter=self.voter, position=self.runoff).order_by("rank")
+        self.assertEqual(list(stored.values_list("candidate_id", flat=True)), self.ranked)
+
+    def test_results_use_each_positions_method(self):
+        self.submit(self.ranked, self.marks)
+        results = {p["position_id"]: p for p in self.client.get(reverse("published_results")).json()["positions"]}
+        self.assertEqual(results[self.runoff.id]["tally_method"], "irv")
+        self.assertEqual(sum(c["votes"] for c in results[self.runoff.id]["candidates"]), len(self.voted) + 1)
+        self.assertGreaterEqual(sum(c["winner"] for c in results[self.at_large.id]["candidates"]), 2)
+
+
+class PhotoVariantTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.election = cls.create_election()
+        cls.candidates = cls.create_candidates(cls.create_positions(cls.election, 1), 2)
+        cls.create_admin()
+
+    def setUp(self):
+        super().setUp()
+        media = self.settings(MEDIA_ROOT=self.temp_dir())
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def upload(self, candidate):
+        buf = io.BytesIO()
+        Image.new("RGB", (1200, 800), (200, 30, 30)).save(buf, format="JPEG")
+        response = self.client.post(
+            reverse("admin_candidate_photo", kwargs={"candidate_id": candidate.id}),
+            {"photo": SimpleUploadedFile("me.jpg", buf.getvalue(), content_type="image/jpeg")},
+            headers=self.admin_headers(),
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_upload_answers_before_variants_exist(self):
+        self.assertEqual(self.upload(self.candidates[0]).json()["photo_variants"], {})
+        self.assertEqual(jobs.run_pending(), 1)
+
+    def test_variants_are_scaled_per_size(self):
+        first = self.candidates[0]
+        self.upload(first)
+        jobs.run_pending()
+        first.refresh_from_db()
+        self.assertEqual(set(first.photo_variants["jpeg"]), {"sm", "md", "lg"})
+        with default_storage.open(first.photo_variants["jpeg"]["md"]) as fh:
+            self.assertEqual(max(Image.open(fh).size), 480)
+
+    def test_identical_photos_share_variants(self):
+        first, second = self.candidates
+        self.upload(first)
+        self.upload(second)
+        self.assertEqual(jobs.run_pending(), 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.photo_variants, second.photo_variants)
+
+    def test_candidates_list_links_the_variants(self):
+        first = self.candidates[0]
+        self.upload(first)
+        jobs.run_pending()
+        data = self.client.get(reverse("candidates_list")).json()
+        urls = next(c for c in data if c["id"] == first.id)["photo_variants"]
+        self.assertTrue(urls["jpeg"]["sm"].startswith("http://testserver/media/thumbs/"))
+
+
+class PhotoStorageTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.election = cls.create_election()
+        positions = cls.create_positions(cls.election, 1)
+        cls.candidates = cls.create_candidates(positions, 2)
+        (cls.nomination,) = cls.create_nominations(cls.election, positions, cls.create_voters(1))
+        cls.create_admin()
+
+    def setUp(self):
+        super().setUp()
+        media = self.settings(MEDIA_ROOT=self.temp_dir())
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def upload(self, candidate, color=(1, 2, 3)):
+        buf = io.BytesIO()
+        Image.new("RGB", (40, 40), color).save(buf, format="PNG")
+        self.client.post(
+            reverse("admin_candidate_photo", kwargs={"candidate_id": candidate.id}),
+            {"photo": SimpleUploadedFile("p.png", buf.getvalue(), content_type="image/png")},
+            headers=self.admin_headers(),
+        )
+        candidate.refresh_from_db()
+        return MediaBlob.objects.get(name=candidate.photo.name)
+
+    def thumbs(self, blob):
+        return f"thumbs/{blob.sha256[:2]}/{blob.sha256}/variants.json"
+
+    def test_identical_photos_share_one_blob(self):
+        first, second = self.candidates
+        blob = self.upload(first)
+        self.assertEqual(self.upload(second), blob)
+        self.assertEqual(first.photo.name, second.photo.name)
+        self.assertTrue(blob.name.startswith("blobs/"))
+        self.assertEqual(MediaBlob.objects.get().refs, 2)
+
+    def test_variants_are_generated_once_per_blob(self):
+        blob = self.upload(self.candidates[0])
+        self.upload(self.candidates[1])
+        jobs.run_pending()
+        self.assertTrue(default_storage.exists(self.thumbs(blob)))
+
+    def test_promotion_shares_the_blob(self):
+        blob = self.upload(self.candidates[0])
+        Nomination.objects.filter(pk=self.nomination.pk).update(nominee_photo=blob.name)
+        self.client.post(
+            reverse("admin_promote_nomination", kwargs={"nomination_id": self.nomination.id}),
+            headers=self.admin_headers(),
+        )
+        self.assertEqual(MediaBlob.objects.get(pk=blob.pk).refs, 2)
+        self.assertEqual(MediaBlob.objects.count(), 1)
+
+    def test_replacing_and_deleting_release_the_blob(self):
+        first, second = self.candidates
+        blob = self.upload(first)
+        self.upload(second)
+        self.upload(first, color=(9, 9, 9))
+        self.client.delete(reverse("admin_candidate_photo", kwargs={"candidate_id": second.id}), headers=self.admin_headers())
+        self.assertEqual(MediaBlob.objects.get(pk=blob.pk).refs, 0)
+
+    def test_collector_recounts_before_sweeping(self):
+        first, second = self.candidates
+        blob = self.upload(first)
+        self.upload(second)
+        jobs.run_pending()
+        kept = self.upload(first, color=(9, 9, 9))
+        Candidate.objects.filter(photo=blob.name).delete()  # bulk deletes are not tracked
+        self.assertEqual(storage.collect_garbage(grace=3600)["deleted"], 0)
+        self.assertEqual(storage.collect_garbage(grace=0)["deleted"], 1)
+        self.assertFalse(MediaBlob.objects.filter(pk=blob.pk).exists())
+        self.assertFalse(default_storage.exists(blob.name))
+        self.assertFalse(default_storage.exists(self.thumbs(blob)))
+        self.assertTrue(default_storage.exists(kept.name))
+
+
+class MediaServingTests(ElectionTestCase):
+    def setUp(self):
+        super().setUp()
+        media = self.settings(MEDIA_ROOT=self.temp_dir())
+        media.enable()
+        self.addCleanup(media.disable)
+        self.data = png_header(1, 1) + bytes(range(200))
+        self.name = storage.photo_storage().save("x.png", SimpleUploadedFile("x.png", self.data))
+        self.url = "/media/" + self.name
+
+    def test_files_are_cached_for_good_and_revalidate(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(self.client.get(self.url, headers={"If-None-Match": response["ETag"]}).status_code, 304)
+
+    def test_byte_ranges(self):
+        partial = self.client.get(self.url, headers={"Range": "bytes=10-13"})
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial["Content-Range"], f"bytes 10-13/{len(self.data)}")
+        self.assertEqual(b"".join(partial.streaming_content), self.data[10:14])
+        self.assertEqual(self.client.get(self.url, headers={"Range": "bytes=-5"})["Content-Length"], "5")
+        self.assertEqual(self.client.get(self.url, headers={"Range": "bytes=500-"}).status_code, 416)
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.client.get(self.url, headers={"Range": "bytes=10-13", "If-Range": '"other"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_only_photo_directories_are_served(self):
+        default_storage.save("exports/secret.csv", SimpleUploadedFile("secret.csv", b"voter,pin"))
+        self.assertEqual(self.client.get("/media/exports/secret.csv").status_code, 404)
+        self.assertEqual(self.client.get("/media/blobs/../exports/secret.csv").status_code, 404)
+
+    def test_only_images_are_served(self):
+        default_storage.save("nominations/page.html", SimpleUploadedFile("page.html", b"<script>alert(1)</script>"))
+        self.assertEqual(self.client.get("/media/nominations/page.html").status_code, 404)
+        response = self.client.get(self.url)
+        self.assertEqual((response["Content-Type"], response["X-Content-Type-Options"]), ("image/png", "nosniff"))
+
+    def test_blobs_are_named_after_the_detected_format(self):
+        disguised = SimpleUploadedFile("evil.html", png_header(1, 1) + b"<script>alert(1)</script>")
+        self.assertTrue(storage.photo_storage().save("evil.html", disguised).endswith(".png"))
+        other = SimpleUploadedFile("page.png", b"<script>alert(1)</script>")
+        self.assertTrue(storage.photo_storage().save("page.png", other).endswith(".bin"))
+
+    @override_settings(MEDIA_OFFLOAD="x-accel")
+    def test_offload_hands_the_file_to_the_proxy(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], "/protected-media/" + self.name)
+        self.assertEqual(response.content, b"")
+
+
+def png_header(width, height):
+    """A valid PNG that declares `width` x `height` but carries no pixel data."""
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(b"")) + chunk(b"IEND", b"")
+
+
+class NominationPhotoUploadTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.election = cls.create_election(
+            nomination_start=now - timedelta(days=1),
+            nomination_end=now + timedelta(days=1),
+            voting_start=now + timedelta(days=2),
+            voting_end=now + timedelta(days=3),
+        )
+        cls.positions = cls.create_positions(cls.election, 1)
+        (cls.voter,) = cls.create_voters(1)
+        cls.voter.start_session()
+
+    def setUp(self):
+        super().setUp()
+        media = self.settings(MEDIA_ROOT=self.temp_dir(), PHOTO_UPLOAD_MAX_BYTES=4096)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def nominate(self, name, data):
+        payload = {"position_id": self.positions[0].id, "nominee_full_name": "Pic", "nominee_batch_year": 2001}
+        payload["nominee_photo"] = SimpleUploadedFile(name, data)
+        return self.client.post(reverse("nominate"), payload, headers=self.voter_headers())
+
+    def nominate_rotated_photo(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated: stored sideways
+        photo = io.BytesIO()
+        Image.new("RGB", (300, 200), (10, 120, 200)).save(photo, format="JPEG", exif=exif)
+        response = self.nominate("me.jpg", photo.getvalue())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(jobs.run_pending(), 1)
+        return Nomination.objects.get(nominator=self.voter)
+
+    def test_oversized_uploads_are_refused(self):
+        noise = io.BytesIO()
+        Image.frombytes("RGB", (64, 64), random.Random(7).randbytes(64 * 64 * 3)).save(noise, format="PNG")
+        self.assertEqual(self.nominate("big.png", noise.getvalue()).status_code, 413)
+        self.assertFalse(Nomination.objects.filter(nominator=self.voter).exists())
+
+    def test_huge_dimensions_are_refused_from_the_header(self):
+        response = self.nominate("bomb.png", png_header(6000, 6000))
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("6000x6000", response.json()["error"])
+
+    def test_non_images_are_refused(self):
+        self.assertEqual(self.nominate("notes.txt", b"just text").status_code, 400)
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_images_with_other_extensions_are_refused(self):
+        response = self.nominate("evil.html", png_header(1, 1) + b"<script>alert(1)</script>")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_photos_are_stored_upright_without_exif(self):
+        nomination = self.nominate_rotated_photo()
+        self.assertTrue(nomination.nominee_photo.name.endswith(".jpg"))
+        with nomination.nominee_photo.open("rb") as fh:
+            stored = Image.open(fh)
+            self.assertEqual(stored.size, (200, 300))
+            self.assertNotIn(0x0112, stored.getexif())
+        self.assertTrue(nomination.photo_variants["jpeg"])
+
+    def test_the_original_upload_is_released(self):
+        nomination = self.nominate_rotated_photo()
+        self.assertEqual(MediaBlob.objects.get(name=nomination.nominee_photo.name).refs, 1)
+        self.assertEqual(MediaBlob.objects.exclude(name=nomination.nominee_photo.name).get().refs, 0)
+
+
+class ConditionalGetTests(ElectionTestCase):
+    POLLED = ["current_election", "positions_list", "candidates_list", "published_results", "my_votes"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+
+    def poll(self, name, etag=None):
+        headers = self.voter_headers() if name == "my_votes" else {}
+        if etag:
+            headers["If-None-Match"] = etag
+        return self.client.get(reverse(name), headers=headers)
+
+    def test_unchanged_resources_answer_304(self):
+        for name in self.POLLED:
+            with self.subTest(endpoint=name):
+                first = self.poll(name)
+                self.assertEqual(first.status_code, 200)
+                self.assertIn("no-cache", first["Cache-Control"])
+                with CaptureQueriesContext(connection) as ctx:
+                    again = self.poll(name, first["ETag"])
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again["ETag"], first["ETag"])
+                self.assertLessEqual(len(ctx), 2)
+
+    def test_editing_a_candidate_changes_only_the_candidates_etag(self):
+        etags = {name: self.poll(name)["ETag"] for name in ("candidates_list", "positions_list")}
+        candidate = self.candidates[0]
+        candidate.full_name = "Renamed Candidate"
+        candidate.save(update_fields=["full_name"])
+        changed = self.poll("candidates_list", etags["candidates_list"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etags["candidates_list"])
+        self.assertEqual(self.poll("positions_list", etags["positions_list"]).status_code, 304)
+
+    def test_candidates_etag_follows_ballots_in_this_election_only(self):
+        etag = self.poll("candidates_list")["ETag"]
+        other = self.create_election(name="Other", is_active=False)
+        self.cast_ballots(other, self.voters[-1:], self.create_candidates(self.create_positions(other, 1), 1))
+        self.assertEqual(self.poll("candidates_list", etag).status_code, 304)
+        self.cast_ballots(self.election, [self.voter], self.candidates)
+        self.assertEqual(self.poll("candidates_list", etag).status_code, 200)
+
+    def test_my_votes_changes_with_the_voters_own_ballot(self):
+        etag = self.poll("my_votes")["ETag"]
+        Vote.objects.create(voter=self.voters[-1], position=self.positions[0], candidate=self.candidates[0])
+        self.assertEqual(self.poll("my_votes", etag).status_code, 304)
+        Vote.objects.create(voter=self.voter, position=self.positions[0], candidate=self.candidates[0])
+        self.assertEqual(self.poll("my_votes", etag).status_code, 200)
+
+
+class UpdatedAtTests(ElectionTestCase):
+    def test_shipped_seed_fixture_loads(self):
+        call_command("loaddata", os.path.join(settings.BASE_DIR, "sqlite_seed.json"), verbosity=0)
+        self.assertTrue(Position.objects.exists())
+        self.assertFalse(Position.objects.filter(updated_at=None).exists())
+        self.assertFalse(Candidate.objects.filter(updated_at=None).exists())
+
+    def test_partial_saves_bump_updated_at(self):
+        (position,) = self.create_positions(self.create_election(), 1)
+        Position.objects.filter(pk=position.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        position.refresh_from_db()
+        before = position.updated_at
+        position.save(update_fields=["is_active"])
+        position.refresh_from_db()
+        self.assertGreater(position.updated_at, before)
+
+
+class CompressionTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.create_voting_fixture()
+        cls.create_admin()
+
+    def voters_list(self, headers):
+        return self.client.get(reverse("admin_voters"), headers=headers)
+
+    def test_fast_renderer_matches_drf(self):
+        payload = {"when": timezone.now(), "text": "line\u2028break", "ratio": 1.5, 3: None}
+        self.assertEqual(renderers.dumps(payload), JSONRenderer().render(payload))
+
+    @override_settings(COMPRESS_MIN_SIZE=200)
+    def test_gzip_is_used_when_accepted(self):
+        plain = self.voters_list(self.admin_headers())
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        packed = self.voters_list({**self.admin_headers(), "Accept-Encoding": "gzip;q=1, identity;q=0.5"})
+        self.assertEqual(packed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(packed.content), plain.content)
+        self.assertEqual(packed["Content-Length"], str(len(packed.content)))
+
+    @override_settings(COMPRESS_MIN_SIZE=200)
+    def test_small_or_refused_responses_stay_plain(self):
+        self.assertNotIn("Content-Encoding", self.voters_list({"Accept-Encoding": "gzip"}))  # a short 401
+        self.assertNotIn("Content-Encoding", self.voters_list({**self.admin_headers(), "Accept-Encoding": "gzip;q=0"}))
+
+    @override_settings(COMPRESS_MIN_SIZE=200)
+    def test_compressed_responses_get_a_weak_etag(self):
+        first = self.client.get(reverse("candidates_list"), headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertTrue(first["ETag"].startswith('W/"'))
+        again = self.client.get(
+            reverse("candidates_list"), headers={"Accept-Encoding": "gzip", "If-None-Match": first["ETag"]}
+        )
+        self.assertEqual(again.status_code, 304)
+
+    def test_streamed_exports_are_compressed(self):
+        url = reverse("admin_export", kwargs={"kind": "ballots"})
+        export = self.client.get(url, headers=self.admin_headers())
+        packed = self.client.get(url, headers={**self.admin_headers(), "Accept-Encoding": "gzip"})
+        self.assertEqual(packed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(b"".join(packed.streaming_content)), b"".join(export.streaming_content))
+
+
+class ElectionStatusTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.election = cls.create_election()
+
+    def status(self):
+        return self.client.get(reverse("election_status"))
+
+    def move_voting_end(self, delta):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.election.voting_end = timezone.now() + delta
+            self.election.save(update_fields=["voting_end"])
+
+    def test_status_is_cached_until_the_next_phase(self):
+        first = self.status()
+        data = first.json()
+        self.assertEqual((data["status"], data["phase"], data["is_active"]), ("active", "voting", True))
+        self.assertEqual(first["Cache-Control"], f"public, max-age={phases.max_age()}")  # boundary is a day away
+        self.assertAlmostEqual(data["seconds_remaining"], 86400, delta=5)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.status().json()["phase"], "voting")
+        self.assertEqual(len(ctx), 0)
+
+    def test_max_age_shrinks_near_a_boundary(self):
+        self.status()
+        self.move_voting_end(timedelta(seconds=30))
+        soon = self.status()
+        self.assertLessEqual(soon.json()["seconds_remaining"], 30)
+        self.assertEqual(soon["Cache-Control"], f"public, max-age={soon.json()['seconds_remaining']}")
+
+    def test_phase_changes_once_the_boundary_passes(self):
+        self.move_voting_end(timedelta(seconds=30))
+        self.status()
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() + timedelta(seconds=31)):
+            ended = self.status().json()
+        self.assertEqual((ended["status"], ended["phase"], ended["next_transition"]), ("ended", "closed", None))
+
+    def test_deleting_the_election_clears_the_status(self):
+        self.status()
+        with self.captureOnCommitCallbacks(execute=True):
+            Election.objects.get(pk=self.election.pk).delete()
+        self.assertEqual(self.status().json()["status"], "none")
+
+
+class NominationBatchTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.election = cls.create_election()
+        cls.positions = cls.create_positions(cls.election, 2)
+        cls.candidates = cls.create_candidates(cls.positions, 1)
+        cls.nominations = cls.create_nominations(cls.election, cls.positions, cls.create_voters(4))
+        cls.create_admin()
+
+    def batch(self, actions):
+        return self.client.post(
+            reverse("admin_nominations_batch"), {"actions": actions}, content_type="application/json", headers=self.admin_headers()
+        )
+
+    def test_promotions_reuse_matching_candidates(self):
+        first, second, third = self.nominations[:3]
+        Nomination.objects.filter(pk=second.pk).update(nominee_full_name=first.nominee_full_name, position=first.position)
+        existing = self.candidates[1]
+        Nomination.objects.filter(pk=third.pk).update(nominee_full_name=existing.full_name, position=existing.position)
+        data = self.batch([{"id": n.id, "action": "promote"} for n in (first, second, third)]).json()
+        created = Candidate.objects.get(position=first.position, full_name=first.nominee_full_name)
+        self.assertEqual(created.source_nomination_id, first.id)
+        self.assertEqual(
+            [(r["candidate_id"], r["created"]) for r in data["results"]],
+            [(created.id, True), (created.id, False), (existing.id, False)],
+        )
+        self.assertEqual(
+            set(Nomination.objects.filter(pk__in=[first.pk, second.pk, third.pk]).values_list("status", flat=True)),
+            {"promoted"},
+        )
+
+    def test_each_failed_action_is_reported_and_the_rest_still_run(self):
+        first, fourth = self.nominations[0], self.nominations[3]
+        data = self.batch(
+            [
+                {"id": fourth.id, "action": "reject", "reason": "Not eligible"},
+                {"id": fourth.id, "action": "delete"},
+                {"id": 999999, "action": "delete"},
+                {"id": first.id + 1000000, "action": "reject"},
+                {"id": "x", "action": "promote"},
+                {"id": first.id, "action": "archive"},
+            ]
+        ).json()
+        self.assertEqual((data["succeeded"], data["failed"]), (1, 5))
+        self.assertEqual(
+            [r.get("error") for r in data["results"][1:]],
+            [
+                "Nomination already appears in this batch",
+                "Nomination not found",
+                "Rejection reason is required",
+                "id must be a nomination id",
+                "action must be one of: promote, reject, delete",
+            ],
+        )
+        fourth.refresh_from_db()
+        self.assertEqual((fourth.status, fourth.rejection_reason), ("rejected", "Not eligible"))
+
+    def test_each_outcome_notifies_like_the_single_endpoints(self):
+        notes = Notification.objects.count()
+        first, fourth = self.nominations[0], self.nominations[3]
+        self.batch([{"id": first.id, "action": "promote"}, {"id": fourth.id, "action": "reject", "reason": "Not eligible"}])
+        self.assertEqual(Notification.objects.count(), notes + 3)  # promotion, rejection to voter and admins
+
+    def test_an_empty_batch_is_rejected(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+
+
+class NominationClusterTests(ElectionTestCase):
+    SPELLINGS = ["Maria Clara Santos", "Ma. Clara Santos", "Santos, Maria Clarra", "Maria Clara Santos", "Jose Rizal"]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.election = cls.create_election()
+        cls.position, other = cls.create_positions(cls.election, 2)
+        cls.candidate = Candidate.objects.create(position=cls.position, full_name="Jose  Rizal", batch_year=1995)
+        nominators = cls.create_voters(len(cls.SPELLINGS) + 1)
+        cls.nominations = Nomination.objects.bulk_create(
+            [
+                Nomination(
+                    election=cls.election,
+                    position=cls.position,
+                    nominator=voter,
+                    nominee_full_name=name,
+                    nominee_batch_year=1995,
+                )
+                for voter, name in zip(nominators, cls.SPELLINGS)
+            ]
+        )
+        Nomination.objects.create(  # same spelling, other position: never grouped with the above
+            election=cls.election,
+            position=other,
+            nominator=nominators[-1],
+            nominee_full_name="Maria Clara Santos",
+            nominee_batch_year=1995,
+        )
+        cls.create_admin()
+
+    def clusters(self, **params):
+        response = self.client.get(reverse("admin_nomination_clusters"), params, headers=self.admin_headers())
+        self.assertEqual(response.status_code, 200)
+        return {p["position_id"]: p["clusters"] for p in response.json()["positions"]}
+
+    def test_spelling_variants_form_one_cluster(self):
+        clusters = self.clusters(position=self.position.id)
+        self.assertEqual(list(clusters), [self.position.id])
+        first = clusters[self.position.id][0]
+        self.assertEqual((first["label"], first["batch_year"], first["count"]), ("Maria Clara Santos", 1995, 4))
+        self.assertEqual(first["nomination_ids"], sorted(n.id for n in self.nominations[:4]))
+        self.assertEqual(first["spellings"][0], {"name": "Maria Clara Santos", "count": 2})
+        self.assertIsNone(first["candidate_id"])
+
+    def test_clusters_link_existing_candidates(self):
+        (rizal,) = [c for c in self.clusters(position=self.position.id)[self.position.id] if c["label"] == "Jose Rizal"]
+        self.assertEqual(rizal["candidate_id"], self.candidate.id)
+
+    def test_min_count_hides_single_nominations(self):
+        counts = {pos: [c["count"] for c in found] for pos, found in self.clusters(min_count=2).items()}
+        self.assertEqual(counts[self.position.id], [4])
+        self.assertEqual(sum(map(len, counts.values())), 1)
+
+    def test_a_cluster_promotes_to_one_candidate(self):
+        maria = self.clusters(position=self.position.id)[self.position.id][0]
+        actions = [{"id": i, "action": "promote", "full_name": maria["label"]} for i in maria["nomination_ids"]]
+        promoted = self.client.post(
+            reverse("admin_nominations_batch"), {"actions": actions}, content_type="application/json", headers=self.admin_headers()
+        ).json()
+        self.assertEqual(len({r["candidate_id"] for r in promoted["results"]}), 1)
+        self.assertEqual(Candidate.objects.filter(position=self.position, full_name="Maria Clara Santos").count(), 1)
+
+
+class BroadcastTests(ElectionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.voters = cls.create_voters(2)
+        cls.voter = cls.voters[0]
+        cls.voter.start_session()
+        Notification.objects.create(type="info", message="Voter note", voter=cls.voter)
+        cls.broadcasts = Broadcast.objects.bulk_create([Broadcast(message=f"Announcement {i}") for i in range(2)])
+        BroadcastReceipt.objects.bulk_create([BroadcastReceipt(broadcast=cls.broadcasts[0], voter=v) for v in cls.voters])
+        cls.create_admin()
+
+    def broadcast(self, message="Voting is now open"):
+        response = self.client.post(
+            reverse("admin_broadcasts"), {"message": message}, content_type="application/json", headers=self.admin_headers()
+        )
+        self.assertEqual(response.status_code, 201)
+        return f"b{response.json()['id']}"
+
+    def feed(self, **params):
+        return self.client.get(reverse("voter_notifications"), params, headers=self.voter_headers()).json()
+
+    def act(self, action, ids=()):
+        self.client.post(
+            reverse("voter_notifications"),
+            {"action": action, "ids": list(ids)},
+            content_type="application/json",
+            headers=self.voter_headers(),
+        )
+
+    def test_sending_writes_no_per_voter_rows(self):
+        receipts = BroadcastReceipt.objects.count()
+        self.broadcast()
+        self.assertEqual(BroadcastReceipt.objects.count(), receipts)
+
+    def test_new_broadcasts_top_the_feed_unread(self):
+        feed_id = self.broadcast()
+        first = self.feed()["items"][0]
+        self.assertEqual((first["id"], first["broadcast"], first["is_read"]), (feed_id, True, False))
+
+    def test_mark_read(self):
+        feed_id = self.broadcast()
+        unread = self.feed()["unread_count"]
+        self.act("mark_read", [feed_id])
+        self.assertEqual(self.feed()["unread_count"], unread - 1)
+        self.assertTrue(self.feed()["items"][0]["is_read"])
+
+    def test_dismissed_broadcasts_move_to_history(self):
+        feed_id = self.broadcast()
+        self.act("dismiss", [feed_id])
+        self.assertNotIn(feed_id, [item["id"] for item in self.feed()["items"]])
+        self.assertIn(feed_id, [item["id"] for item in self.feed(history=1)["items"] if item["is_hidden"]])
+
+    def test_mark_all_read_keeps_a_watermark_instead_of_receipts(self):
+        self.act("dismiss", [self.broadcast()])
+        self.act("mark_all_read")
+        self.assertEqual(self.feed()["unread_count"], 0)
+        self.assertEqual(
+            list(BroadcastReceipt.objects.filter(voter=self.voter).values_list("is_hidden", flat=True)), [True]
+        )
+        Broadcast.objects.create(message="Results at 6 PM")
+        self.assertEqual(self.feed()["unread_count"], 1)
+
+    def test_read_counts_include_the_watermark(self):
+        self.act("mark_all_read")
+        later = Broadcast.objects.create(message="Results at 6 PM")
+        listed = self.client.get(reverse("admin_broadcasts"), headers=self.admin_headers()).json()
+        counts = {b["id"]: b["read_count"] for b in listed}
+        self.assertEqual(counts[later.id], 0)
+        self.assertEqual(counts[self.broadcasts[0].id], 2)  # voter by watermark, voters[1] by receipt
+
+    def test_delete_all_hides_broadcasts_for_this_voter_only(self):
+        self.act("delete_all")
+        self.assertEqual([item for item in self.feed()["items"] if item.get("broadcast")], [])
+        self.assertEqual(BroadcastReceipt.objects.filter(voter=self.voter).count(), 0)
+        self.assertEqual(Broadcast.objects.count(), len(self.broadcasts))  # still there for everyone else
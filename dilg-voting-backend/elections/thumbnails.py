@@ -0,0 +1,125 @@
+# elections/thumbnails.py
+"""
+Responsive variants of candidate and nominee photos. Each upload is resized to
+THUMBNAIL_SIZES (longest side, never upscaled) in WebP and JPEG, stored under
+thumbs/<xx>/<sha256>/ so identical photos share one set of files, and recorded in
+the row's `photo_variants`:
+
+    {"hash": "<sha256>", "webp": {"sm": "thumbs/ab/<sha256>/sm.webp", ...}, "jpeg": {...}}
+
+Generation runs in the "photo_variants" background job, off the request path.
+"""
+import hashlib
+import io
+import json
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+from . import uploads
+from .storage import blob_hash
+
+DEFAULT_SIZES = {"sm": 160, "md": 480, "lg": 960}
+QUALITY = {"webp": 80, "jpeg": 82}
+
+
+def sizes():
+    return sorted(getattr(settings, "THUMBNAIL_SIZES", DEFAULT_SIZES).items(), key=lambda item: item[1])
+
+
+def formats():
+    return ("webp", "jpeg") if features.check("webp") else ("jpeg",)
+
+
+def content_hash(fieldfile):
+    known = blob_hash(fieldfile.name)  # content-addressed names already carry it
+    if known:
+        return known
+    digest = hashlib.sha256()
+    with fieldfile.open("rb") as fh:
+        for chunk in fh.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(image, fmt):
+    if fmt == "jpeg" and image.mode != "RGB":
+        # JPEG has no alpha: flatten onto white
+        flat = Image.new("RGB", image.size, (255, 255, 255))
+        flat.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+        image = flat
+    out = io.BytesIO()
+    image.save(out, format=fmt.upper(), quality=QUALITY[fmt], optimize=True)
+    return out.getvalue()
+
+
+def build_variants(fieldfile):
+    """Create (or reuse) the variants of `fieldfile` and return the photo_variants map."""
+    digest = content_hash(fieldfile)
+    base = f"thumbs/{digest[:2]}/{digest}"
+    manifest = f"{base}/variants.json"
+    if default_storage.exists(manifest):
+        # the same bytes were processed before (re-upload, promoted nominee photo)
+        with default_storage.open(manifest, "rb") as fh:
+            return json.load(fh)
+
+    wanted = sizes()
+    with fieldfile.open("rb") as fh:
+        image = Image.open(fh)
+        # JPEG sources decode straight at a reduced scale when far larger than needed
+        image.draft("RGB", (wanted[-1][1], wanted[-1][1]))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+
+    variants = {"hash": digest}
+    for fmt in formats():
+        paths = variants.setdefault(fmt, {})
+        for name, edge in wanted:
+            path = f"{base}/{name}.{'jpg' if fmt == 'jpeg' else fmt}"
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            if default_storage.exists(path):
+                default_storage.delete(path)  # leftover of an interrupted run
+            paths[name] = default_storage.save(path, ContentFile(_encode(resized, fmt)))
+            if edge >= max(image.size):
+                break  # larger sizes would only repeat the original
+    # written last: its presence means the whole set is there
+    default_storage.save(manifest, ContentFile(json.dumps(variants).encode()))
+    return variants
+
+
+def reencode(fieldfile):
+    """
+    Decode an uploaded photo and encode it again (upright, at most
+    PHOTO_UPLOAD_MAX_EDGE px, metadata dropped). Returns (ContentFile, extension);
+    raises OSError/ValueError for files that do not decode.
+    """
+    edge = getattr(settings, "PHOTO_UPLOAD_MAX_EDGE", 2048)
+    with fieldfile.open("rb") as fh:
+        image = Image.open(fh)
+        width, height = image.size
+        if width * height > uploads.max_pixels():
+            raise ValueError(f"Image is too large ({width}x{height} pixels).")
+        image.draft("RGB", (edge, edge))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+    image.thumbnail((edge, edge), Image.LANCZOS)
+    if image.mode == "RGBA":
+        out = io.BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        return ContentFile(out.getvalue()), ".png"
+    return ContentFile(_encode(image, "jpeg")), ".jpg"
+
+
+def variant_urls(variants, build_url=None):
+    """{"webp": {"sm": url, ...}, "jpeg": {...}} for API responses (empty until generated)."""
+    if not variants:
+        return {}
+    build_url = build_url or (lambda url: url)
+    return {
+        fmt: {name: build_url(default_storage.url(path)) for name, path in variants[fmt].items()}
+        for fmt in ("webp", "jpeg")
+        if variants.get(fmt)
+    }
@@ -0,0 +1,164 @@
+# elections/uploads.py
+"""
+Bounded photo uploads. `bounded_photo_upload` installs BoundedPhotoUploadHandler
+on a view, before DRF parses the body:
+
+- a declared Content-Length over the limit is refused before any byte is read;
+- files are streamed to a temporary file on disk, never held in memory, and the
+  upload stops as soon as it passes PHOTO_UPLOAD_MAX_BYTES;
+- the image header (format and dimensions only, no pixel data) is read from the
+  first chunks, so unsupported files and decompression bombs are refused early.
+
+A refused upload leaves (status, message) on the request (`upload_error`):
+413 for files over the limits, 400 for anything that is not a supported image.
+Full decoding and re-encoding happen in the "photo_variants" job.
+"""
+import io
+import warnings
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.template.defaultfilters import filesizeformat
+from django.utils.datastructures import MultiValueDict
+from PIL import Image
+
+ALLOWED_FORMATS = ("JPEG", "PNG", "WEBP")
+# stored blobs are named after the detected format, never the client's file name
+FORMAT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+ALLOWED_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+HEADER_BYTES = 256 * 1024  # JPEG EXIF blocks can push the size marker back
+FORM_OVERHEAD = 64 * 1024  # room for the other form fields and multipart boundaries
+UNSUPPORTED = "Upload a JPEG, PNG or WebP image."
+
+
+def max_bytes():
+    return getattr(settings, "PHOTO_UPLOAD_MAX_BYTES", 5 * 1024 * 1024)
+
+
+def max_pixels():
+    return getattr(settings, "PHOTO_UPLOAD_MAX_PIXELS", 24_000_000)
+
+
+class RejectedUpload(Exception):
+    def __init__(self, message, status=413):
+        super().__init__(message)
+        self.status = status
+
+
+def inspect_header(data):
+    """
+    (format, (width, height)) read from the start of an image file without
+    decoding pixels. Raises RejectedUpload for unsupported or oversized images
+    and ValueError when `data` is too short to tell.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+        try:
+            image = Image.open(io.BytesIO(data), formats=ALLOWED_FORMATS)
+        except Image.DecompressionBombError:
+            raise RejectedUpload("Image dimensions are too large.")
+        except Exception as exc:  # PIL raises assorted errors on truncated headers
+            raise ValueError(str(exc))
+    width, height = image.size
+    if width * height > max_pixels():
+        raise RejectedUpload(f"Image is too large ({width}x{height} pixels).")
+    return image.format, image.size
+
+
+def sniff_format(fh):
+    """Image format of a file from its header, or None if it is not a supported image."""
+    fh.seek(0)
+    data = fh.read(HEADER_BYTES)
+    fh.seek(0)
+    try:
+        return inspect_header(data)[0]
+    except (RejectedUpload, ValueError):
+        return None
+
+
+def inspect_file(fh):
+    """inspect_header for a complete file (uploads that did not go through the handler)."""
+    fh.seek(0)
+    data = fh.read(HEADER_BYTES)
+    fh.seek(0)
+    try:
+        return inspect_header(data)
+    except ValueError:
+        raise RejectedUpload(UNSUPPORTED, status=400)
+
+
+class BoundedPhotoUploadHandler(FileUploadHandler):
+    """Spools each file to disk, enforcing byte and pixel limits while it streams in."""
+
+    def __init__(self, request=None, limit=None):
+        super().__init__(request)
+        self.limit = limit or max_bytes()
+
+    def reject(self, message, status=413):
+        self.request.upload_error = (status, message)
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.limit + FORM_OVERHEAD:
+            self.request.upload_error = (413, f"Upload is larger than {filesizeformat(self.limit)}.")
+            return QueryDict(encoding=encoding), MultiValueDict()  # body left unread
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        if getattr(self.request, "upload_error", None):
+            raise StopUpload(connection_reset=True)
+        self.file = TemporaryUploadedFile(file_name, content_type, 0, charset, content_type_extra)
+        self.received = 0
+        self.header = b""
+        self.image_info = None
+
+    def _check_header(self, final=False):
+        try:
+            self.image_info = inspect_header(self.header)
+        except RejectedUpload as exc:
+            self.reject(str(exc), exc.status)
+        except ValueError:
+            if final or len(self.header) >= HEADER_BYTES:
+                self.reject(UNSUPPORTED, 400)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.limit:
+            self.reject(f"Photo is larger than {filesizeformat(self.limit)}.")
+        if self.image_info is None:
+            self.header += raw_data[: HEADER_BYTES - len(self.header)]
+            self._check_header()
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.image_info is None:
+            self._check_header(final=True)
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.image_format, self.file.image_size = self.image_info
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, "file"):
+            self.file.close()
+
+
+def bounded_photo_upload(view):
+    """Install BoundedPhotoUploadHandler; wrap outside @api_view so it runs before parsing."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers = [BoundedPhotoUploadHandler(request)]
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def upload_error(request):
+    """(status, message) left by a refused upload, or None (parse request.data first)."""
+    return getattr(request, "upload_error", None)
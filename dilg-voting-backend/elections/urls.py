@@ -5,46 +5,64 @@ from . import views
 
 urlpatterns = [
     # Access gate
-    path("access/status/", views.access_status),
-    path("access/check/", views.access_check),
+    path("access/status/", views.access_status, name="access_status"),
+    path("access/check/", views.access_check, name="access_check"),
 
     # Public / Voter
-    path("voter/login/", views.voter_login),
-    path("voter/quick-login/", views.voter_quick_login),
-    path("voter/logout/", views.voter_logout),
-    path("voter/me/", views.voter_me),
+    path("voter/login/", views.voter_login, name="voter_login"),
+    path("voter/quick-login/", views.voter_quick_login, name="voter_quick_login"),
+    path("voter/logout/", views.voter_logout, name="voter_logout"),
+    path("voter/me/", views.voter_me, name="voter_me"),
 
-    path("elections/current/", views.current_election),
-    path("elections/results/", views.published_results),
-    path("positions/", views.positions_list),
-    path("candidates/", views.candidates_list),
+    path("elections/current/", views.current_election, name="current_election"),
+    path("election-status/", views.election_status, name="election_status"),
+    path("elections/results/", views.published_results, name="published_results"),
+    path("elections/", views.elections_index, name="elections_index"),
+    path("elections/<int:election_id>/results/", views.election_results, name="election_results"),
+    path("positions/", views.positions_list, name="positions_list"),
+    path("candidates/", views.candidates_list, name="candidates_list"),
 
-    path("nominate/", views.nominate),
-    path("my-nomination/", views.my_nomination),
+    path("nominate/", views.nominate, name="nominate"),
+    path("my-nomination/", views.my_nomination, name="my_nomination"),
 
-    path("ballot/submit/", views.submit_ballot),
-    path("my-votes/", views.my_votes),
+    path("ballot/submit/", views.submit_ballot, name="submit_ballot"),
+    path("my-votes/", views.my_votes, name="my_votes"),
 
     # Admin / Staff
-    path("admin/login/", views.admin_login),
-    path("admin/logout/", views.admin_logout),
-    path("admin/me/", views.admin_me),
-    path("admin/voters/", views.admin_voters),
-    path("admin/tally/", views.admin_tally),
-    path("admin/stats/", views.admin_stats),
-    path("admin/nominations/", views.admin_nominations),
-    path("admin/nominations/<int:nomination_id>/promote/", views.admin_promote_nomination),
-    path("admin/nominations/<int:nomination_id>/reject/", views.admin_reject_nomination),
-    path("admin/nominations/<int:nomination_id>/delete/", views.admin_delete_nomination),
-    path("admin/reminders/", views.admin_reminders),
-    path("admin/election/active/", views.admin_active_election),
-    path("admin/election/publish/", views.admin_publish_results),
-    path("admin/election/demo-phase/", views.admin_demo_phase),
-    path("admin/notifications/", views.admin_notifications),
-    path("admin/reset-voters/", views.admin_reset_voters),
-    path("admin/reset-election/", views.admin_reset_election),
-    path("admin/candidates/<int:candidate_id>/photo/", views.admin_candidate_photo),
+    path("admin/login/", views.admin_login, name="admin_login"),
+    path("admin/logout/", views.admin_logout, name="admin_logout"),
+    path("admin/me/", views.admin_me, name="admin_me"),
+    path("admin/voters/", views.admin_voters, name="admin_voters"),
+    path("admin/tally/", views.admin_tally, name="admin_tally"),
+    path("admin/stats/", views.admin_stats, name="admin_stats"),
+    path("admin/turnout/", views.admin_turnout, name="admin_turnout"),
+    path("admin/turnout/timeseries/", views.admin_turnout_timeseries, name="admin_turnout_timeseries"),
+    path("admin/nominations/", views.admin_nominations, name="admin_nominations"),
+    path("admin/nominations/clusters/", views.admin_nomination_clusters, name="admin_nomination_clusters"),
+    path("admin/nominations/batch/", views.admin_nominations_batch, name="admin_nominations_batch"),
+    path("admin/nominations/<int:nomination_id>/promote/", views.admin_promote_nomination, name="admin_promote_nomination"),
+    path("admin/nominations/<int:nomination_id>/reject/", views.admin_reject_nomination, name="admin_reject_nomination"),
+    path("admin/nominations/<int:nomination_id>/delete/", views.admin_delete_nomination, name="admin_delete_nomination"),
+    path("admin/reminders/", views.admin_reminders, name="admin_reminders"),
+    path("admin/election/active/", views.admin_active_election, name="admin_active_election"),
+    path("admin/election/publish/", views.admin_publish_results, name="admin_publish_results"),
+    path("admin/election/demo-phase/", views.admin_demo_phase, name="admin_demo_phase"),
+    path("admin/notifications/", views.admin_notifications, name="admin_notifications"),
+    path("admin/broadcasts/", views.admin_broadcasts, name="admin_broadcasts"),
+    path("admin/broadcasts/<int:broadcast_id>/", views.admin_delete_broadcast, name="admin_delete_broadcast"),
+    path("admin/reset-voters/", views.admin_reset_voters, name="admin_reset_voters"),
+    path("admin/reset-election/", views.admin_reset_election, name="admin_reset_election"),
+    path("admin/candidates/<int:candidate_id>/photo/", views.admin_candidate_photo, name="admin_candidate_photo"),
+    path("admin/export/<str:kind>/", views.admin_export, name="admin_export"),
+    path("admin/jobs/", views.admin_jobs, name="admin_jobs"),
+    path("admin/jobs/<int:job_id>/", views.admin_job_detail, name="admin_job_detail"),
+    path("admin/jobs/<int:job_id>/download/", views.admin_job_download, name="admin_job_download"),
+
+    # Monitoring
+    path("metrics/", views.metrics_view, name="metrics"),
+    path("admin/profiles/", views.admin_profiles, name="admin_profiles"),
+    path("admin/profiles/<str:profile_id>/", views.admin_profile_detail, name="admin_profile_detail"),
 
     # Voter notifications
-    path("notifications/", views.voter_notifications),
+    path("notifications/", views.voter_notifications, name="voter_notifications"),
 ]
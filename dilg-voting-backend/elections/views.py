@@ -1,26 +1,39 @@
 # elections/views.py
+import heapq
+import os
 from datetime import datetime
+from itertools import islice
 
 from django.contrib.auth import authenticate, get_user_model
 from django.core import signing
+from django.core.files.storage import default_storage
 from django.core.mail import send_mail
 from django.conf import settings
 from django.core.mail import send_mail
 from django.conf import settings
-from django.db import transaction
-from django.db.models import Q, Count
+from django.db import IntegrityError, connection, transaction
+from django.db.models import BooleanField, Count, Exists, Max, OuterRef, Q, Subquery, Value
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_http_methods
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from . import analytics, broadcasts, caching, clustering, exports, jobs, media, metrics, phases, profiling, storage, summaries, tally, thumbnails, uploads
 from .models import (
     AccessGate,
+    Broadcast,
     Candidate,
     Election,
+    ElectionSummary,
+    Job,
     Notification,
     Nomination,
+    Participation,
     Position,
     Voter,
     Vote,
@@ -30,6 +43,8 @@ from .models import (
 )
 from .serializers import (
     BallotSubmitSerializer,
+    BroadcastFeedSerializer,
+    BroadcastSerializer,
     CandidateSerializer,
     ElectionSerializer,
     NominationCreateSerializer,
@@ -40,7 +55,10 @@ from .serializers import (
     VoteSerializer,
     AdminVoterCreateSerializer,
     ElectionReminderSerializer,
+    ElectionSummarySerializer,
     NotificationSerializer,
+    JobSerializer,
+    JobDetailSerializer,
 )
 
 User = get_user_model()
@@ -65,18 +83,102 @@ def normalize_name(val: str) -> str:
 #  HELPERS
 # =======================
 
-def get_active_election():
-    return Election.objects.filter(is_active=True).order_by("-nomination_start").first()
+def get_active_election(request=None):
+    """The active election; given the request, it is looked up once per request."""
+    if request is None:
+        return Election.objects.filter(is_active=True).order_by("-nomination_start").first()
+    raw = getattr(request, "_request", request)
+    if not hasattr(raw, "_active_election"):
+        raw._active_election = get_active_election()
+    return raw._active_election
+
+
+def mark_has_voted(voter, election=None):
+    """
+    Set voter.has_voted for the active (or given) election; serializers read it.
+    """
+    if election is None:
+        # resolve the active election inside the same query
+        election = Subquery(
+            Election.objects.filter(is_active=True).order_by("-nomination_start").values("id")[:1]
+        )
+    voter.has_voted = Participation.objects.filter(election=election, voter=voter).exists()
+    return voter
+
+
+def with_has_voted(voters, election):
+    """Annotate has_voted for `election` on a Voter queryset (one EXISTS per row)."""
+    if not election:
+        return voters.annotate(has_voted=Value(False, output_field=BooleanField()))
+    return voters.annotate(
+        has_voted=Exists(Participation.objects.filter(election=election, voter=OuterRef("pk")))
+    )
+
+
+def create_default_positions(election):
+    Position.objects.bulk_create(
+        [
+            Position(election=election, name=code, display_order=idx, seats=1, is_active=True)
+            for idx, (code, _label) in enumerate(POSITION_CHOICES)
+        ]
+    )
+
+
+def candidates_with_votes(positions):
+    """
+    Return {position_id: [candidate, ...]} for official candidates of the given
+    positions, each annotated with votes_count, using a single grouped query.
+    """
+    grouped = {pos.id: [] for pos in positions}
+    qs = (
+        Candidate.objects.filter(position__in=list(grouped), is_official=True)
+        .annotate(votes_count=Count("votes"))
+        .order_by("full_name", "id")
+    )
+    for cand in qs:
+        grouped[cand.position_id].append(cand)
+    return grouped
+
+
+def summary_positions(request, summary):
+    """Positions of an ElectionSummary with photo paths turned into URLs."""
+    positions = []
+    for pos in summary.data.get("positions", []):
+        candidates = []
+        for cand in pos["candidates"]:
+            cand = dict(cand)
+            photo = cand.pop("photo", None)
+            cand["photo_url"] = request.build_absolute_uri(default_storage.url(photo)) if photo else None
+            cand["photo_variants"] = thumbnails.variant_urls(cand.get("photo_variants"), request.build_absolute_uri)
+            candidates.append(cand)
+        positions.append({**pos, "candidates": candidates})
+    return positions
+
+
+def queue_photo_variants(obj, user=None, reencode=False):
+    """
+    Queue generation of the responsive variants of a candidate or nominee photo;
+    reencode=True first replaces the upload with a decoded, re-encoded copy.
+    """
+    label, photo = ("candidate", obj.photo) if isinstance(obj, Candidate) else ("nomination", obj.nominee_photo)
+    if not photo:
+        return None
+    payload = {"model": label, "id": obj.pk, "name": photo.name}
+    if reencode:
+        payload["reencode"] = True
+    return jobs.enqueue("photo_variants", payload, user=user)
 
 
 def get_authenticated_voter(request):
     token = request.headers.get("X-Session-Token")
     if not token:
         return None
-    try:
-        return Voter.objects.get(session_token=token, is_active=True)
-    except Voter.DoesNotExist:
-        return None
+    raw = getattr(request, "_request", request)
+    if getattr(raw, "_voter_token", None) != token:
+        # remembered for the request: conditional GET versions authenticate first
+        raw._voter_token = token
+        raw._voter = Voter.objects.filter(session_token=token, is_active=True).first()
+    return raw._voter
 
 
 def get_admin_from_request(request):
@@ -114,6 +216,7 @@ def maybe_auto_publish(election: Election):
         election.results_published = True
         election.results_published_at = now
         election.save(update_fields=["results_published", "results_published_at"])
+        summaries.snapshot_if_closed(election)
     return election
 
 
@@ -187,12 +290,16 @@ def voter_login(request):
     try:
         voter = Voter.objects.get(voter_id=voter_id, is_active=True)
     except Voter.DoesNotExist:
+        metrics.record_login("voter", False)
         return Response({"error": "Invalid credentials"}, status=400)
 
     if not voter.check_pin(pin):
+        metrics.record_login("voter", False)
         return Response({"error": "Invalid credentials"}, status=400)
 
     voter.start_session()
+    metrics.record_login("voter", True)
+    mark_has_voted(voter)
 
     return Response(
         {
@@ -215,12 +322,15 @@ def voter_quick_login(request):
     consent = bool(request.data.get("privacy_consent"))
 
     if not raw_name:
+        metrics.record_login("quick", False)
         return Response({"error": "Full name is required"}, status=400)
     try:
         batch_year = int(raw_batch)
     except (TypeError, ValueError):
+        metrics.record_login("quick", False)
         return Response({"error": "Valid batch year is required"}, status=400)
     if not consent:
+        metrics.record_login("quick", False)
         return Response({"error": "Consent is required to continue"}, status=400)
 
     normalized = normalize_name(raw_name)
@@ -252,6 +362,7 @@ def voter_quick_login(request):
             privacy_consent=True,
             is_active=True,
         )
+        analytics.invalidate_turnout()
         voter.start_session()
         Notification.objects.create(
             type="info",
@@ -260,6 +371,8 @@ def voter_quick_login(request):
             is_read=False,
         )
 
+    metrics.record_login("quick", True)
+    mark_has_voted(voter)
     return Response(
         {
             "token": voter.session_token,
@@ -281,17 +394,72 @@ def voter_me(request):
     voter = get_authenticated_voter(request)
     if not voter:
         return Response({"authenticated": False}, status=200)
-    return Response({"authenticated": True, "voter": VoterMeSerializer(voter).data})
+    return Response({"authenticated": True, "voter": VoterMeSerializer(mark_has_voted(voter)).data})
 
 
 # =======================
 #  PUBLIC DATA
 # =======================
 
+# Conditional GET versions (caching.conditional): cheap keys that change whenever
+# the response would. The election lookup is shared with the view.
+
+def election_version(request):
+    election = maybe_auto_publish(get_active_election(request))
+    if not election:
+        return ()
+    # phase moves with the clock, not only with edits
+    return (election.id, election.updated_at, election.phase, election.results_published)
+
+
+def candidates_version(election):
+    """
+    Candidates and their positions, plus the newest ballot in this election
+    (vote counts): one query. Ballots in other elections leave it alone.
+    """
+    last_ballot = Participation.objects.filter(election=election).order_by("-id").values("id")[:1]
+    return Candidate.objects.filter(position__election=election).aggregate(
+        count=Count("id"),
+        updated=Max("updated_at"),
+        positions=Max("position__updated_at"),
+        last_ballot=Max(Subquery(last_ballot)),
+    )
+
+
+def positions_version(request):
+    election = get_active_election(request)
+    if not election:
+        return ()
+    return (
+        election.id,
+        Position.objects.filter(election=election).aggregate(count=Count("id"), updated=Max("updated_at")),
+    )
+
+
+def candidate_list_version(request):
+    election = get_active_election(request)
+    return (election.id, candidates_version(election)) if election else ()
+
+
+def results_version(request):
+    election = election_version(request)
+    if not election or not election[3] or get_active_election(request).archived_at:
+        return election
+    return election, candidates_version(get_active_election(request))
+
+
+def my_votes_version(request):
+    voter = get_authenticated_voter(request)
+    if not voter:
+        return None
+    return voter.id, Vote.objects.filter(voter=voter).aggregate(count=Count("id"), last=Max("id"))
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@caching.conditional(election_version)
 def current_election(request):
-    election = maybe_auto_publish(get_active_election())
+    election = maybe_auto_publish(get_active_election(request))
     if not election:
         return Response({"has_election": False}, status=200)
     return Response({"has_election": True, "election": ElectionSerializer(election).data})
@@ -299,33 +467,48 @@ def current_election(request):
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+def election_status(request):
+    """
+    Phase of the active election, when it next changes and how long until then.
+    Cacheable until that boundary: clients can wait seconds_remaining instead of polling.
+    """
+    data, now = phases.current_status(lambda: get_active_election(request))
+    remaining = phases.seconds_until(data["next_transition"], now)
+    response = Response(
+        {**data, "next_transition": phases.iso(data["next_transition"]), "seconds_remaining": remaining}
+    )
+    response["Cache-Control"] = "public, max-age=%d" % phases.ttl(remaining)
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@caching.conditional(positions_version)
 def positions_list(request):
-    election = get_active_election()
+    election = get_active_election(request)
     if not election:
         return Response([], status=200)
     positions_qs = Position.objects.filter(election=election, is_active=True)
-    if not positions_qs.exists():
+    positions = list(positions_qs.order_by("display_order", "name"))
+    if not positions:
         # Seed default positions if none exist for the active election
-        for idx, (code, _label) in enumerate(POSITION_CHOICES):
-            Position.objects.create(
-                election=election,
-                name=code,
-                display_order=idx,
-                seats=1,
-                is_active=True,
-            )
-        positions_qs = Position.objects.filter(election=election, is_active=True)
-    positions = positions_qs.order_by("display_order", "name")
+        create_default_positions(election)
+        positions = list(positions_qs.order_by("display_order", "name"))
     return Response(PositionSerializer(positions, many=True).data)
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@caching.conditional(candidate_list_version)
 def candidates_list(request):
-    election = get_active_election()
+    election = get_active_election(request)
     if not election:
         return Response([], status=200)
-    qs = Candidate.objects.filter(position__election=election, is_official=True).annotate(votes_count=Count("votes"))
+    qs = (
+        Candidate.objects.filter(position__election=election, is_official=True)
+        .select_related("position")
+        .annotate(votes_count=Count("votes"))
+    )
     position_id = request.query_params.get("position")
     if position_id:
         qs = qs.filter(position_id=position_id)
@@ -339,47 +522,58 @@ def candidates_list(request):
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@caching.conditional(results_version)
 def published_results(request):
     """
     Public: return per-position vote totals for the active election
     only when results are officially published.
     """
-    election = maybe_auto_publish(get_active_election())
+    election = maybe_auto_publish(get_active_election(request))
     if not election:
         return Response({"published": False, "reason": "no_active_election"}, status=200)
     if not election.results_published:
         return Response({"published": False, "reason": "not_published"}, status=200)
 
-    positions = Position.objects.filter(election=election, is_active=True).order_by(
-        "display_order", "name"
+    if election.archived_at:
+        # votes have moved to the archive file; the summary is the record
+        summary = ElectionSummary.objects.filter(election=election).first()
+        return Response(
+            {
+                "published": True,
+                "published_at": election.results_published_at,
+                "election": {"id": election.id, "name": election.name},
+                "positions": summary_positions(request, summary) if summary else [],
+            }
+        )
+
+    positions = list(
+        Position.objects.filter(election=election, is_active=True).order_by("display_order", "name")
     )
+    candidates_by_position = candidates_with_votes(positions)
+    outcomes = tally.tally_positions(positions, candidates_by_position)
     results_payload = []
     for pos in positions:
-        candidates = Candidate.objects.filter(position=pos, is_official=True).order_by("full_name")
-        # compute votes per candidate
-        cand_data = []
-        max_votes = 0
-        for cand in candidates:
-            votes_count = Vote.objects.filter(position=pos, candidate=cand).count()
-            max_votes = max(max_votes, votes_count)
-            cand_data.append(
-                {
-                    "id": cand.id,
-                    "full_name": cand.full_name,
-                    "batch_year": cand.batch_year,
-                    "campus_chapter": cand.campus_chapter,
-                    "photo_url": request.build_absolute_uri(cand.photo.url) if cand.photo else None,
-                    "votes": votes_count,
-                }
-            )
-        # flag winners (ties allowed)
-        for entry in cand_data:
-            entry["winner"] = max_votes > 0 and entry["votes"] == max_votes
-
+        outcome = outcomes[pos.id]
+        cand_data = [
+            {
+                "id": cand.id,
+                "full_name": cand.full_name,
+                "batch_year": cand.batch_year,
+                "campus_chapter": cand.campus_chapter,
+                "photo_url": request.build_absolute_uri(cand.photo.url) if cand.photo else None,
+                "photo_variants": thumbnails.variant_urls(cand.photo_variants, request.build_absolute_uri),
+                "votes": outcome["votes"][cand.id],
+                "winner": cand.id in outcome["winners"],
+            }
+            for cand in candidates_by_position[pos.id]
+        ]
         results_payload.append(
             {
                 "position_id": pos.id,
                 "position": pos.get_name_display(),
+                "seats": pos.seats,
+                "tally_method": outcome["method"],
+                "rounds": outcome.get("rounds"),
                 "candidates": cand_data,
             }
         )
@@ -396,10 +590,48 @@ def published_results(request):
         }
     )
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def elections_index(request):
+    """
+    Public: past elections with published results, newest first, served from
+    their precomputed summaries.
+    """
+    summaries_qs = (
+        ElectionSummary.objects.select_related("election")
+        .filter(election__results_published=True)
+        .order_by("-election__voting_end", "-election_id")
+    )
+    return Response({"elections": ElectionSummarySerializer(summaries_qs, many=True).data})
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def election_results(request, election_id):
+    """
+    Public: full results snapshot (per-candidate votes, winners, turnout) of a
+    published election. Never reads the Vote table.
+    """
+    summary = (
+        ElectionSummary.objects.select_related("election")
+        .filter(election_id=election_id, election__results_published=True)
+        .first()
+    )
+    if not summary:
+        return Response({"error": "Results not available"}, status=404)
+
+    data = ElectionSummarySerializer(summary).data
+    data["positions"] = summary_positions(request, summary)
+    data["by_batch_year"] = summary.data.get("by_batch_year", [])
+    data["by_chapter"] = summary.data.get("by_chapter", [])
+    return Response(data)
+
+
 # =======================
 #  NOMINATIONS
 # =======================
 
+@uploads.bounded_photo_upload
 @api_view(["POST"])
 def nominate(request):
     voter = get_authenticated_voter(request)
@@ -416,7 +648,13 @@ def nominate(request):
     if not election.is_nomination_open():
         return Response({"error": "Nomination period is closed"}, status=400)
 
-    ser = NominationCreateSerializer(data=request.data)
+    # the body is only parsed here, after the checks above
+    body = request.data
+    refused = uploads.upload_error(request)
+    if refused:
+        return Response({"error": refused[1]}, status=refused[0])
+
+    ser = NominationCreateSerializer(data=body)
     if not ser.is_valid():
         return Response(ser.errors, status=400)
 
@@ -439,13 +677,17 @@ def nominate(request):
             existing.contact_email = data.get("contact_email", "")
             existing.contact_phone = data.get("contact_phone", "")
             existing.reason = data.get("reason", "")
+            replaced = existing.nominee_photo.name
             existing.nominee_photo = data.get("nominee_photo")
+            existing.photo_variants = {}
             existing.is_good_standing = data.get("is_good_standing", False)
             existing.status = "pending"
             existing.rejection_reason = ""
             existing.promoted = False
             existing.promoted_at = None
             existing.save()
+            storage.release(replaced)
+            queue_photo_variants(existing, reencode=True)
             return Response(NominationSerializer(existing).data, status=200)
         return Response({"error": "You already submitted a nomination"}, status=400)
 
@@ -463,6 +705,8 @@ def nominate(request):
         is_good_standing=data.get("is_good_standing", False),
     )
 
+    queue_photo_variants(nomination, reencode=True)
+
     # Notify admins of incoming nomination (no voter attached so it stays in admin inbox)
     Notification.objects.create(
         type="nomination_submitted",
@@ -486,7 +730,9 @@ def my_nomination(request):
         return Response({"error": "No active election"}, status=400)
 
     try:
-        nomination = Nomination.objects.get(election=election, nominator=voter)
+        nomination = Nomination.objects.select_related("election", "position", "nominator").get(
+            election=election, nominator=voter
+        )
     except Nomination.DoesNotExist:
         return Response({}, status=200)
 
@@ -506,13 +752,13 @@ def submit_ballot(request):
     if not voter.privacy_consent:
         return Response({"error": "Consent is required"}, status=400)
 
-    if voter.has_voted:
-        return Response({"error": "You already submitted your ballot"}, status=400)
-
     election = get_active_election()
     if not election:
         return Response({"error": "No active election"}, status=400)
 
+    if Participation.objects.filter(election=election, voter=voter).exists():
+        return Response({"error": "You already submitted your ballot"}, status=400)
+
     if not election.is_voting_open():
         return Response({"error": "Voting period is closed"}, status=400)
 
@@ -531,38 +777,57 @@ def submit_ballot(request):
     if set(map(str, votes_payload.keys())) != expected_ids:
         return Response({"error": "Submit one vote for each position."}, status=400)
 
-    # Pre-validate all selections
+    # Pre-validate all selections (one query for every chosen candidate)
+    chosen_ids = {
+        position.id: votes_payload.get(str(position.id)) or votes_payload.get(position.id) or []
+        for position in active_positions
+    }
+    candidates = Candidate.objects.filter(
+        id__in=[cid for ids in chosen_ids.values() for cid in ids],
+        position__in=active_positions,
+        is_official=True,
+    ).in_bulk()
     selections = []
     for position in active_positions:
-        candidate_id = votes_payload.get(str(position.id)) or votes_payload.get(position.id)
-        try:
-            candidate = Candidate.objects.get(
-                id=candidate_id, position=position, is_official=True
-            )
-        except Candidate.DoesNotExist:
+        ids = chosen_ids[position.id]
+        if position.tally_method == "plurality" and len(ids) > position.seats:
             return Response(
-                {
-                    "error": f"Invalid candidate for position {position.get_name_display()}"
-                },
+                {"error": f"Choose at most {position.seats} candidate(s) for {position.get_name_display()}"},
                 status=400,
             )
-        selections.append((position, candidate))
-
-    with transaction.atomic():
-        for position, candidate in selections:
-            if Vote.objects.filter(voter=voter, position=position).exists():
+        for rank, candidate_id in enumerate(ids, start=1):
+            candidate = candidates.get(candidate_id)
+            if candidate is None or candidate.position_id != position.id:
                 return Response(
-                    {"error": "You already voted for this position"}, status=400
+                    {
+                        "error": f"Invalid candidate for position {position.get_name_display()}"
+                    },
+                    status=400,
                 )
-            Vote.objects.create(voter=voter, position=position, candidate=candidate)
+            selections.append((position, candidate, rank))
 
-        voter.has_voted = True
-        voter.save(update_fields=["has_voted"])
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # the unique (election, voter) constraint rejects a concurrent second ballot
+            Participation.objects.create(election=election, voter=voter, created_at=now)
+            Vote.objects.bulk_create(
+                [
+                    Vote(voter=voter, position=position, candidate=candidate, rank=rank)
+                    for position, candidate, rank in selections
+                ]
+            )
+            analytics.record_ballot(election.id, at=now)
+            analytics.invalidate_turnout()
+    except IntegrityError:
+        return Response({"error": "You already submitted your ballot"}, status=400)
 
+    metrics.BALLOTS_SUBMITTED.inc()
     return Response({"message": "Ballot submitted"}, status=201)
 
 
 @api_view(["GET"])
+@caching.conditional(my_votes_version, vary=("X-Session-Token",))
 def my_votes(request):
     voter = get_authenticated_voter(request)
     if not voter:
@@ -575,6 +840,7 @@ def my_votes(request):
             "position": v.position.get_name_display(),
             "candidate_id": v.candidate_id,
             "candidate": v.candidate.full_name,
+            "rank": v.rank,
         }
         for v in qs
     ]
@@ -600,8 +866,10 @@ def admin_login(request):
 
     user = authenticate(username=username, password=password)
     if not user or not user.is_staff:
+        metrics.record_login("admin", False)
         return Response({"error": "Invalid admin credentials"}, status=400)
 
+    metrics.record_login("admin", True)
     token = signing.dumps({"user_id": user.id}, salt=ADMIN_SALT)
 
     return Response(
@@ -649,7 +917,7 @@ def admin_voters(request):
         return Response({"error": "Admin authentication required"}, status=403)
 
     if request.method == "GET":
-        voters = Voter.objects.all().order_by("name")
+        voters = with_has_voted(Voter.objects.all(), get_active_election()).order_by("name")
         return Response(VoterSerializer(voters, many=True).data)
 
     serializer = AdminVoterCreateSerializer(data=request.data)
@@ -666,6 +934,7 @@ def admin_voters(request):
     voter = Voter(**data)
     voter.set_pin(raw_pin)
     voter.save()
+    analytics.invalidate_turnout()
 
     out = VoterSerializer(voter).data
     out["pin"] = raw_pin
@@ -683,14 +952,14 @@ def admin_tally(request):
         return Response([], status=200)
 
     data = []
-    positions = Position.objects.filter(election=election, is_active=True).prefetch_related(
-        "candidates"
-    )
+    positions = list(Position.objects.filter(election=election, is_active=True))
+    candidates_by_position = candidates_with_votes(positions)
+    outcomes = tally.tally_positions(positions, candidates_by_position)
 
     for pos in positions:
+        outcome = outcomes[pos.id]
         candidates_data = []
-        for cand in pos.candidates.filter(is_official=True):
-            votes_count = Vote.objects.filter(position=pos, candidate=cand).count()
+        for cand in candidates_by_position[pos.id]:
             candidates_data.append(
                 {
                     "candidate_id": cand.id,
@@ -698,7 +967,9 @@ def admin_tally(request):
                     "batch_year": cand.batch_year,
                     "campus_chapter": cand.campus_chapter,
                     "photo_url": request.build_absolute_uri(cand.photo.url) if cand.photo else None,
-                    "votes": votes_count,
+                    "photo_variants": thumbnails.variant_urls(cand.photo_variants, request.build_absolute_uri),
+                    "votes": outcome["votes"][cand.id],
+                    "winner": cand.id in outcome["winners"],
                 }
             )
 
@@ -706,6 +977,9 @@ def admin_tally(request):
             {
                 "position_id": pos.id,
                 "position": pos.get_name_display(),
+                "seats": pos.seats,
+                "tally_method": outcome["method"],
+                "rounds": outcome.get("rounds"),
                 "candidates": candidates_data,
             }
         )
@@ -719,19 +993,62 @@ def admin_stats(request):
     if not admin_user:
         return Response({"error": "Admin authentication required"}, status=403)
 
-    total_voters = Voter.objects.count()
-    voted_count = Voter.objects.filter(has_voted=True).count()
-    turnout_percent = round((voted_count / total_voters * 100), 2) if total_voters else 0.0
-
+    election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+    data = analytics.turnout(election)
     return Response(
         {
-            "total_voters": total_voters,
-            "voted_count": voted_count,
-            "turnout_percent": turnout_percent,
+            "total_voters": data["total_voters"],
+            "voted_count": data["voted_count"],
+            "turnout_percent": data["turnout_percent"],
         }
     )
 
 
+@api_view(["GET"])
+def admin_turnout(request):
+    """
+    Turnout broken down by batch year and campus chapter (cached aggregate).
+    """
+    admin_user = get_admin_from_request(request)
+    if not admin_user:
+        return Response({"error": "Admin authentication required"}, status=403)
+    election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+    return Response(analytics.turnout(election))
+
+
+@api_view(["GET"])
+def admin_turnout_timeseries(request):
+    """
+    Ballots per time bucket: ?start=&end= (ISO datetimes, default the voting
+    window so far), ?step=<minutes> (raised as needed to cap the point count).
+    """
+    admin_user = get_admin_from_request(request)
+    if not admin_user:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+    if not election:
+        return Response({"error": "No election found"}, status=404)
+
+    bounds = {}
+    for key in ("start", "end"):
+        raw = request.query_params.get(key)
+        if not raw:
+            continue
+        value = parse_datetime(raw)
+        if value is None:
+            return Response({"error": f"{key} must be an ISO datetime"}, status=400)
+        bounds[key] = timezone.make_aware(value) if timezone.is_naive(value) else value
+    try:
+        step = int(request.query_params.get("step") or 0) or None
+    except ValueError:
+        return Response({"error": "step must be a whole number of minutes"}, status=400)
+    if step is not None and step < 1:
+        return Response({"error": "step must be a whole number of minutes"}, status=400)
+
+    return Response(analytics.ballot_timeseries(election, step=step, **bounds))
+
+
 @api_view(["GET"])
 def admin_nominations(request):
     admin = get_admin_from_request(request)
@@ -742,10 +1059,74 @@ def admin_nominations(request):
     if not election:
         return Response([], status=200)
 
-    qs = Nomination.objects.filter(election=election).select_related("position", "nominator")
+    qs = Nomination.objects.filter(election=election).select_related("election", "position", "nominator")
     return Response(NominationSerializer(qs, many=True).data)
 
 
+@api_view(["GET"])
+def admin_nomination_clusters(request):
+    """
+    Nominations of the active election grouped per position by nominee, with
+    spelling variants of the same person in one cluster (elections.clustering).
+    ?min_count=2 lists only nominees nominated more than once; ?position=<id>
+    narrows to one position. Rejected nominations are left out.
+    Promote a cluster as one candidate with admin/nominations/batch/ and a shared full_name.
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    try:
+        min_count = max(int(request.query_params.get("min_count") or 1), 1)
+        position_id = int(request.query_params["position"]) if request.query_params.get("position") else None
+    except ValueError:
+        return Response({"error": "min_count and position must be whole numbers"}, status=400)
+
+    election = get_active_election()
+    if not election:
+        return Response({"election": None, "positions": []}, status=200)
+
+    nominations = Nomination.objects.filter(election=election).exclude(status="rejected")
+    candidates = Candidate.objects.filter(position__election=election)
+    if position_id is not None:
+        nominations = nominations.filter(position_id=position_id)
+        candidates = candidates.filter(position_id=position_id)
+    rows = (
+        nominations.select_related("position")
+        .only("id", "nominee_full_name", "nominee_batch_year", "status", "position__name", "position__display_order")
+        .order_by("position__display_order", "position_id", "id")
+    )
+    by_position = {}
+    for nomination in rows:
+        by_position.setdefault(nomination.position, []).append(nomination)
+    known = {
+        (position, " ".join(clustering.fold(normalize_name(name)))): candidate_id
+        for candidate_id, position, name in candidates.values_list("id", "position_id", "full_name")
+    }
+
+    positions = []
+    for position, members in by_position.items():
+        groups = []
+        for group in clustering.cluster(members, normalize_name):
+            if len(group) < min_count:
+                continue
+            summary = clustering.describe(group, normalize_name)
+            keys = {" ".join(clustering.fold(normalize_name(m.nominee_full_name))) for m in group}
+            summary["candidate_id"] = next(
+                (known[(position.id, key)] for key in sorted(keys) if (position.id, key) in known), None
+            )
+            groups.append(summary)
+        groups.sort(key=lambda g: (-g["count"], g["label"]))
+        positions.append({
+            "position_id": position.id,
+            "position": position.get_name_display(),
+            "nominations": len(members),
+            "nominees": len(groups),
+            "clusters": groups,
+        })
+    return Response({"election": election.id, "positions": positions})
+
+
 @api_view(["POST"])
 def admin_promote_nomination(request, nomination_id):
     admin = get_admin_from_request(request)
@@ -768,6 +1149,7 @@ def admin_promote_nomination(request, nomination_id):
                 "contact_phone": nomination.contact_phone,
                 "bio": nomination.reason,
                 "photo": nomination.nominee_photo,
+                "photo_variants": nomination.photo_variants,
                 "source_nomination": nomination,
                 "is_official": True,
             },
@@ -775,7 +1157,13 @@ def admin_promote_nomination(request, nomination_id):
         # If the candidate already exists without a photo, use the nominee photo to help admin.
         if (not created) and (not candidate.photo) and nomination.nominee_photo:
             candidate.photo = nomination.nominee_photo
-            candidate.save(update_fields=["photo"])
+            candidate.photo_variants = nomination.photo_variants
+            candidate.save(update_fields=["photo", "photo_variants"])
+            storage.retain(candidate.photo.name)
+        elif created and candidate.photo:
+            storage.retain(candidate.photo.name)  # shares the nominee's blob, no copy
+        if candidate.photo and not candidate.photo_variants:
+            queue_photo_variants(candidate, user=admin)
         nomination.promoted = True
         nomination.promoted_at = timezone.now()
         nomination.status = "promoted"
@@ -804,16 +1192,22 @@ def admin_candidate_photo(request, candidate_id):
     except Candidate.DoesNotExist:
         return Response({"error": "Candidate not found"}, status=404)
 
+    replaced = candidate.photo.name
     if request.method == "DELETE":
         candidate.photo = None
-        candidate.save(update_fields=["photo"])
+        candidate.photo_variants = {}
+        candidate.save(update_fields=["photo", "photo_variants"])
+        storage.release(replaced)
         return Response(CandidateSerializer(candidate, context={"request": request}).data)
 
     if "photo" not in request.FILES:
         return Response({"error": "No photo uploaded"}, status=400)
 
     candidate.photo = request.FILES["photo"]
-    candidate.save(update_fields=["photo"])
+    candidate.photo_variants = {}
+    candidate.save(update_fields=["photo", "photo_variants"])
+    storage.release(replaced)
+    queue_photo_variants(candidate, user=admin)
 
     return Response(CandidateSerializer(candidate, context={"request": request}).data)
 
@@ -829,7 +1223,7 @@ def admin_reject_nomination(request, nomination_id):
         return Response({"error": "Rejection reason is required"}, status=400)
 
     try:
-        nomination = Nomination.objects.select_related("position").get(id=nomination_id)
+        nomination = Nomination.objects.select_related("election", "position", "nominator").get(id=nomination_id)
     except Nomination.DoesNotExist:
         return Response({"error": "Nomination not found"}, status=404)
 
@@ -866,9 +1260,201 @@ def admin_delete_nomination(request, nomination_id):
         return Response({"error": "Nomination not found"}, status=404)
 
     nomination.delete()
+    storage.release(nomination.nominee_photo.name)
     return Response({"message": "Nomination deleted."}, status=200)
 
 
+NOMINATION_BATCH_ACTIONS = ("promote", "reject", "delete")
+NOMINATION_BATCH_MAX = 500
+
+
+def promote_nominations(nominations, admin, now, names=None):
+    """
+    admin_promote_nomination for many nominations: candidates are matched on
+    (position, full_name) as get_or_create would, the missing ones are created
+    with one bulk insert. `names` ({nomination_id: full_name}) promotes
+    nominations under another spelling, e.g. a whole nominee cluster as one
+    candidate. Returns ({nomination_id: (candidate, created)}, notifications).
+    """
+    names = names or {}
+
+    def candidate_name(nomination):
+        return names.get(nomination.id) or nomination.nominee_full_name
+
+    existing = {}
+    for candidate in Candidate.objects.filter(
+        position_id__in={n.position_id for n in nominations},
+        full_name__in={candidate_name(n) for n in nominations},
+    ).order_by("id"):
+        existing.setdefault((candidate.position_id, candidate.full_name), candidate)
+    # source_nomination is one-to-one: a nomination that already sourced a candidate can't again
+    sourced = set(
+        Candidate.objects.filter(source_nomination__in=nominations)
+        .order_by()
+        .values_list("source_nomination_id", flat=True)
+    )
+
+    new, created_by, filled = {}, {}, {}
+    for nomination in nominations:
+        key = (nomination.position_id, candidate_name(nomination))
+        candidate = existing.get(key)
+        if candidate is None and key not in new:
+            new[key] = Candidate(
+                position=nomination.position,
+                full_name=key[1],
+                batch_year=nomination.nominee_batch_year,
+                campus_chapter=nomination.nominee_campus_chapter,
+                contact_email=nomination.contact_email,
+                contact_phone=nomination.contact_phone,
+                bio=nomination.reason,
+                photo=nomination.nominee_photo,
+                photo_variants=nomination.photo_variants,
+                source_nomination=None if nomination.id in sourced else nomination,
+                is_official=True,
+            )
+            created_by[key] = nomination.id
+        elif candidate is not None and not candidate.photo and nomination.nominee_photo and key not in filled:
+            # as in admin_promote_nomination: an existing candidate without a photo gets the nominee's
+            candidate.photo = nomination.nominee_photo
+            candidate.photo_variants = nomination.photo_variants
+            candidate.updated_at = now
+            filled[key] = candidate
+
+    if new:
+        Candidate.objects.bulk_create(new.values())
+        if not connection.features.can_return_rows_from_bulk_insert:  # MySQL: look the ids up
+            for candidate in Candidate.objects.filter(
+                position_id__in={key[0] for key in new}, full_name__in={key[1] for key in new}
+            ).order_by("id"):
+                created = new.get((candidate.position_id, candidate.full_name))
+                if created is not None and created.id is None:
+                    created.id = candidate.id
+    if filled:
+        Candidate.objects.bulk_update(filled.values(), ["photo", "photo_variants", "updated_at"])
+    touched = [*new.values(), *filled.values()]
+    storage.retain_many([c.photo.name for c in touched if c.photo])  # shares the nominee's blob, no copy
+    for candidate in touched:
+        if candidate.photo and not candidate.photo_variants:
+            queue_photo_variants(candidate, user=admin)
+
+    Nomination.objects.filter(id__in=[n.id for n in nominations]).update(
+        promoted=True, promoted_at=now, status="promoted", rejection_reason=""
+    )
+    outcomes, notifications = {}, []
+    for nomination in nominations:
+        key = (nomination.position_id, candidate_name(nomination))
+        outcomes[nomination.id] = (existing.get(key) or new[key], created_by.get(key) == nomination.id)
+        notifications.append(
+            Notification(
+                type="nomination_promoted",
+                message=f"Your nomination for {nomination.nominee_full_name} ({nomination.position.get_name_display()}) was promoted.",
+                voter=nomination.nominator,
+            )
+        )
+    return outcomes, notifications
+
+
+def reject_nominations(nominations, reasons):
+    """admin_reject_nomination for many nominations; `reasons` maps id -> reason."""
+    notifications = []
+    for nomination in nominations:
+        reason = reasons[nomination.id]
+        nomination.status = "rejected"
+        nomination.rejection_reason = reason
+        nomination.promoted = False
+        nomination.promoted_at = None
+        subject = f"{nomination.nominee_full_name} ({nomination.position.get_name_display()})"
+        notifications += [
+            Notification(type="nomination_rejected", message=f"Nomination for {subject} was rejected: {reason}"),
+            Notification(
+                type="nomination_rejected",
+                message=f"Your nomination for {subject} was rejected: {reason}",
+                voter=nomination.nominator,
+            ),
+        ]
+    Nomination.objects.bulk_update(nominations, ["status", "rejection_reason", "promoted", "promoted_at"])
+    return notifications
+
+
+def delete_nominations(nominations):
+    Nomination.objects.filter(id__in=[n.id for n in nominations]).delete()
+    storage.release_many([n.nominee_photo.name for n in nominations if n.nominee_photo])
+
+
+@api_view(["POST"])
+def admin_nominations_batch(request):
+    """
+    Promote, reject or delete many nominations in one transaction.
+    Body: {"actions": [{"id": 12, "action": "promote"},
+                       {"id": 13, "action": "reject", "reason": "..."},
+                       {"id": 14, "action": "delete"},
+                       {"id": 15, "action": "promote", "full_name": "optional spelling"}],
+           "reason": "default rejection reason"}
+    Returns one outcome per action, in order; invalid items are reported and skipped.
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    actions = request.data.get("actions")
+    if not isinstance(actions, list) or not actions:
+        return Response({"error": "actions must be a non-empty list"}, status=400)
+    if len(actions) > NOMINATION_BATCH_MAX:
+        return Response({"error": f"At most {NOMINATION_BATCH_MAX} actions per batch"}, status=400)
+    default_reason = str(request.data.get("reason") or "").strip()
+
+    results, wanted, reasons, names, seen = [], {}, {}, {}, set()
+    for item in actions:
+        item = item if isinstance(item, dict) else {}
+        nomination_id, action = item.get("id"), item.get("action")
+        result = {"id": nomination_id, "action": action, "ok": False}
+        results.append(result)
+        if not isinstance(nomination_id, int) or isinstance(nomination_id, bool):
+            result["error"] = "id must be a nomination id"
+        elif action not in NOMINATION_BATCH_ACTIONS:
+            result["error"] = "action must be one of: " + ", ".join(NOMINATION_BATCH_ACTIONS)
+        elif nomination_id in seen:
+            result["error"] = "Nomination already appears in this batch"
+        else:
+            seen.add(nomination_id)
+            reason = str(item.get("reason") or "").strip() or default_reason
+            if action == "reject" and not reason:
+                result["error"] = "Rejection reason is required"
+            else:
+                wanted[nomination_id] = result
+                reasons[nomination_id] = reason
+                names[nomination_id] = " ".join(str(item.get("full_name") or "").split())[:150]
+
+    now = timezone.now()
+    with transaction.atomic():
+        found = Nomination.objects.select_related("position", "nominator").in_bulk(list(wanted))
+        by_action = {action: [] for action in NOMINATION_BATCH_ACTIONS}
+        for nomination_id, result in wanted.items():
+            if nomination_id in found:
+                by_action[result["action"]].append(found[nomination_id])
+            else:
+                result["error"] = "Nomination not found"
+
+        notifications = []
+        if by_action["promote"]:
+            outcomes, notes = promote_nominations(by_action["promote"], admin, now, names)
+            notifications += notes
+            for nomination_id, (candidate, created) in outcomes.items():
+                wanted[nomination_id].update(ok=True, candidate_id=candidate.id, created=created)
+        if by_action["reject"]:
+            notifications += reject_nominations(by_action["reject"], reasons)
+            for nomination in by_action["reject"]:
+                wanted[nomination.id]["ok"] = True
+        if by_action["delete"]:
+            delete_nominations(by_action["delete"])
+            for nomination in by_action["delete"]:
+                wanted[nomination.id]["ok"] = True
+        Notification.objects.bulk_create(notifications)
+
+    done = sum(result["ok"] for result in results)
+    return Response({"results": results, "succeeded": done, "failed": len(results) - done})
+
+
 @api_view(["GET", "POST"])
 def voter_notifications(request):
   """
@@ -887,36 +1473,90 @@ def voter_notifications(request):
       if not show_history:
           qs = qs.filter(is_hidden=False)
       qs = qs.order_by("-created_at", "-id")[:100]
+      # broadcasts are shared rows; merge the two newest-first lists
+      merged = heapq.merge(
+          qs, broadcasts.feed(voter, show_history), key=lambda item: (item.created_at, item.id), reverse=True
+      )
+      items = [
+          (BroadcastFeedSerializer if isinstance(item, Broadcast) else NotificationSerializer)(item).data
+          for item in islice(merged, 100)
+      ]
       unread_count = Notification.objects.filter(voter=voter, is_read=False, is_hidden=False).count()
       return Response(
           {
-              "items": NotificationSerializer(qs, many=True).data,
-              "unread_count": unread_count,
+              "items": items,
+              "unread_count": unread_count + broadcasts.unread_count(voter),
           }
       )
 
   action = (request.data.get("action") or "").strip()
-  ids = request.data.get("ids") or []
+  ids, broadcast_ids = broadcasts.split_ids(request.data.get("ids") or [])
   base_qs = Notification.objects.filter(voter=voter)
   if action == "mark_all_read":
       base_qs.filter(is_read=False).update(is_read=True)
+      broadcasts.mark_all_read(voter)
       return Response({"message": "Marked all as read"})
   if action == "mark_read":
       base_qs.filter(id__in=ids).update(is_read=True)
+      broadcasts.mark_read(voter, broadcast_ids)
       return Response({"message": "Marked as read"})
   if action == "dismiss":
       base_qs.filter(id__in=ids).update(is_hidden=True, is_read=True)
+      broadcasts.hide(voter, broadcast_ids)
       return Response({"message": "Dismissed"})
   if action == "delete":
       base_qs.filter(id__in=ids).delete()
+      broadcasts.hide(voter, broadcast_ids)  # shared with every voter: hidden, not deleted
       return Response({"message": "Deleted"})
   if action == "delete_all":
       base_qs.delete()
+      broadcasts.hide_all(voter)
       return Response({"message": "All notifications deleted"})
 
   return Response({"error": "Invalid action"}, status=400)
 
 
+@api_view(["GET", "POST"])
+def admin_broadcasts(request):
+    """
+    GET: recent broadcasts with how many voters have read each.
+    POST {"message": "...", "type": "announcement"}: announce to every voter.
+    One row per broadcast; read state is tracked per voter in elections.broadcasts.
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    if request.method == "GET":
+        items = list(Broadcast.objects.select_related("created_by")[:50])
+        for broadcast, read in zip(items, broadcasts.read_counts([b.id for b in items])):
+            broadcast.read_count = read
+        return Response(BroadcastSerializer(items, many=True).data)
+
+    message = (request.data.get("message") or "").strip()
+    if not message:
+        return Response({"error": "Message is required"}, status=400)
+    broadcast = Broadcast.objects.create(
+        type=(request.data.get("type") or "announcement").strip()[:80] or "announcement",
+        message=message,
+        created_by=admin,
+    )
+    broadcast.read_count = 0
+    return Response(BroadcastSerializer(broadcast).data, status=201)
+
+
+@api_view(["DELETE"])
+def admin_delete_broadcast(request, broadcast_id):
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    deleted, _ = Broadcast.objects.filter(id=broadcast_id).delete()
+    if not deleted:
+        return Response({"error": "Broadcast not found"}, status=404)
+    return Response({"message": "Broadcast deleted."}, status=200)
+
+
 @api_view(["GET", "POST"])
 def admin_reminders(request):
     admin = get_admin_from_request(request)
@@ -1047,24 +1687,23 @@ def admin_active_election(request):
         )
         created_positions = 0
         if positions_source:
-            for pos in Position.objects.filter(election=positions_source):
-                Position.objects.create(
-                    election=election,
-                    name=pos.name,
-                    is_active=pos.is_active,
-                    seats=pos.seats,
-                    display_order=pos.display_order,
+            created_positions = len(
+                Position.objects.bulk_create(
+                    [
+                        Position(
+                            election=election,
+                            name=pos.name,
+                            is_active=pos.is_active,
+                            seats=pos.seats,
+                            tally_method=pos.tally_method,
+                            display_order=pos.display_order,
+                        )
+                        for pos in Position.objects.filter(election=positions_source)
+                    ]
                 )
-                created_positions += 1
+            )
         if not created_positions:
-            for idx, (code, _label) in enumerate(POSITION_CHOICES):
-                Position.objects.create(
-                    election=election,
-                    name=code,
-                    display_order=idx,
-                    seats=1,
-                    is_active=True,
-                )
+            create_default_positions(election)
 
         return Response(ElectionSerializer(election).data, status=201)
 
@@ -1148,6 +1787,8 @@ def admin_publish_results(request):
         election.results_published = False
         election.results_published_at = None
     election.save(update_fields=["results_published", "results_published_at"])
+    if publish_flag:
+        summaries.snapshot_if_closed(election)
 
     return Response(ElectionSerializer(election).data)
 
@@ -1214,43 +1855,32 @@ def admin_demo_phase(request):
 @api_view(["POST"])
 def admin_reset_voters(request):
     """
-    Reset has_voted/is_active/session_token for all voters.
-    If reset_pins=true, generate new PINs.
+    Queue a reset of is_active/session_token for all voters (voting status is
+    per election and is not touched). If reset_pins=true, new PINs are
+    generated; fetch them once from admin/jobs/<id>/download/.
     """
     admin = get_admin_from_request(request)
     if not admin:
         return Response({"error": "Admin authentication required"}, status=403)
 
     reset_pins = bool(request.data.get("reset_pins"))
-
-    voters = Voter.objects.all()
-    count = 0
-    output = []
-    for v in voters:
-        v.has_voted = False
-        v.is_active = True
-        v.session_token = None
-        if reset_pins:
-            new_pin = generate_pin()
-            v.set_pin(new_pin)
-            output.append({"voter_id": v.voter_id, "pin": new_pin})
-        v.save()
-        count += 1
-
+    job = jobs.enqueue("reset_voters", {"reset_pins": reset_pins}, user=admin)
     return Response(
         {
-            "message": f"Reset {count} voters.",
+            "message": "Voter reset queued.",
             "reset_pins": reset_pins,
-            "updated": output if reset_pins else [],
-        }
+            "job": JobSerializer(job).data,
+        },
+        status=202,
     )
 
 
 @api_view(["POST"])
 def admin_reset_election(request):
     """
-    Admin: reset votes and nominations for the active (or latest) election,
-    and clear voter has_voted/session tokens. Does NOT delete candidates.
+    Admin: reset votes, participation and nominations for the active (or latest)
+    election. Does NOT delete candidates or touch voter rows.
+    The timeline is cleared right away; the row deletes run as a background job.
     """
     admin = get_admin_from_request(request)
     if not admin:
@@ -1260,17 +1890,6 @@ def admin_reset_election(request):
     if not election:
         return Response({"error": "No election found"}, status=404)
 
-    positions = Position.objects.filter(election=election)
-    votes_deleted, _ = Vote.objects.filter(position__in=positions).delete()
-    nominations_deleted, _ = Nomination.objects.filter(election=election).delete()
-
-    voters = Voter.objects.all()
-    for v in voters:
-        v.has_voted = False
-        v.session_token = None
-        v.is_active = True
-        v.save(update_fields=["has_voted", "session_token", "is_active"])
-
     # Clear the election timeline and deactivate until new dates are set.
     election.nomination_start = None
     election.nomination_end = None
@@ -1294,16 +1913,252 @@ def admin_reset_election(request):
             "is_active",
         ]
     )
+    job = jobs.enqueue("reset_election", {"election_id": election.id}, user=admin)
 
     return Response(
         {
-            "message": "Election data reset.",
+            "message": "Election timeline cleared; vote and nomination reset queued.",
             "election": election.id,
-            "votes_deleted": votes_deleted,
-            "nominations_deleted": nominations_deleted,
-            "voters_reset": voters.count(),
-        }
+            "job": JobSerializer(job).data,
+        },
+        status=202,
+    )
+
+
+# =======================
+#  BACKGROUND JOBS
+# =======================
+
+@api_view(["GET"])
+def admin_jobs(request):
+    """
+    Recent background jobs, newest first (?status= and ?kind= filter).
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    qs = Job.objects.select_related("created_by")
+    if request.query_params.get("status"):
+        qs = qs.filter(status=request.query_params["status"])
+    if request.query_params.get("kind"):
+        qs = qs.filter(kind=request.query_params["kind"])
+    return Response(JobSerializer(qs[:100], many=True).data)
+
+
+@api_view(["GET"])
+def admin_job_detail(request, job_id):
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    job = Job.objects.select_related("created_by").filter(pk=job_id).first()
+    if not job:
+        return Response({"error": "Job not found"}, status=404)
+    return Response(JobDetailSerializer(job).data)
+
+
+@api_view(["GET"])
+def admin_job_download(request, job_id):
+    """
+    Download the file produced by an export job, or the new PINs of a
+    reset_voters job. PIN files are one-time: the first download deletes them.
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    job = Job.objects.filter(pk=job_id, kind__in=("export", "reset_voters"), status="succeeded").first()
+    result = (job.result or {}) if job else {}
+    relative = result.get("file")
+    path = os.path.join(settings.MEDIA_ROOT, relative) if relative else None
+    if not path or not os.path.isfile(path):
+        error = "File was already downloaded" if result.get("downloaded_at") else "Export file not found"
+        return Response({"error": error}, status=404)
+    fmt = os.path.splitext(path)[1].lstrip(".")
+    content_type = exports.FORMATS.get(fmt, "application/octet-stream")
+
+    if result.get("one_time"):
+        # the rename decides which of two concurrent requests gets the file
+        taken = path + ".sent"
+        try:
+            os.rename(path, taken)
+        except FileNotFoundError:
+            return Response({"error": "File was already downloaded"}, status=404)
+        with open(taken, "rb") as fh:
+            data = fh.read()
+        os.remove(taken)
+        Job.objects.filter(pk=job.pk).update(
+            result={**result, "file": None, "downloaded_at": timezone.now().isoformat()}
+        )
+        response = HttpResponse(data, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{os.path.basename(path)}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+    return FileResponse(
+        open(path, "rb"),
+        as_attachment=True,
+        filename=os.path.basename(path),
+        content_type=content_type,
+    )
+
+
+# =======================
+#  EXPORTS
+# =======================
+
+@api_view(["GET"])
+def admin_export(request, kind):
+    """
+    Stream an export as CSV (default) or XLSX: ?fmt=csv|xlsx, optional ?election=<id>.
+    ("format" is reserved by DRF for renderer negotiation.) With ?background=1 the
+    file is written by a job instead; fetch it from admin/jobs/<id>/download/.
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+
+    if kind not in exports.EXPORTS:
+        return Response({"error": f"Unknown export. Choose one of: {', '.join(exports.EXPORTS)}"}, status=404)
+    fmt = (request.query_params.get("fmt") or "csv").lower()
+    if fmt not in exports.FORMATS:
+        return Response({"error": "fmt must be csv or xlsx"}, status=400)
+
+    election_id = request.query_params.get("election")
+    if election_id:
+        election = Election.objects.filter(pk=election_id).first() if election_id.isdigit() else None
+    else:
+        election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+    if not election:
+        return Response({"error": "No election found"}, status=404)
+
+    if request.query_params.get("background") in ("1", "true"):
+        job = jobs.enqueue("export", {"kind": kind, "fmt": fmt, "election_id": election.id}, user=admin)
+        return Response({"message": "Export queued.", "job": JobSerializer(job).data}, status=202)
+
+    response = StreamingHttpResponse(
+        exports.stream_export(kind, fmt, election), content_type=exports.FORMATS[fmt]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{exports.export_filename(kind, fmt, election)}"'
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+# =======================
+#  METRICS
+# =======================
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires "Authorization: Bearer <METRICS_TOKEN>"
+    when METRICS_TOKEN is configured, otherwise a valid admin token.
+    """
+    expected = getattr(settings, "METRICS_TOKEN", "")
+    if expected:
+        if request.headers.get("Authorization", "") != f"Bearer {expected}":
+            return HttpResponse("Forbidden\n", status=403, content_type="text/plain")
+    elif not get_admin_from_request(request):
+        return HttpResponse("Forbidden\n", status=403, content_type="text/plain")
+
+    backlog = Notification.objects.filter(voter__isnull=True, is_read=False, is_hidden=False).count()
+    election = get_active_election() or Election.objects.order_by("-nomination_start", "-id").first()
+    turnout = analytics.turnout(election)
+    total_voters, voted_count = turnout["total_voters"], turnout["voted_count"]
+    gauges = [
+        ("hcad_notification_backlog", "Unread admin notifications.", [({}, backlog)]),
+        ("hcad_voters_total", "Registered voters.", [({}, total_voters)]),
+        ("hcad_voters_voted", "Voters who submitted a ballot.", [({}, voted_count)]),
+        (
+            "hcad_turnout_ratio",
+            "Share of registered voters who submitted a ballot.",
+            [({}, voted_count / total_voters if total_voters else 0.0)],
+        ),
+    ]
+    return HttpResponse(
+        metrics.render_metrics(gauges),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@api_view(["GET"])
+def admin_profiles(request):
+    """
+    List stored request profiles (newest first).
+    """
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+    return Response(profiling.list_reports())
+
+
+@api_view(["GET"])
+def admin_profile_detail(request, profile_id):
+    admin = get_admin_from_request(request)
+    if not admin:
+        return Response({"error": "Admin authentication required"}, status=403)
+    report = profiling.load_report(profile_id)
+    if report is None:
+        return Response({"error": "Profile not found"}, status=404)
+    return Response(report)
+
+
+# =======================
+#  MEDIA
+# =======================
+
+@require_http_methods(["GET", "HEAD"])
+def media_file(request, path):
+    """
+    Serve a public MEDIA_ROOT file (see elections.media): conditional GET,
+    single byte ranges, and proxy offload through MEDIA_OFFLOAD.
+    """
+    full = media.resolve(path)
+    if not full:
+        raise Http404("File not found")
+    stat = os.stat(full)
+    etag, last_modified = media.validators(path, stat)
+    headers = media.base_headers(path, etag, last_modified)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for name in ("ETag", "Last-Modified", "Cache-Control"):
+            not_modified.headers[name] = headers[name]
+        return not_modified
+
+    content_type = media.content_type(path)
+    offload = media.offload_headers(path, full)
+    if offload:
+        # the proxy sends the body and answers Range itself
+        return HttpResponse(content_type=content_type, headers={**headers, **offload})
+
+    size = stat.st_size
+    wanted = None
+    if media.if_range_matches(request.headers.get("If-Range"), etag, last_modified):
+        wanted = media.parse_range(request.headers.get("Range"), size)
+    if wanted == "unsatisfiable":
+        return HttpResponse(status=416, headers={"Content-Range": f"bytes */{size}", **headers})
+
+    if request.method == "HEAD":
+        return HttpResponse(content_type=content_type, headers={**headers, "Content-Length": str(size)})
+    if wanted is None:
+        response = FileResponse(open(full, "rb"), content_type=content_type)
+        for name, value in headers.items():
+            response.headers[name] = value
+        return response
+
+    start, end = wanted
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        media.iter_range(open(full, "rb"), start, length), status=206, content_type=content_type
     )
+    for name, value in {
+        **headers,
+        "Content-Range": f"bytes {start}-{end}/{size}",
+        "Content-Length": str(length),
+    }.items():
+        response.headers[name] = value
+    return response
 
 
 # =======================
@@ -0,0 +1,16 @@
+// Candidate photo helpers.
+
+// Resized photo URL from the API's photo_variants ({ webp|jpeg: { sm, md, lg } }).
+// Falls back to the largest smaller variant, then to the original upload while
+// the variants are still being generated.
+export function candidatePhoto(cand, size = 'md') {
+  const variants = cand?.photo_variants || {}
+  const set = variants.webp || variants.jpeg
+  if (set) {
+    const order = ['sm', 'md', 'lg']
+    const wanted = order.slice(0, order.indexOf(size) + 1).reverse()
+    const hit = wanted.find((name) => set[name])
+    if (hit) return set[hit]
+  }
+  return cand?.photo_url || ''
+}